@@ -35,6 +35,9 @@ import matplotlib.pyplot as plt
 
 from neurom import load_morphology
 from neurom.apps import morph_check, morph_stats
+from neurom.io.archive import pack_morphologies
+from neurom.io.catalog import Catalog
+from neurom.io.utils import get_morph_files
 from neurom.view import matplotlib_impl, matplotlib_utils
 
 
@@ -138,10 +141,24 @@ def view(input_file, is_3d, plane, backend, realistic_diameters):
     default=False,
     help="Enable mixed subtree processing.",
 )
-def stats(datapath, config, output, full_config, as_population, ignored_exceptions, use_subtrees):
+@click.option(
+    '--catalog',
+    type=click.Path(dir_okay=False),
+    help='Path to a catalog where the statistics of each morphology are cached',
+)
+def stats(
+    datapath, config, output, full_config, as_population, ignored_exceptions, use_subtrees, catalog
+):  # pylint: disable=too-many-arguments
     """Cli for apps/morph_stats."""
     morph_stats.main(
-        datapath, config, output, full_config, as_population, ignored_exceptions, use_subtrees
+        datapath,
+        config,
+        output,
+        full_config,
+        as_population,
+        ignored_exceptions,
+        use_subtrees,
+        catalog=catalog,
     )
 
 
@@ -168,3 +185,47 @@ def stats(datapath, config, output, full_config, as_population, ignored_exceptio
 def check(datapath, config, output):
     """Cli for apps/morph_check."""
     morph_check.main(datapath, config, output)
+
+
+@cli.command(short_help='Pack the morphologies of a directory into a single archive file')
+@click.argument('datapath', type=click.Path(exists=True, file_okay=False))
+@click.argument('output', type=click.Path(exists=False, dir_okay=False))
+@click.option('-r', '--recursive', is_flag=True, default=False, help='Include sub-directories')
+def pack(datapath, output, recursive):
+    """Cli to pack the morphology files of DATAPATH into the OUTPUT archive.
+
+    The archive can be loaded with ``neurom.load_morphologies(OUTPUT)``.
+    """
+    files = sorted(get_morph_files(datapath, recursive=recursive))
+    n_files = pack_morphologies(files, output, root=datapath)
+    click.echo(f'Packed {n_files} morphologies into {output}')
+
+
+@cli.group('catalog')
+def catalog_group():
+    """Index morphologies in a local SQLite catalog and query it."""
+
+
+@catalog_group.command('index')
+@click.argument('datapath', type=click.Path(exists=True, file_okay=False))
+@click.argument('catalog_path', type=click.Path(dir_okay=False))
+@click.option('-r', '--recursive', is_flag=True, default=False, help='Include sub-directories')
+@click.option('-n', '--n-workers', type=int, default=1, show_default=True)
+def catalog_index(datapath, catalog_path, recursive, n_workers):
+    """Index the morphology files of DATAPATH in the CATALOG_PATH database."""
+    with Catalog(catalog_path) as cat:
+        n_files = cat.index(datapath, recursive=recursive, n_workers=n_workers)
+        click.echo(f'Indexed {n_files} new or modified morphologies, {len(cat)} in total')
+
+
+@catalog_group.command('query')
+@click.argument('catalog_path', type=click.Path(exists=True, dir_okay=False))
+@click.argument('where', required=False)
+def catalog_query(catalog_path, where):
+    """Print the paths of the morphologies of CATALOG_PATH that match the SQL condition WHERE.
+
+    For example: neurom catalog query catalog.db "n_neurites_apical_dendrite > 0"
+    """
+    with Catalog(catalog_path) as cat:
+        for path in cat.query(where):
+            click.echo(path)
@@ -31,9 +31,7 @@
 import csv
 import json
 import logging
-import multiprocessing
-import os
-import warnings
+import tempfile
 from collections import defaultdict
 from collections.abc import Sized
 from copy import deepcopy
@@ -53,8 +51,12 @@ from neurom.features import (
     _NEURITE_FEATURES,
     _POPULATION_FEATURES,
     _get_feature_value_and_func,
+    _get_neurites_feature_values_by_type,
 )
-from neurom.io.utils import get_files_by_path
+from neurom.io.archive import ArchiveEntry
+from neurom.io.catalog import Catalog
+from neurom.io.utils import archive_morphologies, get_files_by_path
+from neurom.parallel import get_backend
 from neurom.utils import NeuromJSON, flatten
 
 L = logging.getLogger(__name__)
@@ -63,13 +65,17 @@ IGNORABLE_EXCEPTIONS = {'SomaError': SomaError}
 
 
 def _run_extract_stats(morph, config, process_subtrees):
-    """The function to be called by multiprocessing.Pool.imap_unordered."""
-    if not isinstance(morph, (Morphology, Population)):
+    """The function applied to each morphology by :func:`extract_dataframe`."""
+    if isinstance(morph, ArchiveEntry):
+        morph = nm.load_morphology(morph, process_subtrees=process_subtrees)
+    elif not isinstance(morph, (Morphology, Population)):
         morph = nm.load_morphologies(morph, process_subtrees=process_subtrees)
     return morph.name, extract_stats(morph, config)
 
 
-def extract_dataframe(morphs, config, n_workers=1, process_subtrees=False):
+def extract_dataframe(
+    morphs, config, n_workers=1, process_subtrees=False, executor=None, schedule=None
+):  # pylint: disable=too-many-arguments
     """Extract stats grouped by neurite type from morphs.
 
     Arguments:
@@ -86,7 +92,14 @@ def extract_dataframe(morphs, config, n_workers=1, process_subtrees=False):
                   ['min', 'max', 'median', 'mean', 'std', 'raw', 'sum']
             - morphology: same as neurite entry, but it will not be run on each neurite_type,
               but only once on the whole morphology.
-        n_workers (int): number of workers for multiprocessing (on collection of morphs)
+        n_workers (int): number of workers for multiprocessing (on collection of morphs), see
+            :func:`neurom.parallel.get_backend`
+        process_subtrees (bool): enable mixed subtree processing
+        executor: how the morphologies are processed, see :mod:`neurom.parallel`. The
+            morphologies that are already loaded are serialized into a temporary archive that the
+            worker processes parse again, see :func:`neurom.io.utils.archive_morphologies`.
+        schedule: the estimated cost of the morphologies, the most expensive ones are processed
+            first, see :func:`neurom.parallel.get_cost_function`
 
     Returns:
         The extracted statistics
@@ -100,16 +113,13 @@ def extract_dataframe(morphs, config, n_workers=1, process_subtrees=False):
     elif isinstance(morphs, Population):
         morphs = morphs._files  # pylint: disable=protected-access
 
+    backend = get_backend(executor, n_workers)
     func = partial(_run_extract_stats, config=config, process_subtrees=process_subtrees)
-    if n_workers == 1:
-        stats = list(map(func, morphs))
+    if backend.uses_processes:
+        with tempfile.TemporaryDirectory(prefix='neurom-') as directory:
+            stats = backend.map(func, archive_morphologies(morphs, directory), schedule)
     else:
-        if any(isinstance(i, Morphology) for i in morphs):
-            raise ValueError("Can only process morphologies given as file paths when n_workers > 1")
-        if n_workers > os.cpu_count():
-            warnings.warn(f'n_workers ({n_workers}) > os.cpu_count() ({os.cpu_count()}))')
-        with multiprocessing.Pool(n_workers) as pool:
-            stats = list(pool.imap(func, morphs))
+        stats = backend.map(func, morphs, schedule)
 
     columns = [('property', 'name')] + [
         (key1, key2) for key1, data in stats[0][1].items() for key2 in data
@@ -124,35 +134,37 @@ def extract_dataframe(morphs, config, n_workers=1, process_subtrees=False):
 extract_dataframe.__doc__ = extract_dataframe.__doc__.strip() + "\n\t" + str(EXAMPLE_STATS_CONFIG)
 
 
-def _get_feature_stats(feature_name, morphs, modes, **kwargs):
-    """Insert the stat data in the dict.
+def _stat_name(mode, feature_name, **kwargs):
+    """Returns the key name for the data dictionary.
 
-    If the feature is 2-dimensional, the feature is flattened on its last axis
+    The key is a combination of the mode, feature_name and an optional suffix of all the extra
+    kwargs that are passed in the feature function (apart from neurite_type).
     """
+    suffix = "__".join([f"{key}:{value}" for key, value in kwargs.items() if key != "neurite_type"])
 
-    def stat_name_format(mode, feature_name, **kwargs):
-        """Returns the key name for the data dictionary.
+    if suffix:
+        return f"{mode}_{feature_name}__{suffix}"
 
-        The key is a combination of the mode, feature_name and an optional suffix of all the extra
-        kwargs that are passed in the feature function (apart from neurite_type).
-        """
-        suffix = "__".join(
-            [f"{key}:{value}" for key, value in kwargs.items() if key != "neurite_type"]
-        )
+    return f"{mode}_{feature_name}"
+
+
+def _get_feature_stats(feature_name, morphs, modes, **kwargs):
+    """Insert the stat data in the dict.
 
-        if suffix:
-            return f"{mode}_{feature_name}__{suffix}"
+    If the feature is 2-dimensional, the feature is flattened on its last axis
+    """
+    value, func = _get_feature_value_and_func(feature_name, morphs, **kwargs)
+    return _get_value_stats(feature_name, value, func.shape, modes, **kwargs)
 
-        return f"{mode}_{feature_name}"
 
+def _get_value_stats(feature_name, value, shape, modes, **kwargs):
+    """Compute the stats of a feature value for each mode."""
     data = {}
-    value, func = _get_feature_value_and_func(feature_name, morphs, **kwargs)
-    shape = func.shape
     if len(shape) > 2:
         raise ValueError(f'Len of "{feature_name}" feature shape must be <= 2')  # pragma: no cover
 
     for mode in modes:
-        stat_name = stat_name_format(mode, feature_name, **kwargs)
+        stat_name = _stat_name(mode, feature_name, **kwargs)
 
         stat = value
         if isinstance(value, Sized):
@@ -171,6 +183,30 @@ def _get_feature_stats(feature_name, morphs, modes, **kwargs):
     return data
 
 
+def _update_neurite_feature_stats(
+    stats, feature_name, morphs, modes, neurite_types, feature_kwargs
+):
+    """Insert the stats of a neurite category feature for each neurite type in `stats`.
+
+    The feature is computed once per neurite for all the types when possible, see
+    :func:`neurom.features._get_neurites_feature_values_by_type`.
+    """
+    partitioned = _get_neurites_feature_values_by_type(
+        feature_name, morphs, neurite_types, **feature_kwargs
+    )
+    for neurite_type in neurite_types:
+        if not isinstance(morphs, Neurite):
+            feature_kwargs["neurite_type"] = neurite_type
+        if partitioned is None:
+            feature_stats = _get_feature_stats(feature_name, morphs, modes, **feature_kwargs)
+        else:
+            values, func = partitioned
+            feature_stats = _get_value_stats(
+                feature_name, values[neurite_type], func.shape, modes, **feature_kwargs
+            )
+        stats[neurite_type.name].update(feature_stats)
+
+
 def extract_stats(morphs, config):
     """Extract stats from morphs.
 
@@ -220,17 +256,9 @@ def extract_stats(morphs, config):
                         else [_NEURITE_MAP[feature_kwargs.get('neurite_type', 'ALL')]]
                     )
 
-                    for neurite_type in types:
-                        if not isinstance(morphs, Neurite):
-                            feature_kwargs["neurite_type"] = neurite_type
-                        stats[neurite_type.name].update(
-                            _get_feature_stats(
-                                feature_name,
-                                morphs,
-                                modes,
-                                **feature_kwargs,
-                            )
-                        )
+                    _update_neurite_feature_stats(
+                        stats, feature_name, morphs, modes, types, feature_kwargs
+                    )
 
                 else:
                     stats[category].update(
@@ -358,6 +386,26 @@ def _sanitize_config(config):
     return config
 
 
+def _extract_stats_with_catalog(datapath, config, catalog, ignored_exceptions, process_subtrees):
+    """Extract the stats of each morphology file, reading and writing them in the catalog."""
+    results = {}
+    with Catalog(catalog) as cat:
+        for f in get_files_by_path(datapath):
+            stats = cat.get_stats(f, config, process_subtrees)
+            if stats is None:
+                morphs = nm.load_morphologies(
+                    [f], ignored_exceptions=ignored_exceptions, process_subtrees=process_subtrees
+                )
+                for morph in morphs:
+                    stats = extract_stats(morph, config)
+                    cat.set_stats(f, config, stats, process_subtrees)
+            else:
+                L.debug('Statistics of %s read from the catalog', f)
+            if stats is not None:
+                results[f.name] = stats
+    return results
+
+
 def main(
     datapath,
     config,
@@ -366,17 +414,20 @@ def main(
     as_population,
     ignored_exceptions,
     use_subtrees=False,
+    catalog=None,
 ):
     """Main function that get statistics for morphologies.
 
     Args:
-        datapath (str|Path): path to a morphology file or folder
+        datapath (str|Path): path to a morphology file, folder or archive
         config (str|Path): path to a statistics config file
         output_file (str|Path): path to output the resulted statistics file
         is_full_config (bool): should be statistics made over all possible features, modes, neurites
         as_population (bool): treat ``datapath`` as directory of morphologies population
         ignored_exceptions (list|tuple|None): exceptions to ignore when loading a morphology
         use_subtrees (bool): Enable of heterogeneous subtree processing
+        catalog (str|Path): optional path to a catalog (see :mod:`neurom.io.catalog`) where the
+            statistics of each morphology are cached
     """
     config = full_config() if is_full_config else get_config(config, EXAMPLE_STATS_CONFIG)
 
@@ -388,14 +439,19 @@ def main(
     if ignored_exceptions is None:
         ignored_exceptions = ()
 
+    ignored_exceptions = tuple(IGNORABLE_EXCEPTIONS[k] for k in ignored_exceptions)
     morphs = nm.load_morphologies(
         get_files_by_path(datapath),
-        ignored_exceptions=tuple(IGNORABLE_EXCEPTIONS[k] for k in ignored_exceptions),
+        ignored_exceptions=ignored_exceptions,
         process_subtrees=use_subtrees,
     )
 
     if as_population:
         results = {datapath: extract_stats(morphs, config)}
+    elif catalog is not None:
+        results = _extract_stats_with_catalog(
+            datapath, config, catalog, ignored_exceptions, use_subtrees
+        )
     else:
         results = {m.name: extract_stats(m, config) for m in morphs}
 
@@ -36,9 +36,12 @@ from neurom import load_morphology
 from neurom.check import check_wrapper
 from neurom.exceptions import ConfigError, NeuroMError
 from neurom.io import utils
+from neurom.parallel import get_backend
 
 L = logging.getLogger(__name__)
 
+SEPARATOR = '=' * 40
+
 
 class CheckRunner:
     """Class managing checks, config and output."""
@@ -50,15 +53,29 @@ class CheckRunner:
             (k, import_module('neurom.check.%s' % k)) for k in config['checks']
         )
 
-    def run(self, path):
-        """Test a bunch of files and return a summary JSON report."""
-        SEPARATOR = '=' * 40
+    def __getstate__(self):
+        """Only the config is pickled, the check modules are imported again when unpickled."""
+        return self._config
+
+    def __setstate__(self, config):
+        """Import the check modules again when unpickled."""
+        self.__init__(config)
+
+    def run(self, path, executor=None, schedule=None):
+        """Test a bunch of files and return a summary JSON report.
+
+        Arguments:
+            path (str|Path): a morphology file or a directory of morphology files
+            executor: how the files are checked, see :mod:`neurom.parallel`
+            schedule: the estimated cost of the files, the most expensive ones are checked first,
+                see :func:`neurom.parallel.get_cost_function`
+        """
         summary = {}
         res = True
 
-        for _f in utils.get_files_by_path(path):
-            L.info(SEPARATOR)
-            status, summ = self._check_file(_f)
+        for status, summ in get_backend(executor).map(
+            self._check_file, utils.get_files_by_path(path), schedule
+        ):
             res &= status
             if summ is not None:
                 summary.update(summ)
@@ -104,6 +121,7 @@ class CheckRunner:
 
     def _check_file(self, f):
         """Run tests on a morphology file."""
+        L.info(SEPARATOR)
         L.info('File: %s', f)
 
         full_result = True
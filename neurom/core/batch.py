@@ -0,0 +1,337 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Ragged array representation of a morphology population.
+
+A :class:`PopulationBatch` concatenates the points and sections of all the morphologies of a
+population into shared arrays, with offsets delimiting each section, neurite and morphology. The
+section features are then computed for the whole population with a few NumPy operations instead of
+a Python loop over the morphologies, neurites and sections, and split back by morphology if needed.
+
+The sections are stored in the order used by :func:`neurom.features.get`, i.e. the neurites in file
+order and the sections of each neurite in pre-order, so that the flat results of the batch are
+equal to the results of the corresponding population features.
+
+Examples::
+
+    import neurom
+    from neurom.core.batch import PopulationBatch
+
+    batch = PopulationBatch(neurom.load_morphologies('path/to/morphologies'))
+    lengths = batch.section_lengths(neurite_type=neurom.BASAL_DENDRITE)
+    lengths_per_morphology = batch.split(lengths, neurite_type=neurom.BASAL_DENDRITE)
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from neurom.core.dataformat import COLS
+from neurom.core.types import NeuriteType
+from neurom.exceptions import NeuroMError
+
+_MorphologyArrays = namedtuple(
+    '_MorphologyArrays',
+    [
+        'name',
+        'points',
+        'section_sizes',
+        'types',
+        'parents',
+        'n_neurites',
+        'soma_center',
+        'soma_radius',
+    ],
+)
+
+
+def _preorder(morphio_morph):
+    """Return the section ids of a MorphIO morphology in pre-order."""
+    return np.fromiter((s.id for s in morphio_morph.iter()), dtype=np.int64)
+
+
+def _read_morphology(morph):
+    """Read the arrays of a morphology, with its sections in pre-order."""
+    morphio_morph = morph.to_morphio()
+    if not hasattr(morphio_morph, 'section_offsets'):
+        morphio_morph = morphio_morph.as_immutable()
+    order = _preorder(morphio_morph)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+
+    offsets = morphio_morph.section_offsets
+    points = np.column_stack([morphio_morph.points, morphio_morph.diameters / 2])
+    if np.any(np.diff(order) != 1):
+        points = points[
+            np.concatenate([np.arange(offsets[i], offsets[i + 1], dtype=np.int64) for i in order])
+        ]
+    parents = np.full(len(order), -1, dtype=np.int64)
+    for parent, children in morphio_morph.connectivity.items():
+        if parent >= 0:
+            parents[rank[children]] = rank[parent]
+
+    if morph.soma.points.size:
+        soma_center, soma_radius = morph.soma.center[COLS.XYZ], morph.soma.radius
+    else:
+        soma_center, soma_radius = np.full(3, np.nan), np.nan
+
+    return _MorphologyArrays(
+        name=morph.name,
+        points=points,
+        section_sizes=np.diff(offsets)[order],
+        types=np.asarray(morphio_morph.section_types)[order],
+        parents=parents,
+        n_neurites=len(morphio_morph.root_sections),
+        soma_center=soma_center,
+        soma_radius=soma_radius,
+    )
+
+
+def _concatenate(arrays, dtype, shape=(0,)):
+    """Concatenate the arrays, return an empty array of the given shape if there is none."""
+    return np.concatenate(arrays).astype(dtype) if arrays else np.empty(shape, dtype=dtype)
+
+
+def _offsets(sizes):
+    """Return the offsets delimiting consecutive chunks of the given sizes."""
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(sizes)
+    return offsets
+
+
+def _ancestry(parents):
+    """Return the depth and the root of each node of a forest given by its parent array.
+
+    The roots have a negative parent. The pointers are doubled at each iteration, so the number of
+    NumPy passes is logarithmic in the depth of the trees.
+    """
+    depths = (parents >= 0).astype(np.int64)
+    roots = np.where(parents >= 0, parents, np.arange(len(parents)))
+    ancestors = parents.copy()
+    active = np.flatnonzero(ancestors >= 0)
+    while len(active) > 0:
+        jump = ancestors[active]
+        depths[active] += depths[jump]
+        roots[active] = roots[jump]
+        ancestors[active] = ancestors[jump]
+        active = active[ancestors[active] >= 0]
+    return depths, roots
+
+
+def _type_mask(types, neurite_type):
+    """Return the mask of the `types` equal to `neurite_type`."""
+    neurite_type = NeuriteType(neurite_type)
+    if neurite_type == NeuriteType.all:
+        return np.ones(len(types), dtype=bool)
+    if neurite_type.is_composite():
+        raise NeuroMError(f'The composite type {neurite_type} is not supported by a batch')
+    selected = [t for t in np.unique(types) if NeuriteType(int(t)) == neurite_type]
+    return np.isin(types, selected)
+
+
+def _count_crossings(start_dist2, end_dist2, radii):
+    """Count the segments crossing each sphere, given the squared distances of their ends.
+
+    The spheres crossed by a segment form a contiguous range of the sorted radii, so the counts
+    are a cumulative sum of +1 at the start and -1 at the end of each range.
+    """
+    radii2 = radii**2
+    order = np.argsort(radii2)
+    low = np.searchsorted(radii2[order], np.minimum(start_dist2, end_dist2), side='left')
+    high = np.searchsorted(radii2[order], np.maximum(start_dist2, end_dist2), side='right')
+    counts = np.bincount(low, minlength=len(radii) + 1) - np.bincount(
+        high, minlength=len(radii) + 1
+    )
+    crossings = np.empty(len(radii), dtype=np.int64)
+    crossings[order] = np.cumsum(counts[:-1])
+    return crossings
+
+
+class PopulationBatch:
+    """The sections and points of a morphology population concatenated into shared arrays.
+
+    Attributes:
+        names (list[str]): names of the morphologies
+        points (numpy.ndarray): the (x, y, z, r) points of all the sections
+        section_offsets (numpy.ndarray): the i-th section spans
+            ``points[section_offsets[i]:section_offsets[i + 1]]``
+        section_types (numpy.ndarray): the type of each section
+        section_parents (numpy.ndarray): the index of the parent of each section, -1 for a root
+        section_neurites (numpy.ndarray): the index of the neurite of each section
+        section_morphologies (numpy.ndarray): the index of the morphology of each section
+        neurite_types (numpy.ndarray): the type of each neurite, i.e. of its root section
+        morphology_section_offsets (numpy.ndarray): the sections of the i-th morphology are
+            ``morphology_section_offsets[i]:morphology_section_offsets[i + 1]``
+        morphology_neurite_offsets (numpy.ndarray): the neurites of the i-th morphology are
+            ``morphology_neurite_offsets[i]:morphology_neurite_offsets[i + 1]``
+        soma_centers (numpy.ndarray): the soma center of each morphology, NaN if it has no soma
+        soma_radii (numpy.ndarray): the soma radius of each morphology, NaN if it has no soma
+
+    Note:
+        The neurite types are the types of the root sections, as done for morphologies that do not
+        process the mixed subtrees.
+    """
+
+    def __init__(self, morphs):
+        """Build the batch.
+
+        Arguments:
+            morphs (Iterable[Morphology]|Population): the morphologies, each of them is loaded and
+                read once
+        """
+        arrays = [_read_morphology(morph) for morph in morphs]
+        self.names = [a.name for a in arrays]
+        n_sections = [len(a.types) for a in arrays]
+        self.morphology_section_offsets = _offsets(n_sections)
+        self.morphology_neurite_offsets = _offsets([a.n_neurites for a in arrays])
+        self.section_morphologies = np.repeat(np.arange(len(arrays)), n_sections)
+
+        self.points = _concatenate([a.points for a in arrays], np.float64, (0, 4))
+        self.section_offsets = _offsets(_concatenate([a.section_sizes for a in arrays], np.int64))
+        self.section_types = _concatenate([a.types for a in arrays], np.int64)
+        self.section_parents = _concatenate(
+            [
+                np.where(a.parents >= 0, a.parents + offset, -1)
+                for a, offset in zip(arrays, self.morphology_section_offsets)
+            ],
+            np.int64,
+        )
+        soma_centers = [a.soma_center for a in arrays]
+        self.soma_centers = np.reshape(np.array(soma_centers, dtype=np.float64), (-1, 3))
+        self.soma_radii = np.array([a.soma_radius for a in arrays], dtype=np.float64)
+
+        self._branch_orders, roots = _ancestry(self.section_parents)
+        root_ids = np.flatnonzero(self.section_parents < 0)
+        self.section_neurites = np.searchsorted(root_ids, roots)
+        self.neurite_types = self.section_types[root_ids]
+
+    def __len__(self):
+        """Number of morphologies in the batch."""
+        return len(self.names)
+
+    def __str__(self):
+        """Return a string representation."""
+        return (
+            f'PopulationBatch <n_morphologies: {len(self)}, '
+            f'n_sections: {len(self.section_types)}, n_points: {len(self.points)}>'
+        )
+
+    def _neurite_mask(self, neurite_type):
+        """Return the mask of the sections whose neurite is of type `neurite_type`."""
+        return _type_mask(self.neurite_types, neurite_type)[self.section_neurites]
+
+    def _segment_sums(self, values):
+        """Sum per section the values given for each pair of consecutive points."""
+        cumsum = np.zeros(len(self.points))
+        cumsum[1:] = np.cumsum(values)
+        starts = self.section_offsets[:-1]
+        ends = np.maximum(self.section_offsets[1:] - 1, starts)
+        return cumsum[ends] - cumsum[starts]
+
+    def _segment_vectors(self):
+        """Return the vectors between consecutive points, zeroed across sections."""
+        vectors = np.diff(self.points[:, COLS.XYZ], axis=0)
+        # the segments that start at the last point of a section link two sections
+        vectors[self.section_offsets[1:-1] - 1] = 0
+        return vectors
+
+    def section_lengths(self, neurite_type=NeuriteType.all):
+        """Lengths of the sections of the neurites of type `neurite_type`."""
+        lengths = self._segment_sums(np.linalg.norm(self._segment_vectors(), axis=1))
+        return lengths[self._neurite_mask(neurite_type)]
+
+    def section_areas(self, neurite_type=NeuriteType.all):
+        """Lateral areas of the sections, the segments are conical frustums."""
+        radii = self.points[:, COLS.R]
+        r0, r1 = radii[:-1], radii[1:]
+        h2 = np.einsum('ij,ij->i', *(self._segment_vectors(),) * 2)
+        areas = np.pi * (r0 + r1) * np.sqrt((r0 - r1) ** 2 + h2)
+        areas[self.section_offsets[1:-1] - 1] = 0
+        return self._segment_sums(areas)[self._neurite_mask(neurite_type)]
+
+    def section_radial_distances(self, neurite_type=NeuriteType.all):
+        """Distances between the soma center and the last point of the sections.
+
+        As for the ``section_radial_distances`` feature, the distances of the morphologies without
+        a soma are measured from the first point of the neurite of each section.
+        """
+        mask = self._neurite_mask(neurite_type)
+        ends = self.points[self.section_offsets[1:][mask] - 1, COLS.XYZ]
+        origins = self.soma_centers[self.section_morphologies[mask]]
+        no_soma = np.isnan(origins).any(axis=1)
+        if no_soma.any():
+            root_ids = np.flatnonzero(self.section_parents < 0)
+            neurites = self.section_neurites[mask][no_soma]
+            origins[no_soma] = self.points[self.section_offsets[root_ids[neurites]], COLS.XYZ]
+        return np.linalg.norm(ends - origins, axis=1)
+
+    def section_branch_orders(self, neurite_type=NeuriteType.all):
+        """Branch orders of the sections, the root sections have order 0."""
+        return self._branch_orders[self._neurite_mask(neurite_type)]
+
+    def sholl_frequency(self, neurite_type=NeuriteType.all, step_size=10, bins=None):
+        """Sholl frequency of the whole population.
+
+        Same as the ``sholl_frequency`` population feature: the radii range from the smallest
+        soma radius to the largest distance between a point and its soma center, and the
+        crossings of all the morphologies are summed.
+        """
+        mask = self._neurite_mask(neurite_type) & _type_mask(self.section_types, neurite_type)
+        if np.isnan(self.soma_radii).any():
+            raise NeuroMError('sholl_frequency requires all the morphologies to have a soma')
+
+        point_sections = np.repeat(np.arange(len(mask)), np.diff(self.section_offsets))
+        centers = self.soma_centers[self.section_morphologies[point_sections]]
+        dist2 = np.einsum('ij,ij->i', *(self.points[:, COLS.XYZ] - centers,) * 2)
+        point_mask = mask[point_sections]
+
+        if bins is None:
+            if not point_mask.any():
+                return []
+            min_soma_edge = self.soma_radii.min()
+            max_radius = np.sqrt(dist2[point_mask].max())
+            bins = np.arange(min_soma_edge, min_soma_edge + max_radius, step_size)
+
+        segment_mask = point_mask[:-1].copy()
+        segment_mask[self.section_offsets[1:-1] - 1] = False
+        return _count_crossings(
+            dist2[:-1][segment_mask], dist2[1:][segment_mask], np.asarray(bins, dtype=np.float64)
+        )
+
+    def split(self, values, neurite_type=NeuriteType.all):
+        """Split per morphology the section values computed for `neurite_type`.
+
+        Arguments:
+            values (numpy.ndarray): the result of a section method of the batch
+            neurite_type (NeuriteType): the neurite type used to compute `values`
+
+        Returns:
+            list[numpy.ndarray]: the values of each morphology
+        """
+        cumsum = np.zeros(len(self.section_types) + 1, dtype=np.int64)
+        cumsum[1:] = np.cumsum(self._neurite_mask(neurite_type))
+        return np.split(np.asarray(values), cumsum[self.morphology_section_offsets[1:-1]])
@@ -193,7 +193,7 @@ class Section:
         The area is calculated from the segments, as defined by this
         section's points
         """
-        return sum(morphmath.segment_area(s) for s in iter_segments(self))
+        return float(np.sum(morphmath.segment_areas(morphmath.polyline_segments(self.points))))
 
     @property
     def volume(self):
@@ -202,7 +202,7 @@ class Section:
         The volume is calculated from the segments, as defined by this
         section's points
         """
-        return sum(morphmath.segment_volume(s) for s in iter_segments(self))
+        return float(np.sum(morphmath.segment_volumes(morphmath.polyline_segments(self.points))))
 
     def __repr__(self):
         """Text representation."""
@@ -29,27 +29,55 @@
 """Morphology Population Classes and Functions."""
 import logging
 import os
+import time
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 from morphio import MorphioError
 
 import neurom
 from neurom.exceptions import NeuroMError
+from neurom.io.metadata import scan_metadata
+from neurom.parallel import get_backend
 
 L = logging.getLogger(__name__)
 
+LoadResult = namedtuple('LoadResult', ['name', 'duration', 'error'])
+
 
 def _resolve_if_morphology_paths(files_or_objects):
     """Resolve the files in the list."""
     return [Path(os.path.abspath(f)) if isinstance(f, (Path, str)) else f for f in files_or_objects]
 
 
+def _timed_load_file_as_h5(f, loader):
+    """Load a morphology in a worker process and return it as the content of a HDF5 file.
+
+    MorphIO morphologies can not be pickled, and HDF5 is the format that MorphIO reads the fastest,
+    in bulk, so it is used to send the loaded morphologies back to the main process.
+
+    The somata that HDF5 files can not store, e.g. the SWC somata, are sent next to the file.
+
+    Returns:
+        tuple: the name of the morphology, the content of its HDF5 file and its soma or None if
+        the morphology was not loaded or can not be written by MorphIO, and its :class:`LoadResult`
+    """
+    # pylint: disable=protected-access
+    morph, report = loader._timed_load_file(f)
+    if morph is None:
+        return None, None, report
+    return morph.name, neurom.io.utils._to_h5_bytes(morph), report
+
+
 class Population:
     """Morphology Population Class.
 
     Offers an iterator over morphs within population, neurites of morphs, somas of morphs.
     It does not store the loaded morphology in memory unless the morphology has been already passed
-    as loaded (instance of ``Morphology``).
+    as loaded (instance of ``Morphology``), ``cache=True`` is used, or a bounded cache is set with
+    ``cache_size``.
     """
 
     def __init__(
@@ -60,7 +88,12 @@ class Population:
         *,
         cache=False,
         process_subtrees=False,
-    ):
+        cache_size=None,
+        prefetch=0,
+        n_workers=1,
+        binary_cache_dir=None,
+        executor=None,
+    ):  # pylint: disable=too-many-arguments
         """Construct a morphology population.
 
         Arguments:
@@ -74,10 +107,30 @@ class Population:
                 population is big. If true then all morphs will be loaded upon the construction
                 and kept in memory.
             process_subtrees (bool): enable mixed tree processing if set to True
+            cache_size (int): if set and ``cache`` is False, keep at most this number of the most
+                recently accessed morphologies in memory (LRU eviction).
+            prefetch (int): if greater than 0, when iterating over the population the next
+                ``prefetch`` morphologies are loaded in a background thread pool while the current
+                one is being processed.
+            n_workers (int): number of workers used to load the morphologies when ``cache`` is
+                True.
+            binary_cache_dir (str|Path): optional directory of binary caches used to load the
+                morphology files, see :func:`neurom.io.utils.load_morphology`.
+            executor: how the morphologies are loaded when ``cache`` is True, see
+                :mod:`neurom.parallel`. By default, a pool of ``n_workers`` threads is used, which
+                only speeds the loading up as far as MorphIO releases the GIL while parsing. With
+                a process backend, the files are parsed in the worker processes and sent back in
+                the HDF5 format, which the main process reads in bulk. The morphologies that
+                MorphIO can not write in this format are parsed again by the main process.
 
         Notes:
             symlinks in paths are not resolved.
         """
+        if cache_size is not None and cache_size < 1:
+            raise NeuroMError(f'`cache_size` must be strictly positive, got {cache_size}')
+        if prefetch < 0:
+            raise NeuroMError(f'`prefetch` must be positive, got {prefetch}')
+
         self._ignored_exceptions = ignored_exceptions
         self.name = name
 
@@ -85,12 +138,84 @@ class Population:
 
         self._process_subtrees = process_subtrees
 
+        self._cache_size = None if cache else cache_size
+        self._lru = OrderedDict()
+        self._prefetch = prefetch
+        self._n_workers = n_workers
+        self._binary_cache_dir = binary_cache_dir
+        self._executor = executor
+        self._load_report = []
+
         if cache:
             self._reset_cache()
 
     def _reset_cache(self):
         """Reset the internal cache."""
-        self._files = [self._load_file(f) for f in self._files if f is not None]
+        self._lru.clear()
+        if self._cache_size is not None:
+            return
+
+        files = [f for f in self._files if f is not None]
+        backend = None if self._executor is None else get_backend(self._executor, self._n_workers)
+        if backend is not None and backend.uses_processes:
+            results = self._load_in_processes(files, backend)
+        elif backend is not None:
+            results = backend.map(self._timed_load_file, files)
+        elif self._n_workers > 1:
+            with ThreadPoolExecutor(max_workers=self._n_workers) as executor:
+                results = list(executor.map(self._timed_load_file, files))
+        else:
+            results = list(map(self._timed_load_file, files))
+
+        self._files = [m for m, _ in results]
+        self._load_report = [report for _, report in results]
+
+    def _load_in_processes(self, files, backend):
+        """Load the files in worker processes, see :func:`_timed_load_file_as_h5`.
+
+        The morphologies that are already loaded are copied in the current process.
+        """
+        results = [None] * len(files)
+        sent = []
+        for idx, f in enumerate(files):
+            if isinstance(f, neurom.core.morphology.Morphology):
+                results[idx] = self._timed_load_file(f)
+            else:
+                sent.append(idx)
+
+        # the workers load the files with the options of this population, without its files
+        func = partial(_timed_load_file_as_h5, loader=self._sub_population([]))
+        for idx, (name, data, report) in zip(sent, backend.map(func, [files[i] for i in sent])):
+            morph = None
+            if data is not None:
+                morph = self._read_h5_bytes(data, name)
+            if morph is None and report.error is None:
+                morph = self._load_file(files[idx])
+            results[idx] = morph, report
+        return results
+
+    def _read_h5_bytes(self, data, name):
+        """Read a morphology sent by a worker process, None if MorphIO can not read it back."""
+        try:
+            # pylint: disable=protected-access
+            morphio_morph = neurom.io.utils._from_h5_bytes(*data)
+        except MorphioError:
+            # e.g. the sections of undefined type are written but can not be read
+            return None
+        return neurom.core.morphology.Morphology(
+            morphio_morph, name=name, process_subtrees=self.process_subtrees
+        )
+
+    @property
+    def load_report(self):
+        """Per-file load times and ignored errors of the last eager load.
+
+        Returns:
+            list[LoadResult]: (name, duration in seconds, ignored exception or None) for each file.
+            It is only filled when all the morphologies are loaded at once, i.e. with
+            ``cache=True``.
+        """
+        return self._load_report
 
     @property
     def process_subtrees(self):
@@ -117,24 +242,141 @@ class Population:
         """Iterator to populations's neurites."""
         return (neurite for n in self for neurite in n.neurites)
 
-    def _load_file(self, f):
+    def _load_file_or_error(self, f):
+        """Load a morphology and return it with the ignored exception raised while loading it."""
+        if f is None:
+            # a morphology that failed to load when the population was cached
+            return None, None
         if isinstance(f, neurom.core.morphology.Morphology):
             new_morph = f.copy()
             new_morph.process_subtrees = self.process_subtrees
-            return new_morph
+            return new_morph, None
         try:
-            return neurom.load_morphology(f, process_subtrees=self.process_subtrees)
+            morph = neurom.load_morphology(
+                f, process_subtrees=self.process_subtrees, binary_cache_dir=self._binary_cache_dir
+            )
+            return morph, None
         except (NeuroMError, MorphioError) as e:
             if isinstance(e, self._ignored_exceptions):
                 L.info('Ignoring exception "%s" for file %s', e, f.name)
-            else:
-                raise NeuroMError('`load_morphologies` failed') from e
-        return None
+                return None, e
+            raise NeuroMError('`load_morphologies` failed') from e
+
+    def _load_file(self, f):
+        return self._load_file_or_error(f)[0]
+
+    def _timed_load_file(self, f):
+        """Load a morphology and return it with its :class:`LoadResult`."""
+        start = time.perf_counter()
+        m, error = self._load_file_or_error(f)
+        duration = time.perf_counter() - start
+        name = f.name if isinstance(f, neurom.core.morphology.Morphology) else str(f)
+        L.debug('Loaded %s in %.3fs', name, duration)
+        return m, LoadResult(name, duration, error)
+
+    def _get(self, idx, loaded=None):
+        """Get the morphology at index idx, going through the LRU cache if it is enabled.
+
+        Arguments:
+            idx (int): index of the morphology
+            loaded (Future): optional future of the morphology already being loaded
+        """
+        if self._cache_size is None:
+            return loaded.result() if loaded is not None else self._load_file(self._files[idx])
+
+        if idx in self._lru:
+            self._lru.move_to_end(idx)
+            return self._lru[idx]
+
+        m = loaded.result() if loaded is not None else self._load_file(self._files[idx])
+        self._lru[idx] = m
+        if len(self._lru) > self._cache_size:
+            self._lru.popitem(last=False)
+        return m
+
+    def _iter_prefetch(self):
+        """Iterate over the morphologies while loading the next ones in a thread pool."""
+        executor = ThreadPoolExecutor(max_workers=self._prefetch)
+        try:
+            pending = deque()
+            next_idx = 0
+            for idx in range(len(self._files)):
+                while next_idx < len(self._files) and next_idx <= idx + self._prefetch:
+                    if next_idx in self._lru:
+                        pending.append(None)
+                    else:
+                        pending.append(executor.submit(self._load_file, self._files[next_idx]))
+                    next_idx += 1
+                m = self._get(idx, pending.popleft())
+                if m is not None:
+                    yield m
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _sub_population(self, files):
+        """Create a population of some of the files of this one, with the same options."""
+        return Population(
+            files,
+            self.name,
+            self._ignored_exceptions,
+            process_subtrees=self._process_subtrees,
+            cache_size=self._cache_size,
+            prefetch=self._prefetch,
+            n_workers=self._n_workers,
+            binary_cache_dir=self._binary_cache_dir,
+            executor=self._executor,
+        )
+
+    def metadata(self, n_workers=1):
+        """Read the metadata of the morphologies without loading them in NeuroM.
+
+        Arguments:
+            n_workers (int): number of processes used to read the files
+
+        Returns:
+            list[MorphologyMetadata]: the metadata of each morphology, see
+            :mod:`neurom.io.metadata`. It is None for the files that could not be read because
+            of an ignored exception.
+        """
+        return scan_metadata(
+            [f for f in self._files if f is not None], n_workers, self._ignored_exceptions
+        )
+
+    def filter(self, predicate, n_workers=1):
+        """Select the morphologies from their metadata, before any full load.
+
+        Arguments:
+            predicate (Callable[[MorphologyMetadata], bool]): function returning True for the
+                metadata of the morphologies to keep
+            n_workers (int): number of processes used to read the files
+
+        Returns:
+            Population: the population of the selected morphologies, with the same options
+
+        Examples::
+
+            pop.filter(lambda m: NeuriteType.apical_dendrite in m.n_neurites)
+        """
+        files = [f for f in self._files if f is not None]
+        metadata = self.metadata(n_workers)
+        return self._sub_population(
+            [f for f, m in zip(files, metadata) if m is not None and predicate(m)]
+        )
+
+    def __getstate__(self):
+        """The executor is not pickled, e.g. when the population is sent to worker processes."""
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        return state
 
     def __iter__(self):
         """Iterator to populations's morphs."""
-        for f in self._files:
-            m = self._load_file(f)
+        if self._prefetch > 0:
+            yield from self._iter_prefetch()
+            return
+
+        for idx in range(len(self._files)):
+            m = self._get(idx)
             if m is None:
                 continue
             yield m
@@ -144,12 +386,14 @@ class Population:
         return len(self._files)
 
     def __getitem__(self, idx):
-        """Get morphology at index idx."""
+        """Get morphology at index idx, or a sub-population if idx is a slice."""
+        if isinstance(idx, slice):
+            return self._sub_population(self._files[idx])
         if idx > len(self):
             raise ValueError(
                 f'no {idx} index in "{self.name}" population, max possible index is {len(self)}'
             )
-        return self._load_file(self._files[idx])
+        return self._get(idx)
 
     def __str__(self):
         """Return a string representation."""
@@ -273,7 +273,7 @@ def _soma_cylinders_radius(morphio_soma):
         (morphio_soma.points, 0.5 * morphio_soma.diameters[:, np.newaxis]),
         axis=1,
     )
-    area = sum(morphmath.segment_area((p0, p1)) for p0, p1 in zip(points, points[1:]))
+    area = float(np.sum(morphmath.segment_areas(morphmath.polyline_segments(points))))
     return math.sqrt(area / (4.0 * math.pi))
 
 
@@ -319,7 +319,7 @@ def _soma_cylinders_area(morphio_soma):
         ),
         axis=1,
     )
-    return sum(morphmath.segment_area((p0, p1)) for p0, p1 in zip(points, points[1:]))
+    return float(np.sum(morphmath.segment_areas(morphmath.polyline_segments(points))))
 
 
 def _soma_three_point_cylinders_area(morphio_soma):
@@ -361,7 +361,7 @@ def _soma_cylinders_volume(morphio_soma):
         ),
         axis=1,
     )
-    return sum(morphmath.segment_volume((p0, p1)) for p0, p1 in zip(points, points[1:]))
+    return float(np.sum(morphmath.segment_volumes(morphmath.polyline_segments(points))))
 
 
 def _soma_three_point_cylinders_volume(morphio_soma):
@@ -38,21 +38,93 @@ Examples:
 """
 
 import operator
+import tempfile
 from enum import Enum
 from functools import partial, reduce, wraps
 
 import numpy as np
 
+import neurom
 from neurom.core import Morphology, Neurite, Population
 from neurom.core.morphology import iter_neurites
 from neurom.core.types import NeuriteType
 from neurom.core.types import tree_type_checker as is_type
 from neurom.exceptions import NeuroMError
+from neurom.features.disk_cache import feature_key
+from neurom.geom.transform import TransformedMorphology
+from neurom.parallel import get_backend
 
 _NEURITE_FEATURES = {}
 _MORPHOLOGY_FEATURES = {}
 _POPULATION_FEATURES = {}
 
+# optional neurom.features.disk_cache.FeatureCache used to store the morphology feature values
+_DISK_CACHE = None
+
+# Features that are not modified by translations and rotations of a morphology, as long as no
+# explicit ``origin`` or ``center`` point is given.
+_FRAME_INVARIANT_FEATURES = frozenset(
+    {
+        'bifurcation_partitions',
+        'diameter_power_relations',
+        'local_bifurcation_angles',
+        'max_radial_distance',
+        'neurite_volume_density',
+        'number_of_bifurcations',
+        'number_of_forking_points',
+        'number_of_leaves',
+        'number_of_neurites',
+        'number_of_sections',
+        'number_of_sections_per_neurite',
+        'number_of_segments',
+        'partition_asymmetry',
+        'partition_asymmetry_length',
+        'partition_pairs',
+        'principal_direction_extents',
+        'remote_bifurcation_angles',
+        'section_areas',
+        'section_bif_branch_orders',
+        'section_bif_lengths',
+        'section_bif_radial_distances',
+        'section_branch_orders',
+        'section_end_distances',
+        'section_lengths',
+        'section_path_distances',
+        'section_radial_distances',
+        'section_strahler_orders',
+        'section_taper_rates',
+        'section_term_branch_orders',
+        'section_term_lengths',
+        'section_term_radial_distances',
+        'section_tortuosity',
+        'section_volumes',
+        'segment_areas',
+        'segment_lengths',
+        'segment_meander_angles',
+        'segment_path_lengths',
+        'segment_radial_distances',
+        'segment_radii',
+        'segment_taper_rates',
+        'segment_volumes',
+        'sholl_crossings',
+        'sholl_frequency',
+        'sibling_ratios',
+        'soma_radius',
+        'soma_surface_area',
+        'soma_volume',
+        'terminal_path_lengths',
+        'total_area',
+        'total_area_per_neurite',
+        'total_length',
+        'total_length_per_neurite',
+        'total_volume',
+        'total_volume_per_neurite',
+        'trunk_origin_radii',
+        'trunk_section_lengths',
+        'volume_density',
+    }
+)
+
 
 class NameSpace(Enum):
     """The level of morphology abstraction that feature applies to."""
@@ -86,9 +158,166 @@ def _get_neurites_feature_value(feature_, obj, neurite_filter, **kwargs):
     )
 
 
+def _get_neurites_feature_values_by_type(feature_name, obj, neurite_types, **kwargs):
+    """Collects the values of a neurite feature for several neurite types at once.
+
+    The feature is computed once per neurite, and its value is added to the value of each type
+    whose filter accepts the neurite, instead of iterating over the neurites once per type.
+
+    Arguments:
+        feature_name(string): feature to extract
+        obj (Morphology|Population): morphology, population or list of morphologies
+        neurite_types (list[NeuriteType]): the neurite types
+        kwargs: parameters to forward to the feature function
+
+    Returns:
+        Tuple(dict, function): the feature value of each neurite type and the feature function, or
+        None if the feature can not be partitioned, i.e. it is not a neurite feature, the values
+        are read from the disk cache or the arguments are invalid. Then :func:`get` must be used
+        for each type.
+    """
+    if (
+        feature_name not in _NEURITE_FEATURES
+        or feature_name in _MORPHOLOGY_FEATURES
+        or _DISK_CACHE is not None
+        or 'section_type' in kwargs
+        or 'neurite_type' in kwargs
+    ):
+        return None
+    if isinstance(obj, Morphology):
+        morphs = [obj]
+    elif _is_morphology_collection(obj):
+        morphs = obj
+    else:
+        return None
+
+    feature_ = _NEURITE_FEATURES[feature_name]
+    mapfun = partial(feature_, **kwargs)
+    filters = [(neurite_type, is_type(neurite_type)) for neurite_type in neurite_types]
+    init = 0 if feature_.shape == () else []
+    values_per_morph = [_partition_neurites_feature_value(mapfun, m, filters, init) for m in morphs]
+
+    if isinstance(obj, Morphology):
+        return values_per_morph[0], feature_
+    return {
+        neurite_type: _flatten_feature(
+            feature_.shape, [values[neurite_type] for values in values_per_morph]
+        )
+        for neurite_type in neurite_types
+    }, feature_
+
+
+def _partition_neurites_feature_value(mapfun, morph, filters, init):
+    """Sum the values of `mapfun` on the neurites of a morphology for each type filter.
+
+    As in :func:`neurom.core.morphology.iter_neurites`, the sections of the neurites that process
+    their subtrees are filtered by type, so their values are computed for each matching type.
+    """
+    values = {neurite_type: init for neurite_type, _ in filters}
+    for neurite_ in iter_neurites(morph):
+        matching = [(neurite_type, filt) for neurite_type, filt in filters if filt(neurite_)]
+        if not matching:
+            continue
+        if neurite_.process_subtrees:
+            for neurite_type, filt in matching:
+                values[neurite_type] = values[neurite_type] + mapfun(
+                    neurite_, section_type=filt.type
+                )
+        else:
+            value = mapfun(neurite_, section_type=NeuriteType.all)
+            for neurite_type, _ in matching:
+                values[neurite_type] = values[neurite_type] + value
+    return values
+
+
+def _resolve_transformed_morphology(feature_name, obj, kwargs):
+    """Returns the morphology on which a feature must be computed for a transformed view.
+
+    The original morphology is used when the feature does not depend on the frame of reference,
+    otherwise the transformed morphology is materialized.
+    """
+    if (
+        obj.is_rigid
+        and feature_name in _FRAME_INVARIANT_FEATURES
+        and kwargs.get('origin') is None
+        and kwargs.get('center') is None
+    ):
+        return obj.original
+    return obj.morphology
+
+
+def set_disk_cache(cache):
+    """Set the disk cache of the feature values computed on morphologies.
+
+    Arguments:
+        cache (neurom.features.disk_cache.FeatureCache|None): the cache used by :func:`get` and
+            :func:`neurom.apps.morph_stats.extract_stats`, None to disable it
+
+    Returns:
+        The previous cache
+    """
+    global _DISK_CACHE  # pylint: disable=global-statement
+    previous, _DISK_CACHE = _DISK_CACHE, cache
+    return previous
+
+
+def _get_cached_feature_value_and_func(feature_name, obj, **kwargs):
+    """Obtain a feature of a morphology from the disk cache, or compute and store it."""
+    key = feature_key(feature_name, obj, kwargs)
+    if key is None:
+        return _compute_feature_value_and_func(feature_name, obj, **kwargs)
+    found, res = _DISK_CACHE.get(key)
+    if not found:
+        res, feature_ = _compute_feature_value_and_func(feature_name, obj, **kwargs)
+        _DISK_CACHE.set(key, res)
+        return res, feature_
+    return res, _MORPHOLOGY_FEATURES.get(feature_name) or _NEURITE_FEATURES[feature_name]
+
+
+def _get_cached_collection_value_and_func(feature_name, obj, **kwargs):
+    """Obtain a feature of a population from the disk cache of each of its morphologies."""
+    if 'section_type' in kwargs:
+        raise NeuroMError('Can not apply "section_type" arg to a Population')
+    values, feature_ = [], None
+    for morph in obj:
+        value, feature_ = _get_feature_value_and_func(feature_name, morph, **kwargs)
+        values.append(value)
+    if feature_ is None:
+        # the population is empty
+        return _compute_feature_value_and_func(feature_name, obj, **kwargs)
+    return _flatten_feature(feature_.shape, values), feature_
+
+
 def _get_feature_value_and_func(feature_name, obj, **kwargs):
     """Obtain a feature from a set of morphology objects.
 
+    The values computed on morphologies, alone or in a population, are read from and written to
+    the disk cache if it is set with :func:`set_disk_cache`.
+
+    Arguments:
+        feature_name(string): feature to extract
+        obj (Neurite|Morphology|TransformedMorphology|Population): neurite, morphology or
+            population
+        kwargs: parameters to forward to underlying worker functions
+
+    Returns:
+        Tuple(List|Number, function): A tuple (feature, func) of the feature value and its function.
+          Feature value can be a list or a number.
+    """
+    if isinstance(obj, TransformedMorphology):
+        obj = _resolve_transformed_morphology(feature_name, obj, kwargs)
+
+    if _DISK_CACHE is not None:
+        if isinstance(obj, Morphology):
+            return _get_cached_feature_value_and_func(feature_name, obj, **kwargs)
+        if feature_name not in _POPULATION_FEATURES and _is_morphology_collection(obj):
+            return _get_cached_collection_value_and_func(feature_name, obj, **kwargs)
+    return _compute_feature_value_and_func(feature_name, obj, **kwargs)
+
+
+def _compute_feature_value_and_func(feature_name, obj, **kwargs):
+    """Compute a feature from a set of morphology objects.
+
     Arguments:
         feature_name(string): feature to extract
         obj (Neurite|Morphology|Population): neurite, morphology or population
@@ -165,7 +394,7 @@ def _get_feature_value_and_func(feature_name, obj, **kwargs):
     return res, feature_
 
 
-def get(feature_name, obj, **kwargs):
+def get(feature_name, obj, executor=None, **kwargs):
     """Obtain a feature from a set of morphology objects.
 
     Features can be either Neurite, Morphology or Population features. For Neurite features see
@@ -175,14 +404,182 @@ def get(feature_name, obj, **kwargs):
     Arguments:
         feature_name(str): feature to extract
         obj: a morphology, a morphology population or a neurite tree
+        executor: how the Neurite and Morphology features of a population are computed on its
+            morphologies, see :mod:`neurom.parallel`. The Population features are always computed
+            in the current process
         kwargs: parameters to forward to underlying worker functions
 
     Returns:
         List|float: feature value as a list or a single number.
     """
+    if (
+        executor is not None
+        and feature_name not in _POPULATION_FEATURES
+        and _is_morphology_collection(obj)
+    ):
+        return _map_population_feature(feature_name, obj, executor, kwargs)
     return _get_feature_value_and_func(feature_name, obj, **kwargs)[0]
 
 
+def _is_morphology_collection(obj):
+    """Check if `obj` is a population or a list of morphologies."""
+    return isinstance(obj, Population) or (
+        isinstance(obj, (list, tuple)) and len(obj) > 0 and isinstance(obj[0], Morphology)
+    )
+
+
+def _map_population_feature(feature_name, obj, executor, kwargs):
+    """Compute a Neurite or Morphology feature on each morphology with an executor."""
+    if 'section_type' in kwargs:
+        raise NeuroMError('Can not apply "section_type" arg to a Population')
+    values = CompiledFeature(feature_name, **kwargs).map(obj, executor=executor)
+    feature_ = _MORPHOLOGY_FEATURES.get(feature_name) or _NEURITE_FEATURES[feature_name]
+    return _flatten_feature(feature_.shape, values)
+
+
+class _IgnoredMorphology:
+    """The result of a morphology whose loading raised an exception ignored by its population."""
+
+
+def _apply_compiled_feature(morph, compiled_feature, loader=None):
+    """The function applied to each morphology by :meth:`CompiledFeature.map`.
+
+    If `loader` is given, the morphology is loaded with the options of this population, like when
+    it is iterated.
+    """
+    if loader is not None:
+        morph = loader._load_file(morph)  # pylint: disable=protected-access
+        if morph is None:
+            return _IgnoredMorphology()
+    elif not isinstance(morph, Morphology):
+        morph = neurom.load_morphology(morph)
+    return compiled_feature(morph)
+
+
+class CompiledFeature:
+    """A feature whose function, neurite filter and arguments are resolved once.
+
+    See :func:`compile`.
+    """
+
+    def __init__(self, feature_name, **kwargs):
+        """Resolve a feature.
+
+        Arguments:
+            feature_name(str): feature to extract
+            kwargs: parameters to forward to underlying worker functions
+        """
+        if not any(
+            feature_name in features
+            for features in (_NEURITE_FEATURES, _MORPHOLOGY_FEATURES, _POPULATION_FEATURES)
+        ):
+            raise NeuroMError(
+                f'Cant apply "{feature_name}" feature. Please check that it exists. '
+                'See the features documentation page.'
+            )
+        self.name = feature_name
+        self.kwargs = kwargs
+
+        self._morphology_feature = _MORPHOLOGY_FEATURES.get(feature_name)
+        self._neurite_feature = _NEURITE_FEATURES.get(feature_name)
+        if self._neurite_feature is not None:
+            self._neurite_filter = is_type(kwargs.get('neurite_type', NeuriteType.all))
+            neurite_kwargs = {k: v for k, v in kwargs.items() if k != 'neurite_type'}
+            self._neurite_mapfun = partial(self._neurite_feature, **neurite_kwargs)
+            self._neurite_init = 0 if self._neurite_feature.shape == () else []
+
+        # the arguments that raise errors are handled by the generic dispatch
+        self._fast_morphology = 'section_type' not in kwargs and (
+            self._morphology_feature is not None or self._neurite_feature is not None
+        )
+        self._fast_neurite = 'neurite_type' not in kwargs and self._neurite_feature is not None
+
+    def __reduce__(self):
+        """Only the name and the arguments are pickled, the feature is resolved again."""
+        return _compile_feature, (self.name, self.kwargs)
+
+    def __call__(self, obj):
+        """Compute the feature on a neurite, morphology or population."""
+        if _DISK_CACHE is None:
+            if type(obj) is Morphology:  # pylint: disable=unidiomatic-typecheck
+                if self._fast_morphology:
+                    if self._morphology_feature is not None:
+                        return self._morphology_feature(obj, **self.kwargs)
+                    return reduce(
+                        operator.add,
+                        iter_neurites(obj, mapfun=self._neurite_mapfun, filt=self._neurite_filter),
+                        self._neurite_init,
+                    )
+            elif isinstance(obj, Neurite) and self._fast_neurite:
+                return self._neurite_mapfun(obj)
+        return _get_feature_value_and_func(self.name, obj, **self.kwargs)[0]
+
+    def map(self, morphs, n_workers=1, executor=None):
+        """Compute the feature on each morphology of a population or a collection.
+
+        Arguments:
+            morphs (Population|Iterable): the morphologies, or the paths to their files
+            n_workers (int): number of workers used to compute the feature, see
+                :func:`neurom.parallel.get_backend`
+            executor: how the feature is computed on the morphologies, see :mod:`neurom.parallel`.
+                The morphologies that are already loaded are serialized into a temporary archive
+                that the worker processes parse again, see
+                :func:`neurom.io.utils.archive_morphologies`.
+
+        Returns:
+            list: the feature value of each morphology
+        """
+        backend = get_backend(executor, n_workers)
+        if not backend.uses_processes:
+            return backend.map(partial(_apply_compiled_feature, compiled_feature=self), morphs)
+
+        loader = None
+        if isinstance(morphs, Population):
+            # the workers load the files with the options of the population, e.g. its ignored
+            # exceptions, from an empty population that is cheap to send to them
+            # pylint: disable=protected-access
+            loader = morphs._sub_population([])
+            morphs = [f for f in morphs._files if f is not None]
+
+        func = partial(_apply_compiled_feature, compiled_feature=self, loader=loader)
+        with tempfile.TemporaryDirectory(prefix='neurom-') as directory:
+            values = backend.map(func, neurom.io.utils.archive_morphologies(morphs, directory))
+        return [v for v in values if not isinstance(v, _IgnoredMorphology)]
+
+    def __repr__(self):
+        """Return a string representation."""
+        return f'CompiledFeature <name: {self.name}, kwargs: {self.kwargs}>'
+
+
+def _compile_feature(feature_name, kwargs):
+    """Create a CompiledFeature from its arguments, used to unpickle it."""
+    return CompiledFeature(feature_name, **kwargs)
+
+
+def compile(feature_name, **kwargs):  # pylint: disable=redefined-builtin
+    """Resolve a feature once, to apply it to many objects.
+
+    The feature function, the neurite type filter and the arguments are resolved when compiling,
+    instead of at each call of :func:`get`.
+
+    Arguments:
+        feature_name(str): feature to extract
+        kwargs: parameters to forward to underlying worker functions
+
+    Returns:
+        CompiledFeature: a callable such that ``compile(name, **kwargs)(obj)`` is equal to
+        ``get(name, obj, **kwargs)``. It can also be applied to each morphology of a population
+        with :meth:`CompiledFeature.map`.
+
+    Examples::
+
+        section_lengths = features.compile('section_lengths', neurite_type=NeuriteType.axon)
+        values = [section_lengths(m) for m in population]
+        values = section_lengths.map(population, n_workers=4)
+    """
+    return CompiledFeature(feature_name, **kwargs)
+
+
 def _register_feature(namespace: NameSpace, name, func, shape):
     """Register a feature to be applied.
 
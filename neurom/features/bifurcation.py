@@ -28,6 +28,8 @@
 
 """Bifurcation point functions."""
 
+from collections import namedtuple
+
 import numpy as np
 
 import neurom.features.section
@@ -36,6 +38,165 @@ from neurom.core.dataformat import COLS
 from neurom.core.morphology import Section
 from neurom.exceptions import NeuroMError
 
+BifurcationTable = namedtuple(
+    'BifurcationTable',
+    [
+        'section_ids',
+        'child_ids',
+        'radii',
+        'mean_radii',
+        'child_first_radii',
+        'child_mean_radii',
+        'local_directions',
+        'remote_directions',
+        'subtree_counts',
+        'subtree_lengths',
+        'total_length',
+    ],
+)
+BifurcationTable.__doc__ = """Properties of the bifurcation points of a tree, one row each.
+
+Attributes:
+    section_ids (numpy.ndarray): (n,) ids of the bifurcation sections
+    child_ids (numpy.ndarray): (n, 2) ids of their children
+    radii (numpy.ndarray): (n,) radii of the last points of the bifurcation sections
+    mean_radii (numpy.ndarray): (n,) mean radii of the bifurcation sections
+    child_first_radii (numpy.ndarray): (n, 2) radii of the second points of the children, the
+        first ones being the same as the last points of their parents
+    child_mean_radii (numpy.ndarray): (n, 2) mean radii of the children
+    local_directions (numpy.ndarray): (n, 2, 3) vectors from the bifurcation points to the first
+        points of the children that are not at the same place as their first points
+    remote_directions (numpy.ndarray): (n, 2, 3) vectors from the bifurcation points to the last
+        points of the children
+    subtree_counts (numpy.ndarray): (n, 2) number of sections in the subtrees of the children
+    subtree_lengths (numpy.ndarray): (n, 2) total length of the subtrees of the children
+    total_length (float): total length of the tree, i.e. the subtree length of its root
+"""
+
+
+_SectionArrays = namedtuple(
+    '_SectionArrays',
+    ['points', 'starts', 'ends', 'second_points', 'local_points', 'lengths', 'mean_radii'],
+)
+
+
+def _first_moved_points(points, starts, ends, point_sections, default):
+    """Index of the first point of each section that is not at the section's first point."""
+    moved = np.flatnonzero(
+        np.any(points[:, COLS.XYZ] != points[starts[point_sections], COLS.XYZ], axis=1)
+    )
+    if len(moved) == 0:
+        return default
+    first_moved = moved[np.minimum(np.searchsorted(moved, starts), len(moved) - 1)]
+    return np.where(first_moved <= ends, first_moved, default)
+
+
+def _section_arrays(sections):
+    """Concatenate the points of the sections and compute their lengths and mean radii.
+
+    The ``starts``, ``ends``, ``second_points`` and ``local_points`` are indices of points: the
+    first, last and second points of each section and the first point that is not at the same place
+    as the first one (the second point if there is none).
+    """
+    points = [section.points for section in sections]
+    sizes = np.array([len(p) for p in points], dtype=int)
+    ends = np.cumsum(sizes) - 1
+    starts = ends - sizes + 1
+    points = np.concatenate(points).astype(float)
+    point_sections = np.repeat(np.arange(len(sections)), sizes)
+
+    # the segments between consecutive points of a section
+    in_section = point_sections[:-1] == point_sections[1:]
+    segment_sections = point_sections[:-1][in_section]
+    segment_lengths = np.linalg.norm(np.diff(points[:, COLS.XYZ], axis=0), axis=1)[in_section]
+    segment_radii = 0.5 * (points[:-1, COLS.R] + points[1:, COLS.R])[in_section]
+    lengths = np.bincount(segment_sections, segment_lengths, minlength=len(sections))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_radii = (
+            np.bincount(segment_sections, segment_radii * segment_lengths, minlength=len(sections))
+            / lengths
+        )
+
+    second_points = np.minimum(starts + 1, ends)
+    local_points = _first_moved_points(points, starts, ends, point_sections, second_points)
+
+    return _SectionArrays(points, starts, ends, second_points, local_points, lengths, mean_radii)
+
+
+def _tree_topology(sections):
+    """Return the children indices and the subtree ends of sections given in pre-order.
+
+    In pre-order a subtree is a contiguous range of sections, the i-th one spans
+    ``i:subtree_ends[i]``.
+    """
+    index = {section.id: i for i, section in enumerate(sections)}
+    children = [[index[child.id] for child in section.children] for section in sections]
+    subtree_ends = np.arange(1, len(sections) + 1)
+    for i in reversed(range(len(sections))):
+        if children[i]:
+            subtree_ends[i] = subtree_ends[children[i][-1]]
+    return children, subtree_ends
+
+
+def _subtree_sums(values, subtree_ends):
+    """Sum the values of the sections of each subtree, the sections being in pre-order."""
+    cumsum = np.concatenate([[0.0], np.cumsum(values)])
+    return cumsum[subtree_ends] - cumsum[: len(values)]
+
+
+def bifurcation_table(root_section, bifurcation_filter=None, subtree_filter=None):
+    """Compute the bifurcation table of a tree in a single traversal.
+
+    The sections are visited once to gather their points, then the properties of all the
+    bifurcations are computed at once on the concatenated points.
+
+    Args:
+        root_section: the root section of the tree
+        bifurcation_filter: optional predicate on sections, only the bifurcation sections that
+            satisfy it are in the table
+        subtree_filter: optional predicate on sections, only the sections that satisfy it are
+            counted in the subtree counts and lengths
+
+    Returns:
+        BifurcationTable: the bifurcations in pre-order
+    """
+    sections = list(root_section.ipreorder())
+    children, subtree_ends = _tree_topology(sections)
+    arrays = _section_arrays(sections)
+
+    in_subtree = np.ones(len(sections), dtype=bool)
+    if subtree_filter is not None:
+        in_subtree = np.array([bool(subtree_filter(section)) for section in sections], dtype=bool)
+    subtree_counts = _subtree_sums(in_subtree.astype(float), subtree_ends)
+    subtree_lengths = _subtree_sums(np.where(in_subtree, arrays.lengths, 0.0), subtree_ends)
+
+    bifurcations = np.array(
+        [
+            i
+            for i, section in enumerate(sections)
+            if len(children[i]) == 2 and (bifurcation_filter is None or bifurcation_filter(section))
+        ],
+        dtype=int,
+    )
+    child_indices = np.array([children[i] for i in bifurcations], dtype=int).reshape(-1, 2)
+    ids = np.array([section.id for section in sections], dtype=int)
+    bifurcation_points = arrays.points[arrays.ends[bifurcations], np.newaxis, COLS.XYZ]
+
+    return BifurcationTable(
+        section_ids=ids[bifurcations],
+        child_ids=ids[child_indices],
+        radii=arrays.points[arrays.ends[bifurcations], COLS.R],
+        mean_radii=arrays.mean_radii[bifurcations],
+        child_first_radii=arrays.points[arrays.second_points[child_indices], COLS.R],
+        child_mean_radii=arrays.mean_radii[child_indices],
+        local_directions=arrays.points[arrays.local_points[child_indices], COLS.XYZ]
+        - bifurcation_points,
+        remote_directions=arrays.points[arrays.ends[child_indices], COLS.XYZ] - bifurcation_points,
+        subtree_counts=subtree_counts[child_indices],
+        subtree_lengths=subtree_lengths[child_indices],
+        total_length=float(subtree_lengths[0]),
+    )
+
 
 def _raise_if_not_bifurcation(section):
     n_children = len(section.children)
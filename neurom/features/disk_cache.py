@@ -0,0 +1,292 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Persistent on-disk cache of feature values.
+
+The values computed by :func:`neurom.features.get` and :func:`neurom.apps.morph_stats.extract_stats`
+on morphologies can be stored in a SQLite database, so that they are not computed again for the
+same morphologies, e.g. by jobs that run periodically on unchanged files. The entries are keyed by
+a hash of the content of the morphology (points, diameters, structure and soma), the NeuroM version,
+the feature name and its arguments.
+
+The database can be shared by several processes: SQLite serializes the writes, and the least
+recently used entries are evicted when the cache grows larger than its maximum size.
+
+Examples::
+
+    from neurom import features
+    from neurom.features.disk_cache import FeatureCache
+
+    features.set_disk_cache(FeatureCache('features.db', max_size=2**30))
+    features.get('total_length', morph)  # computed and stored
+    features.get('total_length', morph)  # read from the cache
+    features.set_disk_cache(None)
+"""
+import hashlib
+import inspect
+import json
+import logging
+import pickle
+import sqlite3
+import time
+import weakref
+from enum import Enum
+from pathlib import Path
+from types import ModuleType
+
+import morphio
+
+import neurom
+from neurom.utils import NeuromJSON
+
+L = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS features (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS features_accessed ON features (accessed);
+"""
+
+# the size of the cache is checked once every _EVICTION_PERIOD writes
+_EVICTION_PERIOD = 64
+
+# the access times of the read values are written once every _ACCESS_BATCH_SIZE reads
+_ACCESS_BATCH_SIZE = 256
+
+# content hashes of the morphologies with an immutable MorphIO object, which can not change
+_MORPHOLOGY_HASHES = weakref.WeakKeyDictionary()
+
+
+class _KeyEncoder(NeuromJSON):
+    """JSON encoder of feature arguments, that also handles enums and module level callables."""
+
+    def default(self, o):
+        """Encode enums with their names and module level functions or classes with their paths.
+
+        The other objects have no encoding that is stable across processes, they raise TypeError.
+        """
+        if isinstance(o, Enum):
+            return str(o)
+        if _is_module_level_callable(o):
+            return f'{o.__module__}.{o.__qualname__}'
+        return super().default(o)
+
+
+def _is_module_level_callable(obj):
+    """Check if `obj` is a function or class that can be found from its module and name."""
+    if inspect.isbuiltin(obj):
+        # the builtin methods are bound to an object, the builtin functions to their module
+        if not isinstance(obj.__self__, ModuleType):
+            return False
+    elif not inspect.isfunction(obj) and not inspect.isclass(obj):
+        return False
+    # lambdas and local functions can not be found from their names
+    return '<' not in obj.__qualname__
+
+
+def morphology_hash(morph):
+    """Hash of the content of a morphology: its points, diameters, structure and soma.
+
+    Arguments:
+        morph (neurom.core.morphology.Morphology): the morphology
+
+    Returns:
+        str: the SHA-256 hex digest
+    """
+    if morph in _MORPHOLOGY_HASHES:
+        return _MORPHOLOGY_HASHES[morph]
+
+    morphio_morph = morph.to_morphio()
+    is_immutable = isinstance(morphio_morph, morphio.Morphology)
+    if not is_immutable:
+        morphio_morph = morphio_morph.as_immutable()
+
+    digest = hashlib.sha256()
+    for array in (
+        morphio_morph.points,
+        morphio_morph.diameters,
+        morphio_morph.section_offsets,
+        morphio_morph.section_types,
+        morphio_morph.soma.points,
+        morphio_morph.soma.diameters,
+    ):
+        digest.update(array.tobytes())
+    digest.update(str(sorted(morphio_morph.connectivity.items())).encode())
+    digest.update(str(morphio_morph.soma.type).encode())
+    result = digest.hexdigest()
+
+    if is_immutable:
+        _MORPHOLOGY_HASHES[morph] = result
+    return result
+
+
+def feature_key(feature_name, morph, kwargs):
+    """The cache key of a feature computed on a morphology with the given arguments.
+
+    Returns:
+        str|None: the key, None if an argument has no encoding that is stable across processes,
+        e.g. a lambda, in which case the value must not be cached
+    """
+    try:
+        key = json.dumps(
+            [
+                neurom.__version__,
+                feature_name,
+                morphology_hash(morph),
+                morph.process_subtrees,
+                kwargs,
+            ],
+            sort_keys=True,
+            cls=_KeyEncoder,
+        )
+    except TypeError as e:
+        L.debug('The feature %s is not cached: %s', feature_name, e)
+        return None
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class FeatureCache:
+    """A SQLite cache of feature values with a least recently used eviction."""
+
+    def __init__(self, path, max_size=2**30, timeout=60):
+        """Open or create a feature cache.
+
+        Arguments:
+            path (str|Path): path to the SQLite database
+            max_size (int): maximum size in bytes of the stored values. It is checked periodically
+                so it can be exceeded by the values written since the last check.
+            timeout (float): number of seconds to wait for the lock of the database when it is
+                written by other processes
+        """
+        self.path = Path(path)
+        self.max_size = max_size
+        self._timeout = timeout
+        self._n_writes = 0
+        self._accessed = {}
+        self._connection = self._connect()
+
+    def _connect(self):
+        connection = sqlite3.connect(str(self.path), timeout=self._timeout)
+        # the write-ahead log lets readers work while another process writes
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def __getstate__(self):
+        """Only the settings are pickled, the database is opened again when unpickled."""
+        return self.path, self.max_size, self._timeout
+
+    def __setstate__(self, state):
+        """Open the database again when unpickled."""
+        self.__init__(*state)
+
+    def close(self):
+        """Write the pending access times and close the database connection."""
+        self.flush()
+        self._connection.close()
+
+    def __len__(self):
+        """Number of cached values."""
+        return self._connection.execute('SELECT COUNT(*) FROM features').fetchone()[0]
+
+    @property
+    def size(self):
+        """Total size in bytes of the cached values."""
+        return self._connection.execute('SELECT TOTAL(size) FROM features').fetchone()[0]
+
+    def get(self, key):
+        """Return a tuple (found, value) for the given key.
+
+        The access times are written in batches by :meth:`flush`, so that the processes that only
+        read the cache rarely wait for the write lock of the database.
+        """
+        row = self._connection.execute(
+            'SELECT value FROM features WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return False, None
+        self._accessed[key] = time.time()
+        if len(self._accessed) >= _ACCESS_BATCH_SIZE:
+            self.flush()
+        return True, pickle.loads(row[0])
+
+    def flush(self):
+        """Write the access times of the values read since the last flush."""
+        if not self._accessed:
+            return
+        with self._connection:
+            self._connection.executemany(
+                'UPDATE features SET accessed = ? WHERE key = ?',
+                [(accessed, key) for key, accessed in self._accessed.items()],
+            )
+        self._accessed.clear()
+
+    def set(self, key, value):
+        """Store a value."""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO features VALUES (?, ?, ?, ?)',
+                (key, data, len(data), time.time()),
+            )
+        self._n_writes += 1
+        if self._n_writes % _EVICTION_PERIOD == 0:
+            self.evict()
+
+    def evict(self):
+        """Remove the least recently used values until the cache is smaller than its maximum size.
+
+        Returns:
+            int: the number of removed values
+        """
+        self.flush()
+        with self._connection:
+            excess = self.size - self.max_size
+            if excess <= 0:
+                return 0
+            keys = []
+            for key, size in self._connection.execute(
+                'SELECT key, size FROM features ORDER BY accessed'
+            ):
+                keys.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            self._connection.executemany('DELETE FROM features WHERE key = ?', keys)
+        L.debug('Evicted %d values from the feature cache %s', len(keys), self.path)
+        return len(keys)
+
+    def clear(self):
+        """Remove all the cached values."""
+        with self._connection:
+            self._connection.execute('DELETE FROM features')
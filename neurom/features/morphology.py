@@ -44,9 +44,11 @@ For more details see :ref:`features`.
 """
 
 import warnings
+import weakref
 from collections.abc import Iterable
 from functools import partial
 
+import morphio
 import numpy as np
 
 import neurom.core.soma
@@ -65,11 +67,16 @@ from neurom.exceptions import NeuroMError
 from neurom.features import NameSpace, feature
 from neurom.features import neurite as nf
 from neurom.features import section as sf
-from neurom.morphmath import convex_hull
+from neurom.morphmath import convex_hull, hull_summary
 from neurom.utils import flatten, str_to_plane
 
 feature = partial(feature, namespace=NameSpace.NEURON)
 
+_PROJECTION_AXES = {"xy": COLS.XY, "xz": COLS.XZ, "yz": COLS.YZ}
+
+# convex hulls of the immutable morphologies, shared by the shape features
+_CONVEX_HULLS = weakref.WeakKeyDictionary()
+
 
 def _assert_soma_center(morph):
     if morph.soma.center is None:
@@ -118,6 +125,65 @@ def _get_points(morph, neurite_type):
     return list(iter_points(morph, **_filter_mode(morph, neurite_type)))
 
 
+def _get_point_array(morph, neurite_type):
+    sections = _get_sections(morph, neurite_type)
+    if not sections:
+        return np.empty(shape=(0, 3))
+    return np.concatenate([section.points[:, COLS.XYZ] for section in sections])
+
+
+def _projection_plane_key(projection_plane):
+    key = "".join(sorted(projection_plane.lower()))
+    if key not in _PROJECTION_AXES:
+        raise NeuroMError(
+            f"Invalid 'projection_plane' argument {projection_plane}. "
+            f"Please select 'xy', 'xz', or 'yz'."
+        )
+    return key
+
+
+def _neurite_type_key(neurite_type):
+    """Get a hashable key of a neurite type or of a list or tuple of them."""
+    if isinstance(neurite_type, (list, tuple)):
+        return frozenset(NeuriteType(t) for t in neurite_type)
+    return NeuriteType(neurite_type)
+
+
+def _convex_hull(morph, neurite_type, plane=None):
+    """Get the convex hull of the morphology points, projected on a plane if given.
+
+    The hulls of the immutable morphologies are cached. The projection of a convex hull is the
+    convex hull of its projected vertices, so the projected hulls are computed from the vertices
+    of the 3D hull when it is already cached.
+
+    Returns:
+        neurom.morphmath.HullSummary object, None if there are no points or the hull computation
+        fails
+    """
+    if isinstance(morph.to_morphio(), morphio.Morphology):
+        hulls = _CONVEX_HULLS.setdefault(morph, {})
+    else:
+        hulls = {}
+
+    type_key = _neurite_type_key(neurite_type)
+    key = (type_key, morph.process_subtrees, plane)
+    if key in hulls:
+        return hulls[key]
+
+    hull_3d = hulls.get((type_key, morph.process_subtrees, None))
+    if plane is not None and hull_3d is not None:
+        points = hull_3d.vertices
+    else:
+        points = _get_point_array(morph, neurite_type)
+
+    if plane is not None:
+        points = points[:, _PROJECTION_AXES[plane]]
+
+    hull = convex_hull(points) if len(points) > 0 else None
+    hulls[key] = None if hull is None else hull_summary(hull)
+    return hulls[key]
+
+
 @feature(shape=())
 def soma_volume(morph):
     """Get the volume of a morphology's soma."""
@@ -280,15 +346,38 @@ def trunk_origin_elevations(morph, neurite_type=NeuriteType.all):
     return _map_neurite_root_nodes(elevation, morph, neurite_type)
 
 
-@feature(shape=(...,))
-def trunk_vectors(morph, neurite_type=NeuriteType.all):
-    """Calculate the vectors between all the trunks of the morphology and the soma center."""
+def _trunk_vectors_by_type(morph, *neurite_types):
+    """Return the trunk vectors of each neurite type, computed once for all types.
+
+    As in :func:`_map_neurite_root_nodes`, a neurite matches a type if its root type does.
+    """
     _assert_soma_center(morph)
+    neurites = list(iter_neurites(morph))
+    if not neurites:
+        return [np.empty((0, 3)) for _ in neurite_types]
 
-    def vector_from_soma_to_root(root_node):
-        return morphmath.vector(root_node.points[0], morph.soma.center)
+    vectors = np.array(
+        [morphmath.vector(neurite.root_node.points[0], morph.soma.center) for neurite in neurites]
+    )
+    if all(neurite_type == NeuriteType.all for neurite_type in neurite_types):
+        # the root type is not defined for all the neurites, e.g. with process subtrees
+        return [vectors for _ in neurite_types]
 
-    return _map_neurite_root_nodes(vector_from_soma_to_root, morph, neurite_type)
+    root_types = [neurite.type.root_type for neurite in neurites]
+    return [
+        (
+            vectors
+            if neurite_type == NeuriteType.all
+            else vectors[[neurite_type == root_type for root_type in root_types]]
+        )
+        for neurite_type in neurite_types
+    ]
+
+
+@feature(shape=(...,))
+def trunk_vectors(morph, neurite_type=NeuriteType.all):
+    """Calculate the vectors between all the trunks of the morphology and the soma center."""
+    return list(_trunk_vectors_by_type(morph, neurite_type)[0])
 
 
 @feature(shape=(...,))
@@ -321,50 +410,32 @@ def trunk_angles(
             The angles between each trunk and all the others. If ``consecutive_only`` is ``True``,
             only the angle with the next trunk is returned for each trunk.
     """
-    vectors = np.array(trunk_vectors(morph, neurite_type=neurite_type))
+    vectors = _trunk_vectors_by_type(morph, neurite_type)[0]
     # In order to avoid the failure of the process in case the neurite_type does not exist
     if len(vectors) == 0:
         return []
 
     if sort_along:
-        # Sorting angles according to the given plane
-        sort_coords = str_to_plane(sort_along)
-        order = np.argsort(
-            np.fromiter(
-                (
-                    morphmath.angle_between_projections(i / np.linalg.norm(i), [0, 1])
-                    for i in vectors[:, sort_coords]
-                ),
-                dtype=float,
-            )
-        )
+        # Sorting angles according to the given plane, i.e. from the angles between the
+        # normalized projections and the [0, 1] direction
+        projections = vectors[:, str_to_plane(sort_along)]
+        projections = projections / np.linalg.norm(projections, axis=1)[:, np.newaxis]
+        order = np.argsort(np.arctan2(projections[:, 1], projections[:, 0]) - np.arctan2(1.0, 0.0))
         vectors = vectors[order]
 
     # Select coordinates to consider
     if coords_only:
-        coords = str_to_plane(coords_only)
-        vectors = vectors[:, coords]
+        vectors = vectors[:, str_to_plane(coords_only)]
 
-    # Compute angles between each trunk and the next ones
+    # Angles between each trunk and the next ones, in cyclic order
     n_vectors = len(vectors)
-    cycling_vectors = np.vstack([vectors, vectors])
-    angles = [
-        (
-            num_i,
-            [
-                morphmath.angle_between_vectors(i, j)
-                for j in cycling_vectors[num_i : num_i + n_vectors]
-            ],
-        )
-        for num_i, i in enumerate(vectors)
-    ]
+    angles = morphmath.angles_between_vectors(vectors[:, np.newaxis], vectors[np.newaxis])
+    cyclic = (np.arange(n_vectors)[:, np.newaxis] + np.arange(n_vectors)) % n_vectors
+    angles = np.take_along_axis(angles, cyclic, axis=1)
 
     if consecutive_only:
-        angles = [i[1][-1] for i in angles if i[1]]
-    else:
-        angles = [i[1] for i in angles]
-
-    return angles
+        return angles[:, -1].tolist()
+    return angles.tolist()
 
 
 @feature(shape=(...,))
@@ -400,21 +471,22 @@ def trunk_angles_inter_types(
             If ``closest_component`` is not ``None``, only one of these values is returned for each
             couple.
     """
-    source_vectors = trunk_vectors(morph, neurite_type=source_neurite_type)
-    target_vectors = trunk_vectors(morph, neurite_type=target_neurite_type)
+    source_vectors, target_vectors = _trunk_vectors_by_type(
+        morph, source_neurite_type, target_neurite_type
+    )
 
     # In order to avoid the failure of the process in case the neurite_type does not exist
     if len(source_vectors) == 0 or len(target_vectors) == 0:
         return []
 
     angles = np.empty((len(source_vectors), len(target_vectors), 3), dtype=float)
-
-    for i, source in enumerate(source_vectors):
-        for j, target in enumerate(target_vectors):
-            angles[i, j, 0] = morphmath.angle_between_vectors(source, target)
-            angles[i, j, [1, 2]] = morphmath.spherical_from_vector(
-                target
-            ) - morphmath.spherical_from_vector(source)
+    angles[:, :, 0] = morphmath.angles_between_vectors(
+        source_vectors[:, np.newaxis], target_vectors[np.newaxis]
+    )
+    angles[:, :, 1:] = (
+        morphmath.spherical_from_vectors(target_vectors)[np.newaxis]
+        - morphmath.spherical_from_vectors(source_vectors)[:, np.newaxis]
+    )
 
     # Ensure elevation differences are in [-pi, pi]
     angles[:, :, 1] = morphmath.angles_to_pi_interval(angles[:, :, 1])
@@ -454,18 +526,17 @@ def trunk_angles_from_vector(
     if vector is None:
         vector = (0, 1, 0)
 
-    vectors = np.array(trunk_vectors(morph, neurite_type=neurite_type))
+    vectors = _trunk_vectors_by_type(morph, neurite_type)[0]
 
     # In order to avoid the failure of the process in case the neurite_type does not exist
     if len(vectors) == 0:
         return []
 
     angles = np.empty((len(vectors), 3), dtype=float)
-    for i, i_vec in enumerate(vectors):
-        angles[i, 0] = morphmath.angle_between_vectors(vector, i_vec)
-        angles[i, (1, 2)] = morphmath.spherical_from_vector(
-            i_vec
-        ) - morphmath.spherical_from_vector(vector)
+    angles[:, 0] = morphmath.angles_between_vectors(vector, vectors)
+    angles[:, 1:] = morphmath.spherical_from_vectors(vectors) - morphmath.spherical_from_vector(
+        vector
+    )
 
     # Ensure elevation difference are in [-pi, pi]
     angles[:, 1] = morphmath.angles_to_pi_interval(angles[:, 1])
@@ -733,12 +804,7 @@ def volume_density(morph, neurite_type=NeuriteType.all):
     .. note:: Returns `np.nan` if the convex hull computation fails or there are not points
               available due to neurite type filtering.
     """
-    points = _get_points(morph, neurite_type)
-
-    if not points:
-        return np.nan
-
-    morph_hull = convex_hull(points)
+    morph_hull = _convex_hull(morph, neurite_type)
 
     if morph_hull is None:
         return np.nan
@@ -749,23 +815,9 @@ def volume_density(morph, neurite_type=NeuriteType.all):
 
 
 def _unique_projected_points(morph, projection_plane, neurite_type):
-    key = "".join(sorted(projection_plane.lower()))
-
-    try:
-        axes = {"xy": COLS.XY, "xz": COLS.XZ, "yz": COLS.YZ}[key]
-
-    except KeyError as e:
-        raise NeuroMError(
-            f"Invalid 'projection_plane' argument {projection_plane}. "
-            f"Please select 'xy', 'xz', or 'yz'."
-        ) from e
-
-    points = _get_points(morph, neurite_type)
-
-    if len(points) == 0:
-        return np.empty(shape=(0, 3), dtype=np.float32)
-
-    return np.unique(np.vstack(points), axis=0)[:, axes]
+    axes = _PROJECTION_AXES[_projection_plane_key(projection_plane)]
+    # pylint: disable=protected-access
+    return nf._unique_points(_get_sections(morph, neurite_type), axes)
 
 
 @feature(shape=())
@@ -779,9 +831,14 @@ def aspect_ratio(morph, neurite_type=NeuriteType.all, projection_plane="xy"):
 
     Returns:
         The aspect ratio feature of the morphology points.
+
+    .. note:: Returns `np.nan` if there are less than two unique projected points, for which the
+              principal directions are not defined.
     """
     projected_points = _unique_projected_points(morph, projection_plane, neurite_type)
-    return np.nan if len(projected_points) == 0 else morphmath.aspect_ratio(projected_points)
+    if len(projected_points) < 2:
+        return np.nan
+    return morphmath.aspect_ratio(projected_points, remove_duplicates=False)
 
 
 @feature(shape=())
@@ -799,9 +856,13 @@ def circularity(morph, neurite_type=NeuriteType.all, projection_plane="xy"):
 
     Returns:
         The circularity of the morphology points.
+
+    .. note:: Returns `np.nan` if the convex hull computation fails, e.g. for less than three
+              points or collinear points, or there are not points available due to neurite type
+              filtering.
     """
-    projected_points = _unique_projected_points(morph, projection_plane, neurite_type)
-    return np.nan if len(projected_points) == 0 else morphmath.circularity(projected_points)
+    hull = _convex_hull(morph, neurite_type, _projection_plane_key(projection_plane))
+    return np.nan if hull is None else morphmath.circularity(hull)
 
 
 @feature(shape=())
@@ -819,9 +880,13 @@ def shape_factor(morph, neurite_type=NeuriteType.all, projection_plane="xy"):
 
     Returns:
         The shape factor of the morphology points.
+
+    .. note:: Returns `np.nan` if the convex hull computation fails, e.g. for less than three
+              points or collinear points, or there are not points available due to neurite type
+              filtering.
     """
-    projected_points = _unique_projected_points(morph, projection_plane, neurite_type)
-    return np.nan if len(projected_points) == 0 else morphmath.shape_factor(projected_points)
+    hull = _convex_hull(morph, neurite_type, _projection_plane_key(projection_plane))
+    return np.nan if hull is None else morphmath.shape_factor(hull)
 
 
 @feature(shape=())
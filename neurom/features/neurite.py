@@ -51,7 +51,7 @@ import numpy as np
 
 from neurom import morphmath, utils
 from neurom.core.dataformat import COLS
-from neurom.core.morphology import Section, iter_points
+from neurom.core.morphology import Section, iter_sections
 from neurom.core.types import NeuriteType, is_composite_type
 from neurom.core.types import tree_type_checker as is_type
 from neurom.features import NameSpace
@@ -65,8 +65,8 @@ feature = partial(feature, namespace=NameSpace.NEURITE)
 L = logging.getLogger(__name__)
 
 
-def _map_sections(fun, neurite, iterator_type=Section.ipreorder, section_type=NeuriteType.all):
-    """Map `fun` to all the sections."""
+def _section_filter(iterator_type, section_type):
+    """Get the predicate selecting the sections of the given type visited by `iterator_type`."""
     check_type = is_type(section_type)
 
     if (
@@ -78,12 +78,122 @@ def _map_sections(fun, neurite, iterator_type=Section.ipreorder, section_type=Ne
         def filt(section):
             return check_type(section) and Section.is_homogeneous_point(section)
 
-    else:
-        filt = check_type
+        return filt
+
+    return check_type
+
 
+def _map_sections(fun, neurite, iterator_type=Section.ipreorder, section_type=NeuriteType.all):
+    """Map `fun` to all the sections."""
+    filt = _section_filter(iterator_type, section_type)
     return list(map(fun, filter(filt, iterator_type(neurite.root_node))))
 
 
+def _bifurcation_table(neurite, section_type, filter_subtrees=False):
+    """Get the bifurcation table of the bifurcations of the given type.
+
+    If `filter_subtrees` is True, only the sections of the given type are counted in the subtrees.
+    """
+    return bf.bifurcation_table(
+        neurite.root_node,
+        bifurcation_filter=_section_filter(Section.ibifurcation_point, section_type),
+        subtree_filter=is_type(section_type) if filter_subtrees else None,
+    )
+
+
+def _bifurcation_angles(directions):
+    """Get the angles between the directions of the two children of the bifurcations."""
+    return morphmath.angles_3points(np.zeros(3), directions[:, 0], directions[:, 1])
+
+
+def _check_radius_method(method):
+    if method not in {'first', 'mean'}:
+        raise ValueError('Please provide a valid method for sibling ratio, found %s' % method)
+
+
+def _concatenated_points(sections):
+    """Concatenate the points of the sections.
+
+    Returns:
+        tuple: the concatenated XYZ coordinates as floats, the indices of the first and last points
+        of each section and the mask of the consecutive points that form the segments
+    """
+    points = [section.points[:, COLS.XYZ] for section in sections]
+    sizes = np.array([len(p) for p in points], dtype=int)
+    ends = np.cumsum(sizes) - 1
+    starts = ends - sizes + 1
+    segments = np.ones(max(ends[-1], 0), dtype=bool)
+    # the last point of a section and the first one of the next do not form a segment
+    segments[ends[:-1]] = False
+    return np.concatenate(points).astype(float), starts, ends, segments
+
+
+def _section_end_values(values, sections, ends, neurite, iterator_type, section_type):
+    """Get the values of the last points of the sections visited by `iterator_type`.
+
+    `values` are the values of the concatenated points of `sections`, which are in pre-order.
+    """
+    index = {section.id: i for i, section in enumerate(sections)}
+    filt = _section_filter(iterator_type, section_type)
+    return [
+        float(values[ends[index[section.id]]])
+        for section in filter(filt, iterator_type(neurite.root_node))
+    ]
+
+
+def _path_distances(neurite):
+    """Get the path distances from the first point of the neurite to all its points.
+
+    The sections are visited once in pre-order, the path distance of the first point of a section
+    being the one of the last point of its parent.
+
+    Returns:
+        tuple: the sections in pre-order, the indices of their first and last points and the path
+        distances of their concatenated points
+    """
+    sections = list(neurite.root_node.ipreorder())
+    points, starts, ends, segments = _concatenated_points(sections)
+
+    interval_lengths = np.where(segments, np.linalg.norm(np.diff(points, axis=0), axis=1), 0.0)
+    cumulative = np.concatenate([[0.0], np.cumsum(interval_lengths)])
+    lengths = cumulative[ends] - cumulative[starts]
+
+    index = {section.id: i for i, section in enumerate(sections)}
+    offsets = np.zeros(len(sections))
+    for i in range(1, len(sections)):
+        parent = index[sections[i].parent.id]
+        offsets[i] = offsets[parent] + lengths[parent]
+
+    return (
+        sections,
+        starts,
+        ends,
+        cumulative + np.repeat(offsets - cumulative[starts], ends - starts + 1),
+    )
+
+
+def _radial_distances(neurite, origin):
+    """Get the distances from the origin to all the points and segment midpoints of the neurite.
+
+    Returns:
+        tuple: the sections in pre-order, the indices of their last points, the distances of their
+        concatenated points and the distances of the midpoints of their concatenated segments
+    """
+    if origin is None:
+        origin = neurite.root_node.points[0]
+    origin = np.asarray(origin, dtype=float)[COLS.XYZ]
+
+    sections = list(neurite.root_node.ipreorder())
+    points, _, ends, segments = _concatenated_points(sections)
+    midpoints = 0.5 * (points[:-1] + points[1:])[segments]
+    return (
+        sections,
+        ends,
+        np.linalg.norm(points - origin, axis=1),
+        np.linalg.norm(midpoints - origin, axis=1),
+    )
+
+
 @feature(shape=())
 def number_of_segments(neurite, section_type=NeuriteType.all):
     """Number of segments."""
@@ -182,12 +292,8 @@ def section_term_branch_orders(neurite, section_type=NeuriteType.all):
 @feature(shape=(...,))
 def section_path_distances(neurite, iterator_type=Section.ipreorder, section_type=NeuriteType.all):
     """Path lengths."""
-    return _map_sections(
-        partial(sf.section_path_length, stop_node=neurite.root_node),
-        neurite,
-        iterator_type=iterator_type,
-        section_type=section_type,
-    )
+    sections, _, ends, distances = _path_distances(neurite)
+    return _section_end_values(distances, sections, ends, neurite, iterator_type, section_type)
 
 
 ################################################################################
@@ -195,6 +301,31 @@ def section_path_distances(neurite, iterator_type=Section.ipreorder, section_typ
 ################################################################################
 
 
+def _unique_points(sections, axes=COLS.XYZ):
+    """Get the unique points of sections given in pre-order, restricted to the given axes.
+
+    The first point of a section usually duplicates the last point of its parent, it is dropped by
+    construction when the parent is among the sections. The remaining duplicates are removed by
+    hashing the points.
+    """
+    last_points = {}
+    points = []
+    for section in sections:
+        section_points = section.points[:, COLS.XYZ]
+        if not section.is_root():
+            parent_last_point = last_points.get(section.parent.id)
+            if parent_last_point is not None and np.array_equal(
+                section_points[0], parent_last_point
+            ):
+                section_points = section_points[1:]
+        last_points[section.id] = section.points[-1, COLS.XYZ]
+        points.append(section_points[:, axes])
+
+    if not points:
+        return np.empty(shape=(0, len(range(3)[axes])))
+    return morphmath.unique_points(np.concatenate(points))
+
+
 def _map_segments(func, neurite, section_type=NeuriteType.all):
     """Map `func` to all the segments.
 
@@ -261,52 +392,40 @@ def segment_midpoints(neurite, section_type=NeuriteType.all):
 @feature(shape=(...,))
 def segment_path_lengths(neurite, section_type=NeuriteType.all):
     """Returns pathlengths between all non-root points and their root point."""
-    pathlength = {}
-
-    def segments_path_length(section):
-        if section.id not in pathlength:
-            pathlength[section.id] = (
-                0.0
-                if section.id == neurite.root_node.id
-                else section.parent.length + pathlength[section.parent.id]
-            )
-
-        return pathlength[section.id] + np.cumsum(sf.segment_lengths(section))
-
-    return _map_segments(segments_path_length, neurite, section_type=section_type)
+    sections, starts, ends, distances = _path_distances(neurite)
+    filt = is_type(section_type)
+    return np.concatenate(
+        [[]]
+        + [
+            distances[start + 1 : end + 1]
+            for section, start, end in zip(sections, starts, ends)
+            if filt(section)
+        ]
+    ).tolist()
 
 
 @feature(shape=(...,))
 def segment_radial_distances(neurite, origin=None, section_type=NeuriteType.all):
     """Returns the list of distances between all segment mid points and origin."""
-    origin = neurite.root_node.points[0, COLS.XYZ] if origin is None else origin
-    return _map_segments(
-        func=partial(sf.segment_midpoint_radial_distances, origin=origin),
-        neurite=neurite,
-        section_type=section_type,
-    )
+    sections, ends, _, distances = _radial_distances(neurite, origin)
+    filt = is_type(section_type)
+    selected = np.array([filt(section) for section in sections], dtype=bool)
+    # the segments of a section are its points but the first one
+    return distances[np.repeat(selected, np.diff(ends, prepend=-1) - 1)].tolist()
 
 
 @feature(shape=(...,))
 def local_bifurcation_angles(neurite, section_type=NeuriteType.all):
     """Get a list of local bf angles."""
-    return _map_sections(
-        bf.local_bifurcation_angle,
-        neurite,
-        iterator_type=Section.ibifurcation_point,
-        section_type=section_type,
-    )
+    table = _bifurcation_table(neurite, section_type)
+    return _bifurcation_angles(table.local_directions).tolist()
 
 
 @feature(shape=(...,))
 def remote_bifurcation_angles(neurite, section_type=NeuriteType.all):
     """Get a list of remote bf angles."""
-    return _map_sections(
-        bf.remote_bifurcation_angle,
-        neurite,
-        iterator_type=Section.ibifurcation_point,
-        section_type=section_type,
-    )
+    table = _bifurcation_table(neurite, section_type)
+    return _bifurcation_angles(table.remote_directions).tolist()
 
 
 @feature(shape=(...,))
@@ -330,27 +449,19 @@ def partition_asymmetry(
             f"Expected 'petilla' or 'uylings', got {method}."
         )
 
-    # create a downstream iterator that is filtered by the section type
-    it_type = utils.filtered_iterator(is_type(section_type), Section.ipreorder)
+    # the subtrees are filtered by the section type
+    table = _bifurcation_table(neurite, section_type, filter_subtrees=True)
 
     if variant == 'branch-order':
-        return _map_sections(
-            partial(bf.partition_asymmetry, uylings=method == 'uylings', iterator_type=it_type),
-            neurite,
-            iterator_type=Section.ibifurcation_point,
-            section_type=section_type,
-        )
+        n, m = table.subtree_counts.T
+        c = 2.0 if method == 'uylings' else 0.0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # by definition the asymmetry A(1, 1) is zero
+            asymmetries = np.where((n == 1) & (m == 1), 0.0, np.abs(n - m) / np.abs(n + m - c))
+        return asymmetries.tolist()
 
-    return _map_sections(
-        partial(
-            bf.downstream_pathlength_asymmetry,
-            normalization_length=total_length(neurite, section_type=section_type),
-            iterator_type=it_type,
-        ),
-        neurite,
-        iterator_type=Section.ibifurcation_point,
-        section_type=section_type,
-    )
+    lengths = table.subtree_lengths
+    return (np.abs(lengths[:, 0] - lengths[:, 1]) / table.total_length).tolist()
 
 
 @feature(shape=(...,))
@@ -365,9 +476,8 @@ def partition_asymmetry_length(neurite, method='petilla', section_type=NeuriteTy
 @feature(shape=(...,))
 def bifurcation_partitions(neurite, section_type=NeuriteType.all):
     """Partition at bf points."""
-    return _map_sections(
-        bf.bifurcation_partition, neurite, Section.ibifurcation_point, section_type=section_type
-    )
+    counts = _bifurcation_table(neurite, section_type).subtree_counts
+    return (counts.max(axis=1, initial=0) / counts.min(axis=1, initial=np.inf)).tolist()
 
 
 @feature(shape=(...,))
@@ -379,12 +489,10 @@ def sibling_ratios(neurite, method='first', section_type=NeuriteType.all):
     0 and 1. Method argument allows one to consider mean diameters
     along the child section instead of diameter of the first point.
     """
-    return _map_sections(
-        partial(bf.sibling_ratio, method=method),
-        neurite,
-        Section.ibifurcation_point,
-        section_type=section_type,
-    )
+    _check_radius_method(method)
+    table = _bifurcation_table(neurite, section_type)
+    radii = table.child_first_radii if method == 'first' else table.child_mean_radii
+    return (radii.min(axis=1, initial=np.inf) / radii.max(axis=1, initial=0)).tolist()
 
 
 @feature(shape=(..., 2))
@@ -394,9 +502,7 @@ def partition_pairs(neurite, section_type=NeuriteType.all):
     Partition pair is defined as the number of bifurcations at the two
     daughters of the bifurcating section
     """
-    return _map_sections(
-        bf.partition_pair, neurite, Section.ibifurcation_point, section_type=section_type
-    )
+    return _bifurcation_table(neurite, section_type).subtree_counts.tolist()
 
 
 @feature(shape=(...,))
@@ -408,24 +514,18 @@ def diameter_power_relations(neurite, method='first', section_type=NeuriteType.a
     This quantity gives an indication of how far the branching is from
     the Rall ratio (when =1).
     """
-    return _map_sections(
-        partial(bf.diameter_power_relation, method=method),
-        neurite,
-        Section.ibifurcation_point,
-        section_type=section_type,
-    )
-
+    _check_radius_method(method)
+    table = _bifurcation_table(neurite, section_type)
+    if method == 'first':
+        radii, child_radii = table.radii, table.child_first_radii
+    else:
+        radii, child_radii = table.mean_radii, table.child_mean_radii
+    return np.sum((radii[:, np.newaxis] / child_radii) ** 1.5, axis=1).tolist()
 
-def _radial_distances(neurite, origin, iterator_type, section_type):
-    if origin is None:
-        origin = neurite.root_node.points[0]
 
-    return _map_sections(
-        partial(sf.section_radial_distance, origin=origin),
-        neurite=neurite,
-        iterator_type=iterator_type,
-        section_type=section_type,
-    )
+def _section_radial_distances(neurite, origin, iterator_type, section_type):
+    sections, ends, distances, _ = _radial_distances(neurite, origin)
+    return _section_end_values(distances, sections, ends, neurite, iterator_type, section_type)
 
 
 @feature(shape=(...,))
@@ -435,13 +535,13 @@ def section_radial_distances(neurite, origin=None, section_type=NeuriteType.all)
     The iterator_type can be used to select only terminal sections (ileaf)
     or only bifurcations (ibifurcation_point).
     """
-    return _radial_distances(neurite, origin, Section.ipreorder, section_type)
+    return _section_radial_distances(neurite, origin, Section.ipreorder, section_type)
 
 
 @feature(shape=(...,))
 def section_term_radial_distances(neurite, origin=None, section_type=NeuriteType.all):
     """Get the radial distances of the termination sections."""
-    return _radial_distances(neurite, origin, Section.ileaf, section_type)
+    return _section_radial_distances(neurite, origin, Section.ileaf, section_type)
 
 
 @feature(shape=())
@@ -456,7 +556,7 @@ def max_radial_distance(neurite, origin=None, section_type=NeuriteType.all):
 @feature(shape=(...,))
 def section_bif_radial_distances(neurite, origin=None, section_type=NeuriteType.all):
     """Get the radial distances of the bf sections."""
-    return _radial_distances(neurite, origin, Section.ibifurcation_point, section_type)
+    return _section_radial_distances(neurite, origin, Section.ibifurcation_point, section_type)
 
 
 @feature(shape=(...,))
@@ -480,12 +580,12 @@ def volume_density(neurite, section_type=NeuriteType.all):
     neurite_volume = total_volume(neurite, section_type=section_type)
 
     def get_points(section):
-        return section.points[:, COLS.XYZ].tolist()
+        return section.points[:, COLS.XYZ]
 
     # note: duplicate points included but not affect the convex hull calculation
-    points = list(utils.flatten(_map_sections(get_points, neurite, section_type=section_type)))
+    points = _map_sections(get_points, neurite, section_type=section_type)
 
-    hull = convex_hull(points)
+    hull = convex_hull(np.concatenate(points)) if points else None
 
     return neurite_volume / hull.volume if hull is not None else np.nan
 
@@ -522,9 +622,9 @@ def principal_direction_extents(neurite, direction=0, section_type=NeuriteType.a
         Principal direction extents are always sorted in descending order. Therefore,
         by default the maximal principal direction extent is returned.
     """
-    points = list(iter_points(neurite, section_filter=is_type(section_type)))
+    points = _unique_points(iter_sections(neurite, section_filter=is_type(section_type)))
 
-    return [morphmath.principal_direction_extent(np.unique(points, axis=0))[direction]]
+    return [morphmath.principal_direction_extent(points, remove_duplicates=False)[direction]]
 
 
 @feature(shape=(...,))
@@ -32,7 +32,7 @@ import numpy as np
 
 from neurom import morphmath as mm
 from neurom.core.dataformat import COLS
-from neurom.core.morphology import Section, iter_segments
+from neurom.core.morphology import Section
 from neurom.morphmath import interval_lengths
 
 
@@ -122,12 +122,12 @@ def segment_lengths(section, prepend_zero=False):
 
 def segment_areas(section):
     """Returns the list of segment areas within the section."""
-    return [mm.segment_area(seg) for seg in iter_segments(section)]
+    return mm.segment_areas(mm.polyline_segments(section.points)).tolist()
 
 
 def segment_volumes(section):
     """Returns the list of segment volumes within the section."""
-    return [mm.segment_volume(seg) for seg in iter_segments(section)]
+    return mm.segment_volumes(mm.polyline_segments(section.points)).tolist()
 
 
 def segment_mean_radii(section):
@@ -174,7 +174,7 @@ def section_radial_distance(section, origin):
 def section_meander_angles(section):
     """Inter-segment opening angles in a section."""
     p = section.points
-    return [mm.angle_3points(p[i - 1], p[i - 2], p[i]) for i in range(2, len(p))]
+    return mm.angles_3points(p[1:-1], p[:-2], p[2:]).tolist()
 
 
 def strahler_order(section):
@@ -29,6 +29,9 @@
 """Transformation functions for morphology objects."""
 
 import numpy as np
+from cached_property import cached_property
+
+from neurom.core.dataformat import COLS
 
 _TRANSFDOC = """
 
@@ -113,23 +116,151 @@ class PivotRotation(Rotation):
         return points
 
 
-def translate(obj, t):
+class _Chain(Transform3D):
+    """Class representing a sequence of 3D transformations applied in order."""
+
+    __doc__ += _TRANSFDOC
+
+    def __init__(self, transforms):
+        """Initialize a chain of 3D transformations.
+
+        Arguments:
+            transforms: sequence of transformations, the first one is applied first
+        """
+        self._transforms = tuple(transforms)
+
+    def __call__(self, points):
+        """Apply all the 3D transformations to a set of points."""
+        for trans in self._transforms:
+            points = trans(points)
+        return points
+
+
+class TransformedMorphology:
+    """Lazy view of a morphology with a 3D transformation applied.
+
+    The view only stores the original morphology and the transformations. The transformed
+    points are computed on demand and the full transformed copy of the morphology is only built
+    the first time it is needed (e.g. to access its neurites or sections).
+
+    When the view is passed to :func:`neurom.features.get`, the features that do not depend on the
+    frame of reference (lengths, areas, volumes, topology...) are computed on the original
+    morphology if all the transformations are rigid (translations and rotations).
+    """
+
+    def __init__(self, morph, transform):
+        """Initialize a lazy transformed morphology.
+
+        Arguments:
+            morph: the morphology to transform (a ``Morphology`` or another
+                ``TransformedMorphology``, in which case the transformations are composed)
+            transform: the ``Transform3D`` to apply
+        """
+        if isinstance(morph, TransformedMorphology):
+            self._morph = morph.original
+            self._transforms = morph.transforms + (transform,)
+        elif hasattr(morph, 'transform'):
+            self._morph = morph
+            self._transforms = (transform,)
+        else:
+            raise NotImplementedError(f'Can not build a lazy transformed view of {morph}')
+
+    @property
+    def original(self):
+        """The original untransformed morphology."""
+        return self._morph
+
+    @property
+    def transforms(self):
+        """The transformations applied to the original morphology, in order."""
+        return self._transforms
+
+    @property
+    def is_rigid(self):
+        """True if all the transformations are translations or rotations."""
+        return all(isinstance(trans, (Translation, Rotation)) for trans in self._transforms)
+
+    @property
+    def name(self):
+        """The name of the original morphology."""
+        return self._morph.name
+
+    @property
+    def process_subtrees(self):
+        """Mixed tree processing flag of the original morphology."""
+        return self._morph.process_subtrees
+
+    def apply(self, points):
+        """Apply the transformations of this view to a set of [x, y, z] points."""
+        return _Chain(self._transforms)(points)
+
+    @property
+    def points(self):
+        """Returns the transformed points, the radii are not modified."""
+        points = self._morph.points
+        return np.column_stack((self.apply(points[:, COLS.XYZ]), points[:, COLS.R]))
+
+    @cached_property
+    def morphology(self):
+        """The transformed ``Morphology``, built on first access."""
+        morph = self._morph.transform(_Chain(self._transforms))
+        morph.name = self._morph.name
+        morph.process_subtrees = self._morph.process_subtrees
+        return morph
+
+    @property
+    def soma(self):
+        """The soma of the transformed morphology."""
+        return self.morphology.soma
+
+    @property
+    def neurites(self):
+        """The list of neurites of the transformed morphology."""
+        return self.morphology.neurites
+
+    @property
+    def sections(self):
+        """The array of all sections of the transformed morphology."""
+        return self.morphology.sections
+
+    @property
+    def segments(self):
+        """The array of all segments of the transformed morphology."""
+        return self.morphology.segments
+
+    def to_morphio(self):
+        """Returns the morphio morphology object of the transformed morphology."""
+        return self.morphology.to_morphio()
+
+    def transform(self, trans):
+        """Return a new lazy view with an additional 3D transformation applied."""
+        return TransformedMorphology(self, trans)
+
+    def __repr__(self):
+        """Return a string representation."""
+        return f'TransformedMorphology <{self._morph}, n_transforms: {len(self._transforms)}>'
+
+
+def translate(obj, t, lazy=False):
     """Translate object of supported type.
 
     Arguments:
         obj : object to be translated. Must implement a transform method.
         t: translation 3-vector
+        lazy (bool): if True, return a :class:`TransformedMorphology` view instead of a copy
 
     Returns:
         copy of the object with the applied translation
     """
+    if lazy:
+        return TransformedMorphology(obj, Translation(t))
     try:
         return obj.transform(Translation(t))
     except AttributeError as e:
         raise NotImplementedError from e
 
 
-def rotate(obj, axis, angle, origin=None):
+def rotate(obj, axis, angle, origin=None, lazy=False):
     """Rotation around unit vector following the right hand rule.
 
     Arguments:
@@ -138,12 +269,15 @@ def rotate(obj, axis, angle, origin=None):
         axis : unit vector for the axis of rotation
         angle : rotation angle in rads
         origin : specify the origin about which rotation occurs
+        lazy (bool): if True, return a :class:`TransformedMorphology` view instead of a copy
 
     Returns:
         A copy of the object with the applied translation.
     """
     R = _rodrigues_to_dcm(axis, angle)
 
+    if lazy:
+        return TransformedMorphology(obj, PivotRotation(R, origin))
     try:
         return obj.transform(PivotRotation(R, origin))
     except AttributeError as e:
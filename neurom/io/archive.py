@@ -0,0 +1,195 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Single file archives of morphology files.
+
+An archive stores many morphology files in one file, which avoids opening thousands of small files
+on parallel filesystems. It is made of a magic string followed by four arrays in the ``.npy``
+format:
+
+- the names of the morphology files, i.e. their paths relative to the packed directory
+- the formats of the files (asc, swc or h5)
+- the offsets of the files in the data array, the i-th file spans ``offsets[i]:offsets[i + 1]``
+- the concatenated contents of the files, as bytes
+
+The data array is memory mapped, so reading a morphology only reads its own bytes.
+"""
+import logging
+import os
+import shutil
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from neurom.exceptions import NeuroMError
+
+L = logging.getLogger(__name__)
+
+ARCHIVE_EXTENSION = '.nmz'
+_MAGIC = b'NEUROM-ARCHIVE-1\n'
+
+
+def is_archive(path):
+    """Check if `path` is a morphology archive file."""
+    return Path(path).suffix.lower() == ARCHIVE_EXTENSION and os.path.isfile(path)
+
+
+def pack_morphologies(files, archive_path, root=None, names=None):
+    """Pack morphology files into a single archive file.
+
+    The files are copied as they are, they are not parsed.
+
+    Arguments:
+        files (Iterable[str|Path]): the morphology files
+        archive_path (str|Path): path of the archive to write
+        root (str|Path): if given, the files are named by their paths relative to this directory,
+            otherwise by their basenames
+        names (Iterable[str]): optional names of the files, they override ``root``
+
+    Returns:
+        int: the number of packed files
+    """
+    files = [Path(f) for f in files]
+    if names is not None:
+        names = list(names)
+    elif root is None:
+        names = [f.name for f in files]
+    else:
+        names = [f.relative_to(root).as_posix() for f in files]
+    formats = [f.suffix[1:].lower() for f in files]
+
+    offsets = np.zeros(len(files) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([os.stat(f).st_size for f in files])
+
+    with open(archive_path, 'wb') as archive:
+        archive.write(_MAGIC)
+        np.save(archive, np.array(names, dtype=str))
+        np.save(archive, np.array(formats, dtype=str))
+        np.save(archive, offsets)
+        # the data header is written by hand so that the files can be streamed into the archive
+        np.lib.format.write_array_header_1_0(
+            archive, {'descr': '|u1', 'fortran_order': False, 'shape': (int(offsets[-1]),)}
+        )
+        for f in files:
+            with open(f, 'rb') as morph_file:
+                shutil.copyfileobj(morph_file, archive)
+
+    L.debug('Packed %d files into %s', len(files), archive_path)
+    return len(files)
+
+
+class MorphologyArchive:
+    """Read only access to a morphology archive written by :func:`pack_morphologies`."""
+
+    def __init__(self, path):
+        """Open a morphology archive.
+
+        Arguments:
+            path (str|Path): path to the archive file
+        """
+        self.path = Path(path)
+        stat = os.stat(self.path)
+        self._version = (stat.st_mtime_ns, stat.st_size)
+        with open(self.path, 'rb') as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise NeuroMError(f'{self.path} is not a morphology archive')
+            self.names = np.load(f)
+            self.formats = np.load(f)
+            self._offsets = np.load(f)
+            np.lib.format.read_magic(f)
+            shape, _, _ = np.lib.format.read_array_header_1_0(f)
+            data_offset = f.tell()
+        # np.memmap can not map empty files
+        if shape[0] == 0:
+            self._data = np.empty(0, dtype=np.uint8)
+        else:
+            self._data = np.memmap(self.path, dtype=np.uint8, mode='r', offset=data_offset)
+
+    def __reduce__(self):
+        """Only the path is pickled, the unpickled archives of a process share one opened file.
+
+        A pickled :class:`ArchiveEntry` is thus only the path of its archive and its index, and
+        the names of the archive are not read again for each entry sent to a worker process.
+        """
+        return _open_archive, (str(self.path),) + self._version
+
+    def __len__(self):
+        """Number of morphologies in the archive."""
+        return len(self.names)
+
+    def size(self, idx):
+        """Return the size in bytes of the idx-th morphology file."""
+        return int(self._offsets[idx + 1] - self._offsets[idx])
+
+    def read(self, idx):
+        """Return the content of the idx-th morphology file as bytes."""
+        return self._data[self._offsets[idx] : self._offsets[idx + 1]].tobytes()
+
+    def entries(self):
+        """Return the list of :class:`ArchiveEntry` of the archive."""
+        return [ArchiveEntry(self, idx) for idx in range(len(self))]
+
+    def __str__(self):
+        """Return a string representation."""
+        return f'MorphologyArchive <path: {self.path}, n_morphologies: {len(self)}>'
+
+
+@lru_cache(maxsize=16)
+def _open_archive(path, mtime_ns, size):  # pylint: disable=unused-argument
+    """Open an archive once per process, the modification time and size detect rewritten files."""
+    return MorphologyArchive(path)
+
+
+class ArchiveEntry(namedtuple('ArchiveEntry', ['archive', 'index'])):
+    """A morphology file in a :class:`MorphologyArchive`.
+
+    It can be passed to :func:`neurom.load_morphology` and used in a
+    :class:`neurom.core.population.Population` like a file path.
+    """
+
+    __slots__ = ()
+
+    @property
+    def name(self):
+        """Basename of the morphology file."""
+        return os.path.basename(str(self.archive.names[self.index]))
+
+    @property
+    def extension(self):
+        """File format of the morphology file (asc, swc or h5)."""
+        return str(self.archive.formats[self.index])
+
+    def read(self):
+        """Return the content of the morphology file as bytes."""
+        return self.archive.read(self.index)
+
+    def __str__(self):
+        """Return a string representation."""
+        return f'{self.archive.path}:{self.archive.names[self.index]}'
@@ -0,0 +1,323 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Local SQLite catalog of morphology files, their metadata and their statistics.
+
+The catalog indexes the morphology files of a directory in a SQLite database, with their content
+hash and their metadata (see :mod:`neurom.io.metadata`), so that datasets can be queried without
+loading the morphologies again. When a directory is indexed again, only the files whose size or
+modification time changed are hashed. The catalog also caches the statistics computed by
+``neurom stats`` for a given configuration and NeuroM version, keyed by the content hash of the
+files.
+
+Examples::
+
+    from neurom.io.catalog import Catalog
+
+    with Catalog('catalog.db') as catalog:
+        catalog.index('path/to/morphologies', recursive=True, n_workers=4)
+        pop = catalog.population('n_neurites_apical_dendrite > 0 AND n_sections > ?', (500,))
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+from morphio import MorphioError
+
+import neurom
+from neurom.core.population import Population
+from neurom.core.types import NeuriteType
+from neurom.exceptions import NeuroMError
+from neurom.io.metadata import scan_metadata
+from neurom.io.utils import get_morph_files
+from neurom.utils import NeuromJSON
+
+L = logging.getLogger(__name__)
+
+_NEURITE_TYPES = (NeuriteType.axon, NeuriteType.basal_dendrite, NeuriteType.apical_dendrite)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS morphologies (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    format TEXT,
+    soma_type TEXT,
+    n_points INTEGER,
+    n_sections INTEGER,
+    n_neurites INTEGER,
+    {', '.join(f'n_sections_{t.name} INTEGER' for t in _NEURITE_TYPES)},
+    {', '.join(f'n_neurites_{t.name} INTEGER' for t in _NEURITE_TYPES)},
+    xmin REAL, ymin REAL, zmin REAL, xmax REAL, ymax REAL, zmax REAL,
+    size INTEGER,
+    mtime_ns INTEGER
+);
+CREATE TABLE IF NOT EXISTS stats (
+    hash TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (hash, config_hash)
+);
+"""
+
+
+def content_hash(morph):
+    """SHA-256 hash of the content of a morphology file or archive entry."""
+    if hasattr(morph, 'read'):
+        return hashlib.sha256(morph.read()).hexdigest()
+    digest = hashlib.sha256()
+    with open(morph, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _config_hash(config, process_subtrees):
+    """Hash of a statistics configuration, the values depend on the NeuroM version too."""
+    key = json.dumps([neurom.__version__, config, process_subtrees], sort_keys=True, cls=NeuromJSON)
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _is_scalar_stats(stats):
+    """Check that all the values of the statistics returned by ``extract_stats`` are scalars."""
+    return all(
+        value is None or np.isscalar(value)
+        for features in stats.values()
+        for value in features.values()
+    )
+
+
+def _file_stat(path):
+    """The size and modification time of a file, used to detect the files that changed."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _changed_files(files, known):
+    """Find the files whose content changed since they were indexed.
+
+    Arguments:
+        files (list[Path]): the files to index
+        known (dict): the hash and the size and modification time of the indexed paths
+
+    Returns:
+        tuple: the sizes and modification times of the files, the hashes of the files whose size or
+        modification time changed, and the list of the files whose hash changed
+    """
+    stats = {f: _file_stat(f) for f in files}
+    touched = [f for f in files if known.get(str(f), (None, None))[1] != stats[f]]
+    hashes = {f: content_hash(f) for f in touched}
+    changed = [f for f in touched if known.get(str(f), (None, None))[0] != hashes[f]]
+    return stats, hashes, changed
+
+
+def _in_directory(path, directory, recursive):
+    """Check if a path is in a directory, or in one of its sub-directories if recursive."""
+    path = Path(path)
+    return directory in path.parents if recursive else path.parent == directory
+
+
+def _metadata_row(path, file_hash, file_stat, meta):
+    """The row of the morphologies table of a morphology."""
+    bounding_box = [None] * 6 if meta.bounding_box is None else meta.bounding_box.ravel().tolist()
+    return (
+        [
+            str(path),
+            meta.name,
+            file_hash,
+            meta.format,
+            meta.soma_type.name,
+            meta.n_points,
+            sum(meta.n_sections.values()),
+            sum(meta.n_neurites.values()),
+        ]
+        + [meta.n_sections.get(t, 0) for t in _NEURITE_TYPES]
+        + [meta.n_neurites.get(t, 0) for t in _NEURITE_TYPES]
+        + bounding_box
+        + list(file_stat)
+    )
+
+
+class Catalog:
+    """A SQLite catalog of morphology files."""
+
+    def __init__(self, path):
+        """Open or create a catalog.
+
+        Arguments:
+            path (str|Path): path to the SQLite database
+        """
+        self.path = Path(path)
+        self._connection = sqlite3.connect(str(self.path))
+        self._connection.executescript(_SCHEMA)
+        columns = {row[1] for row in self._connection.execute('PRAGMA table_info(morphologies)')}
+        if 'size' not in columns:
+            # catalogs created before the file sizes and modification times were stored
+            with self._connection:
+                self._connection.execute('ALTER TABLE morphologies ADD COLUMN size INTEGER')
+                self._connection.execute('ALTER TABLE morphologies ADD COLUMN mtime_ns INTEGER')
+
+    def close(self):
+        """Close the database connection."""
+        self._connection.close()
+
+    def __enter__(self):
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the catalog when leaving the context manager."""
+        self.close()
+
+    def __len__(self):
+        """Number of morphologies in the catalog."""
+        return self._connection.execute('SELECT COUNT(*) FROM morphologies').fetchone()[0]
+
+    def index(self, files, recursive=False, n_workers=1):
+        """Add morphology files to the catalog, or update them if their content has changed.
+
+        Only the new files and the files whose size or modification time changed are hashed, and
+        their metadata are only read when their content hash has changed. The files that can not be
+        read are skipped with a warning, and removed from the catalog if they were indexed before.
+        When ``files`` is a directory, the files that were deleted from it are removed too.
+
+        Arguments:
+            files (str|Path|Iterable[str|Path]): a directory, or morphology files
+            recursive (bool): if ``files`` is a directory, also index its sub-directories
+            n_workers (int): number of processes used to read the metadata
+
+        Returns:
+            int: the number of added or updated files
+        """
+        directory = None
+        if isinstance(files, (str, Path)):
+            directory = Path(os.path.abspath(files))
+            files = get_morph_files(files, recursive=recursive)
+        files = [Path(os.path.abspath(f)) for f in files]
+        known = {
+            path: (file_hash, (size, mtime_ns))
+            for path, file_hash, size, mtime_ns in self._connection.execute(
+                'SELECT path, hash, size, mtime_ns FROM morphologies'
+            )
+        }
+        removed = []
+        if directory is not None:
+            indexed = set(map(str, files))
+            removed = [
+                path
+                for path in known
+                if path not in indexed and _in_directory(path, directory, recursive)
+            ]
+
+        stats, hashes, changed = _changed_files(files, known)
+        metadata = scan_metadata(changed, n_workers, ignored_exceptions=(NeuroMError, MorphioError))
+        rows = []
+        for f, meta in zip(changed, metadata):
+            if meta is None:
+                L.warning('Could not read %s, it is not indexed', f)
+                removed.append(str(f))
+            else:
+                rows.append(_metadata_row(f, hashes[f], stats[f], meta))
+        with self._connection:
+            if rows:
+                self._connection.executemany(
+                    f'INSERT OR REPLACE INTO morphologies VALUES ({", ".join("?" * len(rows[0]))})',
+                    rows,
+                )
+            # the files that were only touched keep their metadata
+            self._connection.executemany(
+                'UPDATE morphologies SET size = ?, mtime_ns = ? WHERE path = ?',
+                [(*stats[f], str(f)) for f in set(hashes).difference(changed)],
+            )
+            self._connection.executemany(
+                'DELETE FROM morphologies WHERE path = ?', [(path,) for path in removed]
+            )
+        return len(rows)
+
+    def query(self, where=None, params=()):
+        """Select the paths of the indexed morphologies.
+
+        Arguments:
+            where (str): optional SQL condition on the columns of the ``morphologies`` table, e.g.
+                ``'n_neurites_apical_dendrite > 0 AND n_sections > 500'``. The values can be
+                given as ``?`` placeholders.
+            params (Sequence): the values of the placeholders of ``where``
+
+        Returns:
+            list[Path]: the paths of the selected morphologies, sorted
+        """
+        sql = 'SELECT path FROM morphologies'
+        if where:
+            sql += f' WHERE {where}'
+        try:
+            rows = self._connection.execute(sql + ' ORDER BY path', params).fetchall()
+        except sqlite3.Error as e:
+            raise NeuroMError(f'Invalid catalog query "{where}": {e}') from e
+        return [Path(path) for path, in rows]
+
+    def population(self, where=None, params=(), **kwargs):
+        """Create a population from the morphologies selected by :meth:`query`.
+
+        The other keyword arguments are passed to :class:`neurom.core.population.Population`.
+        """
+        kwargs.setdefault('name', self.path.stem)
+        return Population(self.query(where, params), **kwargs)
+
+    def get_stats(self, morph, config, process_subtrees=False):
+        """Return the cached statistics of a morphology file or archive entry, None if missing."""
+        row = self._connection.execute(
+            'SELECT result FROM stats WHERE hash = ? AND config_hash = ?',
+            (content_hash(morph), _config_hash(config, process_subtrees)),
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def set_stats(self, morph, config, stats, process_subtrees=False):
+        """Cache the statistics of a morphology file or archive entry.
+
+        Only the statistics made of scalar values are cached, the ones with ``raw`` modes are not.
+
+        Returns:
+            bool: True if the statistics were cached
+        """
+        if not _is_scalar_stats(stats):
+            return False
+        with self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO stats VALUES (?, ?, ?)',
+                (
+                    content_hash(morph),
+                    _config_hash(config, process_subtrees),
+                    json.dumps(stats, cls=NeuromJSON),
+                ),
+            )
+        return True
@@ -0,0 +1,190 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Lightweight metadata of morphology files, used to triage datasets before loading them.
+
+The metadata are computed from the raw arrays of the MorphIO morphologies, no NeuroM section or
+neurite object is created.
+
+Examples::
+
+    from neurom import NeuriteType
+    from neurom.io.metadata import scan_metadata
+
+    metadata = scan_metadata('path/to/morphologies', n_workers=4)
+    large = [
+        m.name for m in metadata
+        if m.n_neurites.get(NeuriteType.apical_dendrite) and sum(m.n_sections.values()) > 500
+    ]
+"""
+import logging
+import os
+from collections import Counter, namedtuple
+from functools import partial
+from pathlib import Path
+
+import morphio
+import numpy as np
+
+import neurom
+from neurom.core.dataformat import COLS
+from neurom.core.types import NeuriteType
+from neurom.exceptions import NeuroMError
+from neurom.parallel import get_backend
+
+L = logging.getLogger(__name__)
+
+MorphologyMetadata = namedtuple(
+    'MorphologyMetadata',
+    [
+        'name',
+        'format',
+        'soma_type',
+        'n_points',
+        'n_sections',
+        'n_neurites',
+        'bounding_box',
+    ],
+)
+MorphologyMetadata.__doc__ = """Metadata of a morphology.
+
+Attributes:
+    name (str): name of the morphology, i.e. the basename of its file
+    format (str|None): file format (asc, swc or h5), None for a morphology loaded in memory
+    soma_type (morphio.SomaType): type of the soma
+    n_points (int): number of points of the neurites
+    n_sections (dict[NeuriteType|str, int]): number of sections per neurite type, the sections
+        of the types unknown to NeuroM are counted under :data:`OTHER_TYPE`
+    n_neurites (dict[NeuriteType|str, int]): number of neurites per neurite type, the neurites
+        of the types unknown to NeuroM are counted under :data:`OTHER_TYPE`
+    bounding_box (numpy.ndarray|None): [[min_x, min_y, min_z], [max_x, max_y, max_z]] of the
+        neurite points, None if the morphology has no neurite
+"""
+
+# the key of the counts of the section types that are not a NeuriteType
+OTHER_TYPE = 'other'
+
+
+def _type_counts(section_types):
+    """Count the section types as a dict of NeuriteType, the unknown types are counted together."""
+    counts = {}
+    for section_type, n in sorted(Counter(int(t) for t in section_types).items()):
+        try:
+            key = NeuriteType(section_type)
+        except ValueError:
+            key = OTHER_TYPE
+        counts[key] = counts.get(key, 0) + n
+    return counts
+
+
+def _metadata_from_morphio(name, file_format, morph):
+    """Compute the metadata of a MorphIO morphology."""
+    points = morph.points
+    if len(points) > 0:
+        bounding_box = np.array(
+            [np.min(points[:, COLS.XYZ], axis=0), np.max(points[:, COLS.XYZ], axis=0)]
+        )
+    else:
+        bounding_box = None
+    return MorphologyMetadata(
+        name=name,
+        format=file_format,
+        soma_type=morph.soma.type,
+        n_points=len(points),
+        n_sections=_type_counts(morph.section_types),
+        n_neurites=_type_counts(s.type for s in morph.root_sections),
+        bounding_box=bounding_box,
+    )
+
+
+def read_metadata(morph):
+    """Read the metadata of a morphology.
+
+    Arguments:
+        morph (str|Path|Morphology|neurom.io.archive.ArchiveEntry): the morphology file, archive
+            entry or already loaded morphology
+
+    Returns:
+        MorphologyMetadata: the metadata
+    """
+    if isinstance(morph, neurom.core.morphology.Morphology):
+        morphio_morph = morph.to_morphio()
+        if isinstance(morphio_morph, morphio.mut.Morphology):
+            morphio_morph = morphio_morph.as_immutable()
+        return _metadata_from_morphio(morph.name, None, morphio_morph)
+    if isinstance(morph, neurom.io.archive.ArchiveEntry):
+        # pylint: disable=protected-access
+        morphio_morph = neurom.io.utils._load_morphio_from_stream(morph.read(), morph.extension)
+        return _metadata_from_morphio(morph.name, morph.extension, morphio_morph)
+    file_format = os.path.splitext(morph)[1][1:].lower()
+    return _metadata_from_morphio(os.path.basename(morph), file_format, morphio.Morphology(morph))
+
+
+def _read_metadata_or_none(morph, ignored_exceptions):
+    """Read the metadata of a morphology, return None if an ignored exception is raised."""
+    try:
+        return read_metadata(morph)
+    except (NeuroMError, morphio.MorphioError) as e:
+        if isinstance(e, ignored_exceptions):
+            L.info('Ignoring exception "%s" for file %s', e, morph)
+            return None
+        raise NeuroMError(f'Could not read the metadata of {morph}') from e
+
+
+def scan_metadata(morphs, n_workers=1, ignored_exceptions=(), executor=None, schedule=None):
+    """Read the metadata of many morphologies.
+
+    Arguments:
+        morphs (str|Path|Iterable): a directory, a morphology archive or a collection of
+            morphologies as accepted by :func:`read_metadata`
+        n_workers (int): number of workers used to read the files, see
+            :func:`neurom.parallel.get_backend`
+        ignored_exceptions (tuple): NeuroM and MorphIO exceptions to ignore, the metadata of the
+            files that raise them are None
+        executor: how the files are read, see :mod:`neurom.parallel`. The metadata of the
+            morphologies that are already loaded are always read in the current process
+        schedule: the estimated cost of the files, the most expensive ones are read first, see
+            :func:`neurom.parallel.get_cost_function`
+
+    Returns:
+        list[MorphologyMetadata]: the metadata of the morphologies, in the same order
+    """
+    if isinstance(morphs, (str, Path)):
+        morphs = neurom.io.utils.get_files_by_path(morphs)
+    else:
+        # the collection is iterated twice, it can not be a single use iterator
+        morphs = list(morphs)
+
+    func = partial(_read_metadata_or_none, ignored_exceptions=ignored_exceptions)
+    backend = get_backend(executor, n_workers)
+    if backend.uses_processes and any(
+        isinstance(m, neurom.core.morphology.Morphology) for m in morphs
+    ):
+        # the metadata of loaded morphologies are cheap to read, sending them would copy them
+        backend = get_backend('serial')
+    return backend.map(func, morphs, schedule)
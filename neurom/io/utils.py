@@ -28,27 +28,36 @@
 
 """Utility functions and for loading morphs."""
 
+import hashlib
 import logging
 import os
-import shutil
 import tempfile
-import uuid
-from functools import lru_cache
-from io import StringIO, open
+from fnmatch import fnmatch
+from functools import lru_cache, partial
 from pathlib import Path
 
 import morphio
+import numpy as np
 
 from neurom.core.morphology import Morphology
 from neurom.core.population import Population
 from neurom.exceptions import NeuroMError
+from neurom.io.archive import (
+    ARCHIVE_EXTENSION,
+    ArchiveEntry,
+    MorphologyArchive,
+    is_archive,
+    pack_morphologies,
+)
 
 L = logging.getLogger(__name__)
 
+MORPHOLOGY_EXTENSIONS = {'.swc', '.h5', '.asc'}
 
-def _is_morphology_file(filepath):
-    """Check if `filepath` is a file with one of morphology file extensions."""
-    return filepath.is_file() and filepath.suffix.lower() in {'.swc', '.h5', '.asc'}
+
+def _has_morphology_extension(filename):
+    """Check if `filename` ends with one of morphology file extensions."""
+    return os.path.splitext(filename)[1].lower() in MORPHOLOGY_EXTENSIONS
 
 
 class MorphLoader:
@@ -64,42 +73,97 @@ class MorphLoader:
         """Initialize a MorphLoader object."""
         self.directory = Path(directory)
         self.file_ext = file_ext
+        self._index = None
         if cache_size is not None:
             self.get = lru_cache(maxsize=cache_size)(self.get)
 
+    def _build_index(self):
+        """Map the names of the morphology files of the directory to their paths."""
+        index = {}
+        for path in iter_morph_files(self.directory):
+            index.setdefault(path.name.rsplit('.', 1)[0], path)
+        return index
+
     def _filepath(self, name):
         """File path to `name` morphology file."""
-        if self.file_ext is None:
-            candidates = self.directory.glob(name + ".*")
-            try:
-                return next(filter(_is_morphology_file, candidates))
-            except StopIteration as e:
-                raise NeuroMError("Can not find morphology file for '%s' " % name) from e
-        else:
+        if self.file_ext is not None:
             return Path(self.directory, name + self.file_ext)
 
+        if self._index is None or name not in self._index:
+            # the index is rebuilt on a miss in case files were added to the directory
+            self._index = self._build_index()
+        try:
+            return self._index[name]
+        except KeyError as e:
+            raise NeuroMError("Can not find morphology file for '%s' " % name) from e
+
     # pylint:disable=method-hidden
     def get(self, name):
         """Get `name` morphology data."""
         return load_morphology(self._filepath(name))
 
 
-def get_morph_files(directory):
+def iter_morph_files(directory, recursive=False, include=None, exclude=None):
+    """Iterate over the morphology files in a directory.
+
+    The directory is scanned with ``os.scandir`` and the files are yielded as they are found, so
+    large directories can be processed without listing them first.
+
+    Arguments:
+        directory (str|Path): path to the directory
+        recursive (bool): if True, the sub-directories are also scanned
+        include (str|Iterable[str]): if given, only the files whose path relative to ``directory``
+            matches one of these glob patterns are yielded
+        exclude (str|Iterable[str]): the files whose path relative to ``directory`` matches one of
+            these glob patterns are skipped
+
+    Yields:
+        Path: files with extensions '.swc' , 'h5' or '.asc' (case insensitive)
+    """
+    if isinstance(include, str):
+        include = [include]
+    if isinstance(exclude, str):
+        exclude = [exclude]
+
+    def is_selected(relative_path):
+        if include is not None and not any(fnmatch(relative_path, p) for p in include):
+            return False
+        return exclude is None or not any(fnmatch(relative_path, p) for p in exclude)
+
+    directory = Path(directory)
+    stack = [(directory, '')]
+    while stack:
+        current, prefix = stack.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                relative_path = prefix + entry.name
+                if entry.is_file():
+                    if _has_morphology_extension(entry.name) and is_selected(relative_path):
+                        yield Path(entry.path)
+                elif recursive and entry.is_dir():
+                    stack.append((entry.path, relative_path + '/'))
+
+
+def get_morph_files(directory, recursive=False, include=None, exclude=None):
     """Get a list of all morphology files in a directory.
 
+    See :func:`iter_morph_files` for the arguments.
+
     Returns:
         list with all files with extensions '.swc' , 'h5' or '.asc' (case insensitive)
     """
-    directory = Path(directory)
-    return list(filter(_is_morphology_file, directory.iterdir()))
+    return list(iter_morph_files(directory, recursive=recursive, include=include, exclude=exclude))
 
 
 def get_files_by_path(path):
     """Get a file or set of files from a file path.
 
-    Return list of files with path
+    Return list of files with path, or the list of :class:`neurom.io.archive.ArchiveEntry` if
+    ``path`` is a morphology archive.
     """
     path = Path(path)
+    if is_archive(path):
+        return MorphologyArchive(path).entries()
     if path.is_file():
         return [path]
     if path.is_dir():
@@ -108,19 +172,229 @@ def get_files_by_path(path):
     raise IOError('Invalid data path %s' % path)
 
 
-def _get_file(stream, extension):
-    """Returns the filename of the file to read."""
-    if isinstance(stream, str):
-        stream = StringIO(stream)
-    fd, temp_file = tempfile.mkstemp(suffix=f'{uuid.uuid4()}.{extension}', prefix='neurom-')
-    os.close(fd)
-    with open(temp_file, 'w') as fd:
+def _load_morphio_from_stream(stream, extension):
+    """Parse a morphology from a stream or a string without writing it to disk.
+
+    Arguments:
+        stream (str|bytes|io.IOBase): the content of a morphology file
+        extension (str): the file format (asc, swc or h5)
+    """
+    extension = extension.lower().lstrip('.')
+    if isinstance(stream, (str, bytes)):
+        contents = stream
+    else:
         stream.seek(0)
-        shutil.copyfileobj(stream, fd)
-    return temp_file
+        contents = stream.read()
+
+    if extension == 'h5':
+        # MorphIO can only read HDF5 files from disk, so a temporary file is used. It can be removed
+        # as soon as it is parsed because the immutable morphology is fully loaded in memory.
+        if isinstance(contents, str):
+            contents = contents.encode()
+        fd, temp_file = tempfile.mkstemp(suffix='.h5', prefix='neurom-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(contents)
+            return morphio.Morphology(temp_file)
+        finally:
+            os.remove(temp_file)
+
+    if isinstance(contents, bytes):
+        contents = contents.decode()
+    return morphio.Morphology(contents, extension)
+
+
+def _binary_cache_path(filename, cache_dir):
+    """Path of the binary cache of the `filename` morphology file in `cache_dir`.
+
+    The hash of the absolute path of the file prevents collisions between files with the same name
+    from different directories.
+    """
+    filename = os.path.abspath(filename)
+    digest = hashlib.sha1(filename.encode()).hexdigest()[:16]
+    return Path(cache_dir, f'{os.path.basename(filename)}.{digest}.h5')
+
+
+def _soma_path(cache_path):
+    """Path of the file storing the soma of a binary cache that HDF5 can not store."""
+    cache_path = Path(cache_path)
+    return cache_path.with_name(cache_path.stem + '.soma.npz')
+
+
+def _h5_soma_type(n_points):
+    """The soma type that MorphIO infers when reading a soma of `n_points` from a HDF5 file.
+
+    Returns None if such a soma can not be read from a HDF5 file: MorphIO reads the somata of
+    HDF5 files as contours, which must have at least 3 points.
+    """
+    if n_points == 0:
+        return morphio.SomaType.SOMA_UNDEFINED
+    if n_points < 3:
+        return None
+    return morphio.SomaType.SOMA_SIMPLE_CONTOUR
+
 
+def _write_atomically(write, path):
+    """Write a file with ``write(temp_path)`` and move it to `path` in a single operation."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_file = tempfile.mkstemp(suffix=path.suffix, prefix='.neurom-', dir=path.parent)
+    os.close(fd)
+    try:
+        write(temp_file)
+        os.replace(temp_file, path)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def _write_h5(morph, path):
+    """Write a mutable morphology to a HDF5 file, return False if its soma can not be stored."""
+    if morph.soma.type != _h5_soma_type(len(morph.soma.points)):
+        return False
+    _write_atomically(morph.write, path)
+    return True
+
+
+def _to_h5_bytes(morph):
+    """Return the content of a HDF5 file of a morphology and its soma, see :func:`_split_soma`.
+
+    Returns None if MorphIO can not write the morphology in the HDF5 format.
+    """
+    morphio_morph = morphio.mut.Morphology(morph.to_morphio())
+    soma = _split_soma(morphio_morph)
+    with tempfile.TemporaryDirectory(prefix='neurom-') as directory:
+        path = Path(directory, 'morphology.h5')
+        try:
+            morphio_morph.write(str(path))
+        except morphio.MorphioError:
+            # e.g. an empty morphology, or a root section of a single point
+            return None
+        return path.read_bytes(), soma
+
+
+def _from_h5_bytes(data, soma):
+    """Read a morphology returned by :func:`_to_h5_bytes`."""
+    morph = _load_morphio_from_stream(data, 'h5')
+    if soma is None:
+        return morph
+    morph = morph.as_mutable()
+    _restore_soma(morph, soma)
+    return morph.as_immutable()
+
+
+def _split_soma(morph):
+    """Remove the soma of a mutable morphology if it can not be stored in a HDF5 file.
 
-def load_morphology(morph, reader=None, *, mutable=None, process_subtrees=False):
+    Returns:
+        dict: the type, points and diameters of the removed soma, None if it was kept
+    """
+    if morph.soma.type == _h5_soma_type(len(morph.soma.points)):
+        return None
+    soma = {
+        'type': int(morph.soma.type),
+        'points': np.array(morph.soma.points),
+        'diameters': np.array(morph.soma.diameters),
+    }
+    morph.soma.points = np.empty((0, 3))
+    morph.soma.diameters = np.empty(0)
+    morph.soma.type = morphio.SomaType.SOMA_UNDEFINED
+    return soma
+
+
+def _restore_soma(morph, soma):
+    """Restore the soma removed by :func:`_split_soma` in a mutable morphology."""
+    morph.soma.points = soma['points']
+    morph.soma.diameters = soma['diameters']
+    morph.soma.type = morphio.SomaType(int(soma['type']))
+
+
+def _save_npz(path, arrays):
+    with open(path, 'wb') as f:
+        np.savez(f, **arrays)
+
+
+@lru_cache(maxsize=None)
+def _warn_binary_cache_failure():
+    L.warning('Some morphologies can not be written to the binary cache, they are parsed instead')
+
+
+def write_binary_cache(morph, cache_path):
+    """Write the binary cache of a morphology.
+
+    The cache is a HDF5 file written by MorphIO: it holds the points and diameters as contiguous
+    arrays, the structure table (section offsets, types and parents) and the soma, and it is read
+    with a few bulk reads instead of being parsed. The files are written atomically so that several
+    processes can share the same cache directory.
+
+    HDF5 files can only store contour somata. The other somata, e.g. the SWC somata made of
+    cylinders or of a single point, are removed from the HDF5 file and their type, points and
+    diameters are stored next to it in a ``.soma.npz`` file, from which they are restored on load.
+
+    Arguments:
+        morph (morphio.Morphology|morphio.mut.Morphology): the morphology to write
+        cache_path (str|Path): path of the cache file
+
+    Returns:
+        bool: True if the cache was written
+    """
+    morph = morphio.mut.Morphology(morph)
+    soma_path = _soma_path(cache_path)
+    try:
+        soma = _split_soma(morph)
+        if soma is None:
+            # a soma file of a previous version of the morphology must not be used with this cache
+            if soma_path.exists():
+                os.remove(soma_path)
+        else:
+            _write_atomically(partial(_save_npz, arrays=soma), soma_path)
+        _write_atomically(morph.write, cache_path)
+    except (OSError, morphio.MorphioError) as e:
+        L.debug('Could not write the binary cache %s: %s', cache_path, e)
+        _warn_binary_cache_failure()
+        if soma_path.exists():
+            os.remove(soma_path)
+        return False
+    return True
+
+
+def _read_binary_cache(cache_path, soma_path):
+    """Read a binary cache, restoring the soma stored in `soma_path` if it is not None."""
+    if soma_path is None:
+        return morphio.Morphology(cache_path)
+    with np.load(soma_path) as soma:
+        morph = morphio.mut.Morphology(cache_path)
+        _restore_soma(morph, soma)
+    return morph.as_immutable()
+
+
+def _load_morphio_with_binary_cache(filename, cache_dir):
+    """Load a morphology file through its binary cache, which is (re)built if it is stale."""
+    cache_path = _binary_cache_path(filename, cache_dir)
+    soma_path = _soma_path(cache_path)
+    try:
+        mtime = os.stat(filename).st_mtime_ns
+        if os.stat(cache_path).st_mtime_ns >= mtime:
+            try:
+                soma_path = soma_path if os.stat(soma_path).st_mtime_ns >= mtime else None
+            except FileNotFoundError:
+                soma_path = None
+            return _read_binary_cache(cache_path, soma_path)
+    except FileNotFoundError:
+        pass
+    except morphio.MorphioError as e:
+        # e.g. the sections of undefined type, that MorphIO writes but can not read from HDF5
+        L.debug('Could not read the binary cache %s: %s', cache_path, e)
+        return morphio.Morphology(filename)
+
+    morphio_morph = morphio.Morphology(filename)
+    write_binary_cache(morphio_morph, cache_path)
+    return morphio_morph
+
+
+def load_morphology(
+    morph, reader=None, *, mutable=None, process_subtrees=False, binary_cache_dir=None
+):
     """Build section trees from a morphology or a h5, swc or asc file.
 
     Args:
@@ -130,14 +404,20 @@ def load_morphology(morph, reader=None, *, mutable=None, process_subtrees=False)
             - a filename with the h5, swc or asc extension
             - a NeuroM Neuron object
             - a morphio mutable or immutable Morphology object
-            - a stream that can be put into a io.StreamIO object. In this case, the READER argument
-              must be passed with the corresponding file format (asc, swc and h5)
+            - a :class:`neurom.io.archive.ArchiveEntry` of a morphology archive
+            - a stream that can be put into a io.StreamIO object (or a io.BytesIO object for h5).
+              In this case, the READER argument must be passed with the corresponding file format
+              (asc, swc and h5). The asc and swc streams are parsed in memory.
         reader (str): Optional, must be provided if morphology is a stream to
                       specify the file format (asc, swc, h5)
         mutable (bool|None): Whether to enforce mutability. If None and a morphio/neurom object is
                              passed, the initial mutability will be maintained. If None and the
                              morphology is loaded, then it will be immutable by default.
         process_subtrees (bool): enable mixed tree processing if set to True
+        binary_cache_dir (str|Path): optional directory of binary caches. If set and ``morph`` is
+            a filename, the morphology is read from its cache in this directory when the cache is
+            newer than the file, otherwise the file is parsed and its cache is written.
+            See :func:`write_binary_cache`.
 
     Returns:
         A Morphology object
@@ -166,10 +446,18 @@ def load_morphology(morph, reader=None, *, mutable=None, process_subtrees=False)
     elif isinstance(morph, (morphio.Morphology, morphio.mut.Morphology)):
         name = "Morphology"
         morphio_morph = morph
+    elif isinstance(morph, ArchiveEntry):
+        name = morph.name
+        morphio_morph = _load_morphio_from_stream(morph.read(), morph.extension)
+    elif reader:
+        name = "Morphology"
+        morphio_morph = _load_morphio_from_stream(morph, reader)
     else:
-        filepath = _get_file(morph, reader) if reader else morph
-        name = os.path.basename(filepath)
-        morphio_morph = morphio.Morphology(filepath)
+        name = os.path.basename(morph)
+        if binary_cache_dir is not None:
+            morphio_morph = _load_morphio_with_binary_cache(morph, binary_cache_dir)
+        else:
+            morphio_morph = morphio.Morphology(morph)
 
     # None does not modify existing mutability
     if mutable is not None:
@@ -182,14 +470,25 @@ def load_morphology(morph, reader=None, *, mutable=None, process_subtrees=False)
 
 
 def load_morphologies(
-    morphs, name=None, ignored_exceptions=(), *, cache=False, process_subtrees=False
-):
+    morphs,
+    name=None,
+    ignored_exceptions=(),
+    *,
+    cache=False,
+    process_subtrees=False,
+    cache_size=None,
+    prefetch=0,
+    n_workers=1,
+    binary_cache_dir=None,
+    executor=None,
+):  # pylint: disable=too-many-arguments
     """Create a population object.
 
     From all morphologies in a directory of from morphologies in a list of file names.
 
     Arguments:
-        morphs(str|Path|Iterable[Path]): path to a folder or list of paths to morphology files
+        morphs(str|Path|Iterable[Path]): path to a folder, path to a morphology archive (see
+            :mod:`neurom.io.archive`) or list of paths to morphology files
         name (str): optional name of population. By default 'Population' or\
             filepath basename depending on whether morphologies is list or\
             directory path respectively.
@@ -197,16 +496,85 @@ def load_morphologies(
             loading morphologies
         cache (bool): whether to cache the loaded morphologies in memory
         process_subtrees (bool): enable mixed tree processing if set to True
+        cache_size (int): number of most recently accessed morphologies to keep in memory when
+            ``cache`` is False
+        prefetch (int): number of morphologies to load ahead in background threads while
+            iterating
+        n_workers (int): number of workers used to load the morphologies when ``cache`` is True
+        binary_cache_dir (str|Path): optional directory of binary caches of the morphology files,
+            see :func:`load_morphology`
+        executor: how the morphologies are loaded when ``cache`` is True, see
+            :class:`neurom.core.population.Population`
 
     Returns:
         Population: population object
     """
     if isinstance(morphs, (str, Path)):
         files = get_files_by_path(morphs)
-        name = name or Path(morphs).name
+        name = name or (Path(morphs).stem if is_archive(morphs) else Path(morphs).name)
     else:
         files = morphs
         name = name or 'Population'
     return Population(
-        files, name, ignored_exceptions, cache=cache, process_subtrees=process_subtrees
+        files,
+        name,
+        ignored_exceptions,
+        cache=cache,
+        process_subtrees=process_subtrees,
+        cache_size=cache_size,
+        prefetch=prefetch,
+        n_workers=n_workers,
+        binary_cache_dir=binary_cache_dir,
+        executor=executor,
     )
+
+
+def archive_morphologies(morphs, directory):
+    """Serialize the in-memory morphologies into an archive that the worker processes can read.
+
+    This is not a zero-copy sharing of the loaded morphologies: they are written once into the
+    archive by the calling process, and each worker parses again the entries it processes. Only
+    the path of the archive and the index of an entry are pickled for the workers, which read the
+    archive through a memory map. The morphologies are written in the HDF5 format when their soma
+    can be stored in it, otherwise in the SWC format.
+
+    MorphIO can not attach a morphology to external buffers, and can only read HDF5 files from
+    disk, so each worker writes the HDF5 entries it reads to a temporary file. This is still the
+    fastest way to rebuild them: on the test morphologies, reading an HDF5 entry through a
+    temporary file takes 0.3 to 0.5 ms, while parsing the same morphology from a SWC string takes
+    1.6 ms, from an ASC string 2 to 13 ms, and rebuilding it section by section from its point
+    arrays with the mutable API of MorphIO 1 to 8 ms.
+
+    Arguments:
+        morphs (Iterable): morphology files, archive entries or ``Morphology`` objects
+        directory (str|Path): directory where the archive is written, it must exist as long as
+            the returned entries are used
+
+    Returns:
+        list: ``morphs`` where the ``Morphology`` objects are replaced by their
+        :class:`neurom.io.archive.ArchiveEntry`
+    """
+    morphs = list(morphs)
+    in_memory = [i for i, m in enumerate(morphs) if isinstance(m, Morphology)]
+    if not in_memory:
+        return morphs
+
+    files = []
+    for i in in_memory:
+        morphio_morph = morphs[i].to_morphio()
+        if isinstance(morphio_morph, morphio.Morphology):
+            morphio_morph = morphio_morph.as_mutable()
+        path = Path(directory, f'{i}.h5')
+        if not _write_h5(morphio_morph, path):
+            path = path.with_suffix('.swc')
+            morphio_morph.write(str(path))
+        files.append(path)
+
+    archive_path = Path(directory, 'morphologies' + ARCHIVE_EXTENSION)
+    pack_morphologies(files, archive_path, names=[morphs[i].name for i in in_memory])
+    for f in files:
+        os.remove(f)
+
+    for i, entry in zip(in_memory, MorphologyArchive(archive_path).entries()):
+        morphs[i] = entry
+    return morphs
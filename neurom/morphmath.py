@@ -29,7 +29,7 @@
 """Mathematical and geometrical functions used to compute morphometrics."""
 import logging
 import math
-from itertools import combinations
+from collections import namedtuple
 
 import numpy as np
 from scipy.spatial import ConvexHull
@@ -69,6 +69,17 @@ def linear_interpolate(p1, p2, fraction):
     )
 
 
+def linear_interpolations(p1, p2, fractions):
+    """Returns the points p satisfying: p1 + fractions * (p2 - p1).
+
+    Vectorized version of :func:`linear_interpolate`, ``p1`` and ``p2`` are arrays of shape (n, 3+)
+    or single points and ``fractions`` an array of shape (n,) or a scalar.
+    """
+    p1 = np.asarray(p1, dtype=float)[..., COLS.XYZ]
+    p2 = np.asarray(p2, dtype=float)[..., COLS.XYZ]
+    return p1 + np.asarray(fractions, dtype=float)[..., np.newaxis] * (p2 - p1)
+
+
 def interpolate_radius(r1, r2, fraction):
     """Interpolate the radius between two values.
 
@@ -158,6 +169,27 @@ def path_fraction_point(points, fraction):
     return linear_interpolate(points[seg_id], points[seg_id + 1], offset)
 
 
+def path_fraction_points(points, fractions):
+    """Find the coordinates of several fractional offsets along a piecewise linear curve.
+
+    Vectorized version of :func:`path_fraction_point` for an array of fractions.
+
+    Returns:
+        The array of shape (n, 3) of the points at the given path length fractions
+    """
+    fractions = np.asarray(fractions, dtype=float)
+    if np.any((fractions < 0.0) | (fractions > 1.0)):
+        raise ValueError("Invalid fractions: %s" % fractions[(fractions < 0.0) | (fractions > 1.0)])
+    points = np.asarray(points, dtype=float)
+    lengths = interval_lengths(points)
+    cum_lengths = np.cumsum(lengths)
+    offsets = cum_lengths[-1] * fractions
+    # index of the first segment whose cumulative length is not smaller than the offset
+    seg_ids = np.minimum(np.searchsorted(cum_lengths, offsets, side='left'), len(lengths) - 1)
+    offsets = offsets - np.where(seg_ids > 0, cum_lengths[seg_ids - 1], 0.0)
+    return linear_interpolations(points[seg_ids], points[seg_ids + 1], offsets / lengths[seg_ids])
+
+
 def scalar_projection(v1, v2):
     """Compute the scalar projection of v1 upon v2.
 
@@ -182,6 +214,17 @@ def vector_projection(v1, v2):
     return scalar_projection(v1, v2) * v2 / np.linalg.norm(v2)
 
 
+def vector_projections(v1, v2):
+    """Compute the vector projections of the vectors v1 upon the vectors v2.
+
+    Vectorized version of :func:`vector_projection`, the arrays of vectors are broadcast against
+    each other along all but their last axis.
+    """
+    v1 = np.asarray(v1, dtype=float)
+    v2 = np.asarray(v2, dtype=float)
+    return np.sum(v1 * v2, axis=-1, keepdims=True) / np.sum(v2 * v2, axis=-1, keepdims=True) * v2
+
+
 def dist_point_line(p, l1, l2):
     """Compute the orthogonal distance between a line and a point.
 
@@ -199,6 +242,17 @@ def dist_point_line(p, l1, l2):
     return np.linalg.norm(cross_prod) / np.linalg.norm(l2 - l1)
 
 
+def dists_point_line(p, l1, l2):
+    """Compute the orthogonal distances between points and lines.
+
+    Vectorized version of :func:`dist_point_line`, the arrays of 3D points are broadcast against
+    each other along all but their last axis.
+    """
+    p, l1, l2 = (np.asarray(a, dtype=float) for a in (p, l1, l2))
+    cross_prod = np.cross(l2 - l1, p - l1)
+    return np.linalg.norm(cross_prod, axis=-1) / np.linalg.norm(l2 - l1, axis=-1)
+
+
 def point_dist2(p1, p2):
     """Compute the square of the euclidian distance between two 3D points.
 
@@ -224,6 +278,18 @@ def point_dist(p1, p2):
     return np.sqrt(point_dist2(p1, p2))
 
 
+def point_dists(p1, p2):
+    """Compute the euclidian distances between the 3D points of two arrays.
+
+    Vectorized version of :func:`point_dist`, the arrays of points of shape (..., 3+) are broadcast
+    against each other along all but their last axis. Like :func:`point_dist`, the distances are
+    computed in the precision of the points.
+    """
+    p1 = np.asarray(p1)[..., COLS.XYZ]
+    p2 = np.asarray(p2)[..., COLS.XYZ]
+    return np.linalg.norm(p1 - p2, axis=-1)
+
+
 def angle_3points(p0, p1, p2):
     """Compute the angle in radians between three 3D points.
 
@@ -242,6 +308,18 @@ def angle_3points(p0, p1, p2):
     return math.atan2(np.linalg.norm(np.cross(vec1, vec2)), np.dot(vec1, vec2))
 
 
+def angles_3points(p0, p1, p2):
+    """Compute the angles in radians between three arrays of 3D points.
+
+    Vectorized version of :func:`angle_3points`, the arrays of points of shape (..., 3+) are
+    broadcast against each other along all but their last axis.
+    """
+    p0 = np.asarray(p0, dtype=float)[..., COLS.XYZ]
+    vec1 = np.asarray(p1, dtype=float)[..., COLS.XYZ] - p0
+    vec2 = np.asarray(p2, dtype=float)[..., COLS.XYZ] - p0
+    return np.arctan2(np.linalg.norm(np.cross(vec1, vec2), axis=-1), np.sum(vec1 * vec2, axis=-1))
+
+
 def angle_between_vectors(p1, p2):
     """Computes the angle in radians between vectors 'p1' and 'p2'.
 
@@ -255,6 +333,21 @@ def angle_between_vectors(p1, p2):
     return np.arccos(np.clip(np.dot(v1, v2), -1.0, 1.0))
 
 
+def angles_between_vectors(p1, p2):
+    """Computes the angles in radians between the vectors of two arrays.
+
+    Vectorized version of :func:`angle_between_vectors`, the arrays of vectors are broadcast
+    against each other along all but their last axis.
+    """
+    p1 = np.asarray(p1, dtype=float)
+    p2 = np.asarray(p2, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        v1 = p1 / np.linalg.norm(p1, axis=-1, keepdims=True)
+        v2 = p2 / np.linalg.norm(p2, axis=-1, keepdims=True)
+        angles = np.arccos(np.clip(np.sum(v1 * v2, axis=-1), -1.0, 1.0))
+    return np.where(np.all(p1 == p2, axis=-1), 0.0, angles)
+
+
 def angle_between_projections(p1, p2):
     """Angle between the projections p1 and p2 (2d vectors)."""
     ang1 = np.arctan2(*p1[::-1])
@@ -296,6 +389,20 @@ def spherical_from_vector(vec):
     return np.array([elevation, azimuth])
 
 
+def spherical_from_vectors(vecs):
+    """Return the spherical coordinates (elevation, azimuth) of an array of vectors.
+
+    Vectorized version of :func:`spherical_from_vector`, it returns an array of shape (n, 2).
+    """
+    vecs = np.asarray(vecs, dtype=float)
+    norms = np.linalg.norm(vecs, axis=1)
+    if np.any(norms < np.finfo(norms.dtype).eps):
+        raise ValueError("Norm of vector between soma center and section is almost zero.")
+    elevations = np.arcsin(np.clip(vecs[:, COLS.Y] / norms, -1.0, 1.0))
+    azimuths = np.arctan2(vecs[:, COLS.Z], vecs[:, COLS.X])
+    return np.column_stack([elevations, azimuths])
+
+
 def vector_from_spherical(elevation, azimuth, radius=1.0):
     """Return a vector from the frame center to the point in given direction and given radius.
 
@@ -316,14 +423,72 @@ def angles_to_pi_interval(angles, scale=1.0):
     return mod_angle
 
 
+def _max_pairwise_distance(points, chunk_size=1024):
+    """Compute the maximum distance between two points, by chunks to bound the memory use."""
+    return max(
+        float(np.max(cdist(points[start : start + chunk_size], points)))
+        for start in range(0, len(points), chunk_size)
+    )
+
+
+def convex_polygon_diameter(vertices):
+    """Compute the maximum distance between two vertices of a convex polygon.
+
+    The rotating calipers algorithm visits each pair of antipodal vertices once, in linear time.
+
+    Args:
+        vertices: the 2D vertices of the polygon in counterclockwise order, as given by
+            ``ConvexHull.vertices`` for 2D points
+
+    Returns:
+        The diameter of the polygon
+    """
+    vertices = np.asarray(vertices, dtype=float).tolist()
+    n_vertices = len(vertices)
+    if n_vertices < 3:
+        return _max_pairwise_distance(np.asarray(vertices)) if vertices else 0.0
+
+    def squared_dist(p0, p1):
+        return (p0[0] - p1[0]) ** 2 + (p0[1] - p1[1]) ** 2
+
+    max_squared_dist = 0.0
+    j = 1
+    for i in range(n_vertices):
+        p0, p1 = vertices[i], vertices[(i + 1) % n_vertices]
+        edge_x, edge_y = p1[0] - p0[0], p1[1] - p0[1]
+        # advance j while the distance to the edge (i, i + 1) increases
+        while True:
+            q0, q1 = vertices[j], vertices[(j + 1) % n_vertices]
+            if edge_x * (q1[1] - q0[1]) - edge_y * (q1[0] - q0[0]) <= 0.0:
+                break
+            j = (j + 1) % n_vertices
+        max_squared_dist = max(
+            max_squared_dist, squared_dist(p0, vertices[j]), squared_dist(p1, vertices[j])
+        )
+    return math.sqrt(max_squared_dist)
+
+
 def polygon_diameter(points):
-    """Compute the maximun euclidian distance between any two points in a list of points."""
-    return max(point_dist(p0, p1) for (p0, p1) in combinations(points, 2))
+    """Compute the maximun euclidian distance between any two points in a list of points.
+
+    The two farthest points are vertices of the convex hull, so only the hull vertices are
+    compared, with the rotating calipers for 2D points.
+    """
+    points = np.asarray(points, dtype=float)[:, COLS.XYZ]
+    try:
+        hull = ConvexHull(points)
+    except QhullError:
+        # degenerate point sets, e.g. less than 4 points or aligned points, are compared directly
+        return _max_pairwise_distance(points)
+
+    if points.shape[1] == 2:
+        return convex_polygon_diameter(points[hull.vertices])
+    return _max_pairwise_distance(points[hull.vertices])
 
 
 def average_points_dist(p0, p_list):
     """Computes the average distance between a list of points and a given point p0."""
-    return np.mean(list(point_dist(p0, p1) for p1 in p_list))
+    return np.mean(point_dists(p0, p_list))
 
 
 def path_distance(points):
@@ -405,6 +570,19 @@ def segment_area(seg):
     return math.pi * (r0 + r1) * math.sqrt((r0 - r1) ** 2 + h2)
 
 
+def segment_areas(segments):
+    """Compute the surface areas of an array of segments.
+
+    Vectorized version of :func:`segment_area`, ``segments`` is an array of shape (n, 2, 4) of
+    (x, y, z, r) points, e.g. made with :func:`polyline_segments`.
+    """
+    segments = np.asarray(segments, dtype=float)
+    r0 = segments[:, 0, COLS.R]
+    r1 = segments[:, 1, COLS.R]
+    h2 = np.sum((segments[:, 0, COLS.XYZ] - segments[:, 1, COLS.XYZ]) ** 2, axis=-1)
+    return math.pi * (r0 + r1) * np.sqrt((r0 - r1) ** 2 + h2)
+
+
 def segment_volume(seg):
     """Compute the volume of a segment.
 
@@ -416,6 +594,19 @@ def segment_volume(seg):
     return math.pi * h * ((r0 * r0) + (r0 * r1) + (r1 * r1)) / 3.0
 
 
+def segment_volumes(segments):
+    """Compute the volumes of an array of segments.
+
+    Vectorized version of :func:`segment_volume`, ``segments`` is an array of shape (n, 2, 4) of
+    (x, y, z, r) points.
+    """
+    segments = np.asarray(segments, dtype=float)
+    r0 = segments[:, 0, COLS.R]
+    r1 = segments[:, 1, COLS.R]
+    h = point_dists(segments[:, 0], segments[:, 1])
+    return math.pi * h * ((r0 * r0) + (r0 * r1) + (r1 * r1)) / 3.0
+
+
 def taper_rate(p0, p1):
     """Compute the taper rate between points p0 and p1.
 
@@ -441,6 +632,30 @@ def segment_taper_rate(seg):
     return taper_rate(seg[0], seg[1])
 
 
+def segment_taper_rates(segments):
+    """Compute the taper rates of an array of segments.
+
+    Vectorized version of :func:`segment_taper_rate`, ``segments`` is an array of shape (n, 2, 4)
+    of (x, y, z, r) points.
+    """
+    segments = np.asarray(segments, dtype=float)
+    return (
+        2
+        * np.abs(segments[:, 0, COLS.R] - segments[:, 1, COLS.R])
+        / point_dists(segments[:, 0], segments[:, 1])
+    )
+
+
+def polyline_segments(points):
+    """Stack the consecutive points of a polyline into an array of segments of shape (n - 1, 2, m).
+
+    Args:
+        points: an array of points of shape (n, m)
+    """
+    points = np.asarray(points)
+    return np.stack((points[:-1], points[1:]), axis=1)
+
+
 def pca(points):
     """Estimate the principal components of the covariance on the given point cloud.
 
@@ -448,9 +663,48 @@ def pca(points):
         points: A numpy array of points of the form ((x1,y1,z1), (x2, y2, z2)...)
 
     Returns:
-        Eigenvalues and respective eigenvectors
+        Eigenvalues and respective eigenvectors, sorted by decreasing eigenvalues
+    """
+    # the covariance matrix is symmetric
+    eigenvalues, eigenvectors = np.linalg.eigh(np.cov(points.transpose()))
+    return eigenvalues[::-1], eigenvectors[:, ::-1]
+
+
+def unique_points(points):
+    """Remove the duplicate rows of an array of points.
+
+    The rows are hashed to integers, which is faster than sorting them lexicographically like
+    ``np.unique(points, axis=0)`` does. The latter is used if a hash collision is detected.
+
+    Args:
+        points: a 2D numpy array of points
+
+    Returns:
+        The unique points, in the order of their first occurrence
     """
-    return np.linalg.eig(np.cov(points.transpose()))
+    points = np.asarray(points, dtype=float)
+    if len(points) == 0:
+        return points
+
+    # adding 0.0 turns -0.0 into 0.0, so that equal points have equal bits
+    bits = np.ascontiguousarray(points + 0.0).view(np.uint64)
+    hashes = np.zeros(len(points), dtype=np.uint64)
+    for column in bits.T:
+        hashes ^= column
+        hashes *= np.uint64(0x100000001B3)
+
+    order = np.argsort(hashes)
+    sorted_hashes = hashes[order]
+    starts = np.flatnonzero(np.concatenate([[True], sorted_hashes[1:] != sorted_hashes[:-1]]))
+    first = np.minimum.reduceat(order, starts)
+
+    group_sizes = np.diff(np.append(starts, len(points)))
+    if not np.array_equal(points[np.repeat(first, group_sizes)], points[order]):
+        _, first = np.unique(points, axis=0, return_index=True)
+
+    unique = np.zeros(len(points), dtype=bool)
+    unique[first] = True
+    return points[unique]
 
 
 def sphere_area(r):
@@ -462,7 +716,7 @@ def sphere_area(r):
 section_length = path_distance
 
 
-def principal_direction_extent(points):
+def principal_direction_extent(points, remove_duplicates=True):
     """Calculate the extent of a set of 3D points.
 
     The extent is defined as the maximum distance between the projections on the principal
@@ -470,6 +724,7 @@ def principal_direction_extent(points):
 
     Args:
         points: a 2D numpy array of points with 2 or 3 columns for (x, y, z)
+        remove_duplicates: if False, the points are assumed to be already unique
 
     Returns:
         the extents for each of the eigenvectors of the cov matrix
@@ -478,10 +733,11 @@ def principal_direction_extent(points):
         Direction extents are ordered from largest to smallest.
     """
     # pca can be biased by duplicate points
-    points = np.unique(points, axis=0)
+    if remove_duplicates:
+        points = unique_points(points)
 
     # center the points around 0.0
-    points -= np.mean(points, axis=0)
+    points = points - np.mean(points, axis=0)
 
     # principal components
     _, eigenvectors = pca(points)
@@ -497,9 +753,28 @@ def principal_direction_extent(points):
     return extents[descending_order]
 
 
+HullSummary = namedtuple('HullSummary', ['vertices', 'volume', 'area'])
+HullSummary.__doc__ = """Vertices and measures of a convex hull, without the points it was built on.
+
+Attributes:
+    vertices (numpy.ndarray): coordinates of the vertices of the hull, in counterclockwise order
+        for a 2D hull
+    volume (float): volume of the hull, i.e. its area for a 2D hull
+    area (float): area of the hull, i.e. its perimeter for a 2D hull
+"""
+
+
+def hull_summary(hull):
+    """Get the HullSummary of a scipy.spatial.ConvexHull object."""
+    return HullSummary(hull.points[hull.vertices], float(hull.volume), float(hull.area))
+
+
 def convex_hull(points):
     """Get the convex hull from an array of points.
 
+    Args:
+        points: a 2D array of points with 2 or 3 columns
+
     Returns:
         scipy.spatial.ConvexHull object if successful, otherwise None
     """
@@ -508,25 +783,33 @@ def convex_hull(points):
         return None
 
     try:
-        return ConvexHull(points)
+        return ConvexHull(np.asarray(points, dtype=float))
     except QhullError:
         L.exception("Failure to compute convex hull because of geometrical degeneracy.")
         return None
 
 
-def aspect_ratio(points):
-    """Computes the min/max ratio of the principal direction extents."""
-    extents = principal_direction_extent(points)
+def aspect_ratio(points, remove_duplicates=True):
+    """Computes the min/max ratio of the principal direction extents.
+
+    Args:
+        points: a 2D numpy array of points
+        remove_duplicates: if False, the points are assumed to be already unique
+    """
+    extents = principal_direction_extent(points, remove_duplicates=remove_duplicates)
     return float(extents.min() / extents.max())
 
 
 def circularity(points):
     """Computes circularity as 4 * pi * area / perimeter^2.
 
+    Args:
+        points: a 2D array of points or the HullSummary of their convex hull
+
     Note: For 2D points, ConvexHull.volume corresponds to its area and ConvexHull.area
         to its perimeter.
     """
-    hull = convex_hull(points)
+    hull = points if isinstance(points, HullSummary) else convex_hull(points)
     return 4.0 * np.pi * hull.volume / hull.area**2
 
 
@@ -535,11 +818,17 @@ def shape_factor(points):
 
     Defined in doi: 10.1109/ICoAC44903.2018.8939083
 
+    Args:
+        points: a 2D array of points or the HullSummary of their convex hull
+
     Note: For 2D points, ConvexHull.volume corresponds to its area.
     """
-    hull = convex_hull(points)
-    hull_points = points[hull.vertices]
+    hull = points if isinstance(points, HullSummary) else hull_summary(convex_hull(points))
+    hull_points = hull.vertices
 
-    max_pairwise_distance = np.max(cdist(hull_points, hull_points))
+    if hull_points.shape[1] == 2:
+        max_pairwise_distance = convex_polygon_diameter(hull_points)
+    else:
+        max_pairwise_distance = _max_pairwise_distance(hull_points)
 
     return hull.volume / max_pairwise_distance**2
@@ -0,0 +1,351 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Executors used to run the computations on many morphologies in parallel.
+
+The functions working on collections of morphologies accept an ``executor`` argument, which can
+be:
+
+- ``None`` or ``'serial'``: the work is done in the current process, without parallelism
+- ``'thread'``: a thread pool, useful when the work releases the GIL (file IO, NumPy)
+- ``'process'``: a process pool
+- a :class:`concurrent.futures.Executor` created and managed by the caller, e.g. a distributed
+  executor
+- a :class:`Backend`, to also set the number of workers, the chunk size or the BLAS threads
+
+Examples::
+
+    from neurom import features, load_morphologies
+    from neurom.parallel import Backend
+
+    pop = load_morphologies('path/to/morphologies')
+    features.get('section_lengths', pop, executor='process')
+    features.get('section_lengths', pop, executor=Backend('process', n_workers=8, chunksize=16))
+
+The work on morphologies of very different sizes can be scheduled longest first, with a
+``schedule`` giving the estimated cost of each item: the file size, the number of sections, or the
+runtimes recorded by earlier runs::
+
+    from neurom.apps.morph_stats import extract_dataframe
+    from neurom.parallel import RuntimeHistory
+
+    extract_dataframe(files, config, executor='process', schedule='size')
+    extract_dataframe(files, config, executor='process', schedule=RuntimeHistory('runtimes.json'))
+"""
+import json
+import logging
+import math
+import os
+import time
+import warnings
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import neurom
+from neurom.exceptions import NeuroMError
+
+L = logging.getLogger(__name__)
+
+BACKENDS = ('serial', 'thread', 'process')
+
+# the environment variables read by the BLAS and OpenMP libraries when they are loaded
+_BLAS_ENV_VARS = (
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'BLIS_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS',
+    'NUMEXPR_NUM_THREADS',
+)
+
+
+def limit_blas_threads(n_threads):
+    """Limit the number of threads of the BLAS and OpenMP libraries of the current process.
+
+    The libraries already loaded are limited with ``threadpoolctl`` if it is installed, the
+    environment variables are set for the libraries loaded later and for the child processes.
+    """
+    for var in _BLAS_ENV_VARS:
+        os.environ[var] = str(n_threads)
+    try:
+        import threadpoolctl  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        L.debug('threadpoolctl is not installed, only the environment variables are set')
+    else:
+        threadpoolctl.threadpool_limits(n_threads)
+
+
+class Backend:
+    """How to run a function on many items.
+
+    Attributes:
+        kind (str): 'serial', 'thread', 'process' or 'executor' for a user supplied executor
+        n_workers (int): number of workers of the pools, the number of CPUs by default
+        chunksize (int): number of items sent at once to a process
+        blas_threads (int|None): number of BLAS threads of each process of a process pool, None
+            to keep the default of the libraries
+    """
+
+    def __init__(self, kind='serial', n_workers=None, chunksize=1, blas_threads=1):
+        """Create a backend.
+
+        Arguments:
+            kind (str|concurrent.futures.Executor): one of :data:`BACKENDS`, or an executor that
+                is used as is and not shut down
+            n_workers (int): number of workers of the pools, the number of CPUs by default
+            chunksize (int): number of items sent at once to a process
+            blas_threads (int|None): number of BLAS threads of each process of a process pool,
+                it avoids the oversubscription of the CPUs when the workers call NumPy. None to
+                keep the default of the libraries
+        """
+        self._executor = None
+        if isinstance(kind, Executor):
+            self._executor, kind = kind, 'executor'
+        elif kind not in BACKENDS:
+            raise NeuroMError(f'Unknown executor "{kind}", it must be one of {BACKENDS}')
+        if n_workers is not None and n_workers < 1:
+            raise NeuroMError('`n_workers` must be strictly positive')
+        if chunksize < 1:
+            raise NeuroMError('`chunksize` must be strictly positive')
+        if n_workers is not None and n_workers > os.cpu_count():
+            warnings.warn(f'n_workers ({n_workers}) > os.cpu_count() ({os.cpu_count()}))')
+
+        self.kind = kind
+        self.n_workers = n_workers or os.cpu_count()
+        self.chunksize = chunksize
+        self.blas_threads = blas_threads
+
+    @property
+    def uses_processes(self):
+        """Whether the items and the function may be sent to other processes, i.e. pickled."""
+        return self.kind == 'process' or (
+            self.kind == 'executor' and not isinstance(self._executor, ThreadPoolExecutor)
+        )
+
+    def map(self, func, items, schedule=None):
+        """Apply `func` to each item.
+
+        Arguments:
+            func (Callable): the function
+            items (Iterable): the items
+            schedule: the cost of the items, see :func:`get_cost_function`. The most expensive
+                items are dispatched first, so that they do not leave the other workers idle at
+                the end. If it is a :class:`RuntimeHistory`, the runtimes of the items are also
+                recorded in it.
+
+        Returns:
+            list: the results, in the order of the items
+        """
+        if schedule is None:
+            return self._map(func, items)
+
+        items = list(items)
+        order = list(range(len(items)))
+        cost_function = get_cost_function(schedule)
+        if self.kind != 'serial':
+            if cost_function in _PARALLEL_COST_FUNCTIONS:
+                # the costs that parse the files are computed by the workers
+                costs = self._map(cost_function, items)
+            else:
+                costs = list(map(cost_function, items))
+            # the sort is stable, the items of equal costs keep their order
+            order.sort(key=costs.__getitem__, reverse=True)
+
+        history = schedule if isinstance(schedule, RuntimeHistory) else None
+        if history is not None:
+            func = partial(_timed, func)
+
+        results = [None] * len(items)
+        for idx, result in zip(order, self._map(func, [items[idx] for idx in order])):
+            results[idx] = result
+
+        if history is not None:
+            for item, (_, duration) in zip(items, results):
+                history.record(item, duration)
+            history.save()
+            results = [result for result, _ in results]
+        return results
+
+    def _map(self, func, items):
+        """Apply `func` to each item, in order."""
+        if self.kind == 'serial':
+            return list(map(func, items))
+        if self.kind == 'executor':
+            return list(self._executor.map(func, items, chunksize=self.chunksize))
+        if self.kind == 'thread':
+            with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+                return list(executor.map(func, items))
+
+        initializer, initargs = None, ()
+        if self.blas_threads is not None:
+            initializer, initargs = limit_blas_threads, (self.blas_threads,)
+        with ProcessPoolExecutor(
+            max_workers=self.n_workers, initializer=initializer, initargs=initargs
+        ) as executor:
+            return list(executor.map(func, items, chunksize=self.chunksize))
+
+    def __repr__(self):
+        """Return a string representation."""
+        return (
+            f'Backend <kind: {self.kind}, n_workers: {self.n_workers}, '
+            f'chunksize: {self.chunksize}, blas_threads: {self.blas_threads}>'
+        )
+
+
+def _timed(func, item):
+    """Return the result of ``func(item)`` and its duration in seconds."""
+    start = time.perf_counter()
+    result = func(item)
+    return result, time.perf_counter() - start
+
+
+def item_key(item):
+    """Return the key of the runtime of an item.
+
+    It is the absolute path of a file, the absolute path of its archive followed by its name in
+    the archive for an archive entry, so that the files of the same name in different directories
+    are told apart, and the name of the other items.
+    """
+    if isinstance(item, (str, Path)):
+        return os.path.abspath(item)
+    if isinstance(item, neurom.io.archive.ArchiveEntry):
+        return f'{os.path.abspath(item.archive.path)}:{item.archive.names[item.index]}'
+    return getattr(item, 'name', str(item))
+
+
+def file_size(item):
+    """Cost of a morphology given by the size of its file.
+
+    The cost of a loaded morphology is the size of its points in memory, which is of the same
+    order of magnitude. The cost of other items is 0.
+    """
+    if isinstance(item, (str, Path)):
+        return os.stat(item).st_size
+    if isinstance(item, neurom.io.archive.ArchiveEntry):
+        return item.archive.size(item.index)
+    if isinstance(item, neurom.core.morphology.Morphology):
+        return item.to_morphio().points.nbytes
+    return 0
+
+
+def section_count(item):
+    """Cost of a morphology given by its number of sections, read from its metadata.
+
+    Reading the metadata of a file parses it with MorphIO, so the files are parsed twice: once
+    to compute their costs, which is done by the workers of the backend, and once to process them.
+    It pays off when the processing of a morphology is much longer than its parsing, otherwise
+    :func:`file_size` is a cheaper estimate. The cost of items that are not morphologies is 0.
+    """
+    if isinstance(
+        item, (str, Path, neurom.io.archive.ArchiveEntry, neurom.core.morphology.Morphology)
+    ):
+        return sum(neurom.io.metadata.read_metadata(item).n_sections.values())
+    return 0
+
+
+class RuntimeHistory:
+    """Runtimes of the items recorded during earlier runs, used as their costs.
+
+    The runtimes are keyed by :func:`item_key`. The items without recorded runtime have an
+    infinite cost, they are dispatched first.
+    """
+
+    def __init__(self, path=None):
+        """Load the runtimes.
+
+        Arguments:
+            path (str|Path): JSON file where the runtimes are stored, it is read if it exists and
+                written by :meth:`save`. If None, the runtimes are only kept in memory
+        """
+        self.path = path
+        self.runtimes = {}
+        if path is not None and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.runtimes = json.load(f)
+
+    def __call__(self, item):
+        """Return the recorded runtime of an item, infinite if there is none."""
+        return self.runtimes.get(item_key(item), math.inf)
+
+    def record(self, item, duration):
+        """Record the runtime of an item."""
+        self.runtimes[item_key(item)] = duration
+
+    def save(self):
+        """Write the runtimes to the file of the history, if any."""
+        if self.path is not None:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.runtimes, f, indent=2, sort_keys=True)
+
+
+SCHEDULES = {'size': file_size, 'sections': section_count}
+
+# the cost functions that are too expensive to be computed serially before the dispatch
+_PARALLEL_COST_FUNCTIONS = (section_count,)
+
+
+def get_cost_function(schedule):
+    """Return the function estimating the cost of an item.
+
+    Arguments:
+        schedule (str|RuntimeHistory|Callable): 'size' for :func:`file_size`, 'sections' for
+            :func:`section_count`, a :class:`RuntimeHistory` or any function of an item returning
+            its cost
+
+    Returns:
+        Callable: the function
+    """
+    if isinstance(schedule, str):
+        if schedule not in SCHEDULES:
+            raise NeuroMError(
+                f'Unknown schedule "{schedule}", it must be one of {tuple(SCHEDULES)}'
+            )
+        return SCHEDULES[schedule]
+    if not callable(schedule):
+        raise NeuroMError(f'Invalid schedule {schedule}, it must be a string or a callable')
+    return schedule
+
+
+def get_backend(executor=None, n_workers=1):
+    """Return the backend described by `executor`.
+
+    Arguments:
+        executor (None|str|concurrent.futures.Executor|Backend): see the module documentation
+        n_workers (int): number of workers used when `executor` is a string, 1 means the number of
+            CPUs. When `executor` is None, a process pool is used if `n_workers` is greater than 1,
+            as done by the ``n_workers`` arguments that predate the executors
+
+    Returns:
+        Backend: the backend
+    """
+    if isinstance(executor, Backend):
+        return executor
+    if executor is None:
+        executor = 'process' if n_workers > 1 else 'serial'
+    return Backend(executor, n_workers=None if n_workers == 1 else n_workers)
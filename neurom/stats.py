@@ -33,10 +33,13 @@ Nothing fancy. Just commonly used functions using scipy functionality.
 
 from collections import OrderedDict, namedtuple
 from enum import Enum, unique
+from functools import partial
 
 import numpy as np
 from scipy import stats as _st
 
+from neurom.parallel import get_backend
+
 FitResults = namedtuple('FitResults', ['params', 'errs', 'type'])
 
 
@@ -113,7 +116,7 @@ def fit(data, distribution='norm'):
     return FitResults(params, _st.kstest(data, distribution, params), distribution)
 
 
-def optimal_distribution(data, distr_to_check=('norm', 'expon', 'uniform')):
+def optimal_distribution(data, distr_to_check=('norm', 'expon', 'uniform'), executor=None):
     """Fit multiple distributions to a data set and return the fit with the minimal ks-distance.
 
     Arguments:
@@ -121,6 +124,7 @@ def optimal_distribution(data, distr_to_check=('norm', 'expon', 'uniform')):
 
     Options:
         distr_to_check: tuple of distributions to be checked
+        executor: how the distributions are fitted, see :mod:`neurom.parallel`
 
     Returns:
         FitResults object with fitted parameters, errors and distribution type\
@@ -129,7 +133,7 @@ def optimal_distribution(data, distr_to_check=('norm', 'expon', 'uniform')):
     Note:
         Uses Kolmogorov-Smirnov test to estimate distance and p-value.
     """
-    fit_results = [fit(data, d) for d in distr_to_check]
+    fit_results = get_backend(executor).map(partial(fit, data), distr_to_check)
     return min(fit_results, key=lambda fit: fit.errs[0])
 
 
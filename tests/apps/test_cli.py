@@ -156,3 +156,42 @@ def test_morph_check():
             },
             'STATUS': 'FAIL',
         }
+
+
+def test_pack(tmpdir):
+    runner = CliRunner()
+    output = str(Path(tmpdir, 'archive.nmz'))
+    result = runner.invoke(cli, ['pack', str(DATA / 'valid_set'), output, '--recursive'])
+    assert result.exit_code == 0, result.output
+    assert 'Packed 4 morphologies' in result.output
+
+    with tempfile.NamedTemporaryFile(suffix='.json') as f:
+        result = runner.invoke(cli, ['stats', output, '--output', f.name])
+        assert result.exit_code == 0, result.output
+        assert set(json.load(f)) == {
+            'Neuron.swc',
+            'Neuron_2_branch_h5v1.h5',
+            'Neuron_h5v1.h5',
+            'Neuron_slice.h5',
+        }
+
+
+def test_catalog(tmpdir):
+    runner = CliRunner()
+    catalog = str(Path(tmpdir, 'catalog.db'))
+    result = runner.invoke(cli, ['catalog', 'index', str(DATA / 'valid_set'), catalog])
+    assert result.exit_code == 0, result.output
+    assert 'Indexed 4 new or modified morphologies, 4 in total' in result.output
+
+    result = runner.invoke(cli, ['catalog', 'query', catalog, "format = 'swc'"])
+    assert result.exit_code == 0, result.output
+    assert result.output == f'{DATA / "valid_set" / "Neuron.swc"}\n'
+
+    config = DATA.parent.parent / 'neurom/apps/config/morph_stats.yaml'
+    for _ in range(2):
+        with tempfile.NamedTemporaryFile(suffix='.json') as f:
+            result = runner.invoke(
+                cli, ['stats', str(DATA / 'valid_set'), '--output', f.name, '--catalog', catalog]
+            )
+            assert result.exit_code == 0, result.output
+            assert len(json.load(f)) == 4
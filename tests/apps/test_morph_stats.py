@@ -28,6 +28,7 @@
 
 import os
 import warnings
+from unittest.mock import Mock, patch
 from copy import deepcopy
 from pathlib import Path
 
@@ -37,6 +38,7 @@ from neurom.apps import morph_stats as ms
 from neurom.core.population import Population
 from neurom.exceptions import ConfigError
 from neurom.features import _NEURITE_FEATURES, _MORPHOLOGY_FEATURES, _POPULATION_FEATURES
+from neurom.parallel import Backend, RuntimeHistory
 
 import pytest
 from numpy.testing import assert_array_equal, assert_almost_equal
@@ -149,6 +151,20 @@ def test_extract_stats_single_morphology():
             assert_almost_equal(res[k][kk], REF_OUT[k][kk], decimal=4)
 
 
+def test_extract_stats_single_traversal():
+    m = nm.load_morphology(SWC_PATH / 'Neuron.swc')
+    section_lengths = _NEURITE_FEATURES['section_lengths']
+    with patch.dict(
+        _NEURITE_FEATURES,
+        {'section_lengths': Mock(wraps=section_lengths, shape=section_lengths.shape)},
+    ):
+        res = ms.extract_stats(m, REF_CONFIG)
+        # computed once per neurite for the 4 neurite types
+        assert _NEURITE_FEATURES['section_lengths'].call_count == len(m.neurites)
+    for k in ('all', 'axon', 'basal_dendrite', 'apical_dendrite'):
+        assert_almost_equal(res[k]['max_section_lengths'], REF_OUT[k]['max_section_lengths'], 4)
+
+
 def test_extract_stats_single_neurite():
     m = nm.load_morphology(SWC_PATH / 'Neuron.swc')
     neurite = m.neurites[0]
@@ -509,12 +525,43 @@ def test_extract_dataframe_multiproc():
 
     assert actual[("property", "name")].tolist() == ["Pop1", "Pop2"]
 
-    with pytest.raises(
-        ValueError,
-        match="Can only process morphologies given as file paths when n_workers > 1",
-    ):
+    # loaded morphologies are sent to the workers through a temporary archive
+    with warnings.catch_warnings(record=True) as w:
         pop = Population(morphs, cache=True)
         actual = ms.extract_dataframe(pop, REF_CONFIG, n_workers=2)
+        actual = actual.drop(columns='raw_section_branch_orders', level=1)
+    assert_frame_equal(actual, expected, check_dtype=False)
+
+    with warnings.catch_warnings(record=True) as w:
+        actual = ms.extract_dataframe(
+            [nm.load_morphology(morphs[0]), morphs[1]], REF_CONFIG, n_workers=2
+        )
+        actual = actual.drop(columns='raw_section_branch_orders', level=1)
+    assert_frame_equal(actual, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize(
+    'executor', ['thread', 'process', Backend('process', n_workers=2, chunksize=2)]
+)
+def test_extract_dataframe_executor(executor):
+    morphs = [Path(SWC_PATH, name) for name in ['Neuron.swc', 'simple.swc']]
+    expected = pd.read_csv(Path(DATA_PATH, 'extracted-stats.csv'), index_col=0, header=[0, 1])
+
+    with warnings.catch_warnings(record=True):
+        actual = ms.extract_dataframe(
+            [nm.load_morphology(morphs[0]), morphs[1]], REF_CONFIG, executor=executor
+        )
+        actual = actual.drop(columns='raw_section_branch_orders', level=1)
+    assert_frame_equal(actual, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize('schedule', ['size', 'sections', RuntimeHistory()])
+def test_extract_dataframe_schedule(schedule):
+    morphs = [Path(SWC_PATH, name) for name in ['simple.swc', 'Neuron.swc']]
+    expected = ms.extract_dataframe(morphs, REF_CONFIG)
+
+    actual = ms.extract_dataframe(morphs, REF_CONFIG, executor='thread', schedule=schedule)
+    assert_frame_equal(actual, expected)
 
 
 def test_get_header():
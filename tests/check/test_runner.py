@@ -199,3 +199,10 @@ def test__sanitize_config():
     # makes no changes to already filled out config
     new_config = CheckRunner._sanitize_config(CONFIG)
     assert CONFIG == new_config
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_directory_input_executor(executor):
+    checker = CheckRunner(CONFIG)
+    assert checker.run(SWC_PATH, executor=executor) == checker.run(SWC_PATH)
+    assert checker.run(SWC_PATH, executor=executor, schedule='size') == checker.run(SWC_PATH)
@@ -0,0 +1,112 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose, assert_array_equal
+
+from neurom import NeuriteType, features, load_morphologies, load_morphology
+from neurom.core.batch import PopulationBatch
+from neurom.exceptions import NeuroMError
+
+DATA_PATH = Path(__file__).parent.parent / 'data'
+
+POP = load_morphologies(
+    [
+        DATA_PATH / 'swc/Neuron.swc',
+        DATA_PATH / 'h5/v1/Neuron.h5',
+        DATA_PATH / 'h5/v1/bio_neuron-000.h5',
+        DATA_PATH / 'swc/Single_basal.swc',
+    ],
+    cache=True,
+)
+BATCH = PopulationBatch(POP)
+
+NEURITE_TYPES = [NeuriteType.all, NeuriteType.axon, NeuriteType.basal_dendrite]
+
+
+def test_offsets():
+    assert len(BATCH) == len(POP)
+    assert BATCH.names == [m.name for m in POP]
+    assert len(BATCH.section_offsets) == len(BATCH.section_types) + 1
+    assert BATCH.section_offsets[-1] == len(BATCH.points)
+    assert_array_equal(np.diff(BATCH.morphology_neurite_offsets), [len(m.neurites) for m in POP])
+    assert_array_equal(BATCH.neurite_types, [n.type for m in POP for n in m.neurites])
+    assert_array_equal(BATCH.points, np.concatenate([s.points for m in POP for s in m.sections]))
+    assert 'n_morphologies: 4' in str(BATCH)
+
+
+@pytest.mark.parametrize('neurite_type', NEURITE_TYPES)
+@pytest.mark.parametrize(
+    'feature_name',
+    ['section_lengths', 'section_areas', 'section_radial_distances', 'section_branch_orders'],
+)
+def test_section_features(feature_name, neurite_type):
+    expected = features.get(feature_name, POP, neurite_type=neurite_type)
+    values = getattr(BATCH, feature_name)(neurite_type=neurite_type)
+    assert_allclose(values, expected, rtol=1e-5)
+
+    per_morphology = BATCH.split(values, neurite_type=neurite_type)
+    assert len(per_morphology) == len(POP)
+    for morph, morph_values in zip(POP, per_morphology):
+        assert_allclose(
+            morph_values, features.get(feature_name, morph, neurite_type=neurite_type), rtol=1e-5
+        )
+
+
+def test_section_radial_distances_no_soma():
+    pop = load_morphologies(
+        [DATA_PATH / 'swc/Single_apical_no_soma.swc', DATA_PATH / 'swc/Neuron.swc'], cache=True
+    )
+    values = PopulationBatch(pop).section_radial_distances()
+    assert np.isfinite(values).all()
+    assert_allclose(values, features.get('section_radial_distances', pop), rtol=1e-5)
+
+
+@pytest.mark.parametrize('neurite_type', NEURITE_TYPES)
+def test_sholl_frequency(neurite_type):
+    assert_array_equal(
+        BATCH.sholl_frequency(neurite_type=neurite_type),
+        features.get('sholl_frequency', POP, neurite_type=neurite_type),
+    )
+    bins = [20, 50, 10, 200]
+    assert_array_equal(
+        BATCH.sholl_frequency(neurite_type=neurite_type, bins=bins),
+        features.get('sholl_frequency', POP, neurite_type=neurite_type, bins=bins),
+    )
+
+
+def test_sholl_frequency_empty():
+    assert BATCH.sholl_frequency(neurite_type=NeuriteType.custom5) == []
+
+    no_soma = PopulationBatch([load_morphology(DATA_PATH / 'swc/Single_apical_no_soma.swc')])
+    assert np.isnan(no_soma.soma_radii).all()
+    with pytest.raises(NeuroMError, match='requires all the morphologies to have a soma'):
+        no_soma.sholl_frequency()
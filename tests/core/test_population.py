@@ -31,8 +31,10 @@ from pathlib import Path
 from neurom.core.population import Population
 from neurom.core.morphology import Morphology
 from neurom import load_morphology
+from neurom.exceptions import NeuroMError
 
 import pytest
+from numpy.testing import assert_array_equal
 
 DATA_PATH = Path(__file__).parent.parent / 'data'
 
@@ -134,3 +136,127 @@ def test_getitem():
 @pytest.mark.parametrize('pop', populations)
 def test_str(pop):
     assert 'Population' in str(pop)
+
+
+def test_cache_size():
+    pop = Population(FILES, cache_size=2)
+    assert all(isinstance(f, Path) for f in pop._files)
+
+    m0 = pop[0]
+    assert pop[0] is m0
+    pop[1]
+    pop[2]
+    assert list(pop._lru) == [1, 2]
+    assert pop[0] is not m0
+
+    for a, b in zip(NEURONS, pop):
+        assert a.name == b.name
+        assert (a.points == b.points).all()
+    assert len(pop._lru) == 2
+
+    pop.process_subtrees = True
+    assert not pop._lru
+    assert all(isinstance(f, Path) for f in pop._files)
+    assert all(n.process_subtrees for n in pop)
+
+    # the bounded cache is not used when everything is cached
+    pop = Population(FILES, cache=True, cache_size=2)
+    pop[0]
+    assert not pop._lru
+
+
+@pytest.mark.parametrize('cache_size', [None, 1, 5])
+@pytest.mark.parametrize('prefetch', [1, 2, 10])
+def test_prefetch(prefetch, cache_size):
+    pop = Population(FILES + NEURONS, cache_size=cache_size, prefetch=prefetch)
+    for _ in range(2):
+        result = list(pop)
+        assert [m.name for m in result] == [m.name for m in NEURONS + NEURONS]
+        for a, b in zip(NEURONS + NEURONS, result):
+            assert (a.points == b.points).all()
+
+
+def test_prefetch_early_stop():
+    pop = Population(FILES, prefetch=2)
+    assert next(iter(pop)).name == NEURONS[0].name
+
+
+def test_invalid_cache_options():
+    with pytest.raises(NeuroMError, match='`cache_size` must be strictly positive'):
+        Population(FILES, cache_size=0)
+    with pytest.raises(NeuroMError, match='`prefetch` must be positive'):
+        Population(FILES, prefetch=-1)
+
+
+@pytest.mark.parametrize('n_workers', [1, 3])
+def test_load_report(n_workers):
+    pop = Population(FILES + NEURONS[:1], cache=True, n_workers=n_workers)
+    assert [m.name for m in pop] == [m.name for m in NEURONS + NEURONS[:1]]
+    assert [r.name for r in pop.load_report] == [str(f) for f in FILES] + [NEURONS[0].name]
+    assert all(r.duration >= 0 and r.error is None for r in pop.load_report)
+
+    assert Population(FILES).load_report == []
+
+
+def test_load_report_ignored_error():
+    from morphio import MorphioError
+
+    files = FILES + [DATA_PATH / 'h5/v1/Neuron.h5', DATA_PATH / 'swc/non_existent.swc']
+    pop = Population(files, cache=True, n_workers=2, ignored_exceptions=(MorphioError,))
+    assert len(pop) == len(files)
+    assert len(list(pop)) == len(FILES) + 1
+    assert isinstance(pop.load_report[-1].error, MorphioError)
+    assert pop.load_report[-2].error is None
+
+    with pytest.raises(NeuroMError, match='`load_morphologies` failed'):
+        Population(files, cache=True, n_workers=2)
+
+
+@pytest.mark.parametrize('kind', ['serial', 'thread', 'process'])
+def test_load_executor(kind):
+    from morphio import MorphioError
+    from neurom.parallel import Backend
+
+    # point_soma.swc can not be written in the HDF5 format, it is parsed again by the main process
+    files = FILES + [DATA_PATH / 'swc/point_soma.swc', DATA_PATH / 'swc/non_existent.swc']
+    pop = Population(
+        files + NEURONS[:1],
+        cache=True,
+        executor=Backend(kind, n_workers=1),
+        ignored_exceptions=(MorphioError,),
+    )
+    expected = NEURONS + [load_morphology(files[3])] + NEURONS[:1]
+    assert [m.name for m in pop] == [m.name for m in expected]
+    for morph, expected_morph in zip(pop, expected):
+        assert_array_equal(morph.to_morphio().points, expected_morph.to_morphio().points)
+        assert_array_equal(morph.soma.points, expected_morph.soma.points)
+        assert type(morph.soma) is type(expected_morph.soma)
+    assert [r.name for r in pop.load_report] == [str(f) for f in files] + [NEURONS[0].name]
+    assert isinstance(pop.load_report[-2].error, MorphioError)
+    assert all(r.duration >= 0 for r in pop.load_report)
+
+
+@pytest.mark.parametrize('cache', [True, False])
+def test_slicing(cache):
+    pop = Population(FILES, name='foo', cache=cache, process_subtrees=True)
+    sub_pop = pop[1:]
+    assert isinstance(sub_pop, Population)
+    assert sub_pop.name == 'foo'
+    assert len(sub_pop) == 2
+    assert [m.name for m in sub_pop] == [m.name for m in NEURONS[1:]]
+    assert all(m.process_subtrees for m in sub_pop)
+    assert len(pop[::2]) == 2
+
+
+def test_filter():
+    from neurom import NeuriteType
+
+    pop = Population(FILES + NEURONS[:1], name='foo', cache_size=2)
+    assert [m.name for m in pop.metadata()] == [m.name for m in NEURONS + NEURONS[:1]]
+
+    apical = pop.filter(lambda m: NeuriteType.apical_dendrite in m.n_neurites)
+    assert apical.name == 'foo'
+    assert apical._cache_size == 2
+    assert [m.name for m in apical] == ['Neuron.swc', 'Neuron_small_radius.swc', 'Neuron.swc']
+
+    assert len(pop.filter(lambda m: sum(m.n_sections.values()) > 500)) == 0
@@ -123,3 +123,45 @@ def test_diameter_power_relation():
     assert_raises(NeuroMError, bf.diameter_power_relation, multifurcation_section)
 
     assert_raises(ValueError, bf.diameter_power_relation, root, method='unvalid-method')
+
+
+@pytest.mark.parametrize('morph', [SIMPLE, SIMPLE2])
+def test_bifurcation_table(morph):
+    for neurite in morph.neurites:
+        root = neurite.root_node
+        table = bf.bifurcation_table(root)
+        bif_points = [s for s in root.ipreorder() if len(s.children) == 2]
+
+        assert table.section_ids.tolist() == [s.id for s in bif_points]
+        assert table.child_ids.tolist() == [[c.id for c in s.children] for s in bif_points]
+        assert np.isclose(table.total_length, nm.features.neurite.total_length(neurite))
+        for i, bif_point in enumerate(bif_points):
+            directions = table.local_directions[i]
+            assert np.isclose(
+                nm.morphmath.angle_between_vectors(directions[0], directions[1]),
+                bf.local_bifurcation_angle(bif_point),
+            )
+            directions = table.remote_directions[i]
+            assert np.isclose(
+                nm.morphmath.angle_between_vectors(directions[0], directions[1]),
+                bf.remote_bifurcation_angle(bif_point),
+            )
+            assert tuple(table.subtree_counts[i]) == bf.partition_pair(bif_point)
+            first = table.child_first_radii[i]
+            assert np.isclose(
+                first.min() / first.max(), bf.sibling_ratio(bif_point), equal_nan=True
+            )
+            mean = table.child_mean_radii[i]
+            assert np.isclose(mean.min() / mean.max(), bf.sibling_ratio(bif_point, 'mean'))
+
+
+def test_bifurcation_table_filters():
+    root = SIMPLE2.neurites[0].root_node
+    table = bf.bifurcation_table(root, bifurcation_filter=lambda s: s.id != root.id)
+    assert table.section_ids.tolist() == [1]
+
+    table = bf.bifurcation_table(root, subtree_filter=lambda s: not s.children)
+    assert table.section_ids.tolist() == [0, 1]
+    assert table.subtree_counts.tolist() == [[2.0, 1.0], [1.0, 1.0]]
+    assert np.allclose(table.subtree_lengths, [[24.536060, 6.0], [12.090537, 12.445523]])
+    assert np.isclose(table.total_length, 30.536060)
@@ -0,0 +1,211 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Test neurom.features.disk_cache."""
+import json
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+import neurom as nm
+from neurom import features
+from neurom.apps.morph_stats import extract_stats
+from neurom.features import disk_cache
+from neurom.features.disk_cache import FeatureCache
+
+DATA_PATH = Path(__file__).parent.parent / 'data'
+SWC_FILE = DATA_PATH / 'swc/Neuron.swc'
+
+
+@pytest.fixture
+def cache(tmpdir):
+    cache = FeatureCache(Path(tmpdir, 'features.db'))
+    previous = features.set_disk_cache(cache)
+    yield cache
+    features.set_disk_cache(previous)
+    cache.close()
+
+
+def test_morphology_hash():
+    m = nm.load_morphology(SWC_FILE)
+    h = disk_cache.morphology_hash(m)
+    assert disk_cache.morphology_hash(nm.load_morphology(SWC_FILE)) == h
+    assert disk_cache.morphology_hash(nm.load_morphology(SWC_FILE, mutable=True)) == h
+    assert disk_cache.morphology_hash(nm.load_morphology(DATA_PATH / 'swc/simple.swc')) != h
+    assert disk_cache.morphology_hash(m.transform(lambda p: p + 1)) != h
+
+
+def test_feature_key():
+    m = nm.load_morphology(SWC_FILE)
+    key = disk_cache.feature_key('section_lengths', m, {'neurite_type': nm.AXON})
+    assert disk_cache.feature_key('section_lengths', m, {'neurite_type': nm.AXON}) == key
+    assert disk_cache.feature_key('section_lengths', m, {'neurite_type': nm.BASAL_DENDRITE}) != key
+    assert disk_cache.feature_key('section_volumes', m, {'neurite_type': nm.AXON}) != key
+
+    m.process_subtrees = True
+    assert disk_cache.feature_key('section_lengths', m, {'neurite_type': nm.AXON}) != key
+
+
+def test_feature_key_callables():
+    from neurom.core.morphology import Section
+
+    assert (
+        json.dumps([Section.ipreorder, len, Section], cls=disk_cache._KeyEncoder)
+        == '["neurom.core.morphology.Section.ipreorder", "builtins.len", '
+        '"neurom.core.morphology.Section"]'
+    )
+
+    # the objects without a stable encoding are not cached
+    m = nm.load_morphology(SWC_FILE)
+    assert disk_cache.feature_key('section_lengths', m, {'func': lambda x: x}) is None
+    assert disk_cache.feature_key('section_lengths', m, {'func': [].append}) is None
+    assert disk_cache.feature_key('section_lengths', m, {'obj': object()}) is None
+
+
+def test_get_uncachable_argument(cache):
+    from neurom.core.morphology import Section
+
+    m = nm.load_morphology(SWC_FILE)
+    expected = features.get('section_path_distances', m, iterator_type=Section.ileaf)
+    assert len(cache) == 1
+    assert (
+        features.get('section_path_distances', m, iterator_type=lambda s: Section.ileaf(s))
+        == expected
+    )
+    assert len(cache) == 1
+
+
+def test_get(cache):
+    m = nm.load_morphology(SWC_FILE)
+    expected = features.get('section_lengths', m, neurite_type=nm.AXON)
+    assert len(cache) == 1
+
+    m = nm.load_morphology(SWC_FILE)
+    assert features.get('section_lengths', m, neurite_type=nm.AXON) == expected
+    assert len(cache) == 1
+    assert features.get('total_length', m) == features.get('total_length', m)
+    assert len(cache) == 2
+
+    # the values of the morphologies of a collection are cached, not the values of neurites
+    features.get('section_lengths', m.neurites[0])
+    assert features.get('total_length', [m]) == [features.get('total_length', m)]
+    assert len(cache) == 2
+
+    # errors are still raised
+    with pytest.raises(nm.exceptions.NeuroMError):
+        features.get('section_lengths', m, section_type=nm.AXON)
+
+
+def test_extract_stats(cache):
+    config = {'neurite': {'section_lengths': ['max']}, 'neurite_type': ['AXON', 'ALL']}
+    m = nm.load_morphology(SWC_FILE)
+    expected = extract_stats(m, config)
+    assert len(cache) == 2
+    assert extract_stats(m, config) == expected
+
+
+def test_get_population(cache):
+    pop = nm.load_morphologies([SWC_FILE, DATA_PATH / 'swc/simple.swc'])
+    expected = features.get('section_lengths', pop, neurite_type=nm.AXON)
+    assert len(cache) == 2
+    assert features.get('section_lengths', pop[1], neurite_type=nm.AXON) == expected[-3:]
+    assert features.get('section_lengths', pop, neurite_type=nm.AXON) == expected
+    assert features.get('total_length', pop) == features.get('total_length', pop)
+    assert len(cache) == 4
+
+    # the population features are not cached
+    features.get('sholl_frequency', pop)
+    assert len(cache) == 4
+    assert features.get('total_length', nm.load_morphologies([])) == []
+
+    config = {
+        'morphology': {'total_length': ['max']},
+        'neurite': {'total_length': ['max']},
+        'neurite_type': ['AXON'],
+    }
+    expected = extract_stats(pop, config)
+    assert len(cache) == 6
+    assert extract_stats(pop, config) == expected
+
+
+def test_access_times(tmpdir, monkeypatch):
+    monkeypatch.setattr(disk_cache, '_ACCESS_BATCH_SIZE', 2)
+    cache = FeatureCache(Path(tmpdir, 'features.db'))
+
+    def access_times():
+        return dict(cache._connection.execute('SELECT key, accessed FROM features'))
+
+    cache.set('0', 0)
+    cache.set('1', 1)
+    written = access_times()
+
+    # the access times are written in batches
+    assert cache.get('0') == (True, 0)
+    assert access_times() == written
+    assert cache.get('1') == (True, 1)
+    assert access_times()['0'] > written['0']
+    assert access_times()['1'] > written['1']
+
+    written = access_times()
+    assert cache.get('0') == (True, 0)
+    cache.flush()
+    assert access_times()['0'] > written['0']
+    cache.close()
+
+
+def test_evict(tmpdir):
+    cache = FeatureCache(Path(tmpdir, 'features.db'), max_size=1000)
+    for i in range(10):
+        cache.set(str(i), bytes(200))
+    assert cache.size > 1000
+    cache.get('0')
+    assert cache.evict() == 6
+    assert cache.size <= 1000
+    assert cache.get('0')[0]
+    assert not cache.get('1')[0]
+    assert cache.evict() == 0
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def _write_features(args):
+    cache, idx = args
+    features.set_disk_cache(cache)
+    m = nm.load_morphology(SWC_FILE)
+    return features.get('section_lengths', m, neurite_type=nm.NeuriteType(idx % 3 + 2))
+
+
+def test_concurrent_writers(tmpdir):
+    cache = FeatureCache(Path(tmpdir, 'features.db'))
+    with multiprocessing.Pool(2) as pool:
+        results = pool.map(_write_features, [(cache, i) for i in range(6)])
+    assert len(cache) == 3
+    assert results[:3] == results[3:]
@@ -34,7 +34,7 @@ from pathlib import Path
 
 import neurom as nm
 import numpy as np
-from neurom import features, iter_sections, load_morphology, load_morphologies
+from neurom import features, iter_sections, morphmath, load_morphology, load_morphologies
 from neurom.core.population import Population
 from neurom.core.types import NeuriteType
 from neurom.exceptions import NeuroMError
@@ -931,7 +931,7 @@ def test_partition_asymmetry():
 
 
 def test_partition_asymmetry_length():
-    assert_allclose(features.get('partition_asymmetry_length', POP)[:1], np.array([0.853925]))
+    assert_allclose(features.get('partition_asymmetry_length', POP)[:1], np.array([0.8539249]))
 
 
 def test_section_strahler_orders():
@@ -1157,6 +1157,25 @@ def test_shape_factor():
     assert np.isnan(features.get("shape_factor", morph, neurite_type=nm.NeuriteType.custom5))
 
 
+@pytest.mark.parametrize("feature_name", ["volume_density", "circularity", "shape_factor"])
+def test_convex_hull_features_neurite_types(feature_name):
+    morph = load_morphology(DATA_PATH / "neurolucida/bio_neuron-000.asc")
+    neurite_types = [nm.AXON, nm.BASAL_DENDRITE]
+    points = np.concatenate(
+        [s.points for s in iter_sections(morph, neurite_filter=lambda n: n.type in neurite_types)]
+    )
+    if feature_name == "volume_density":
+        volume = sum(features.get("total_volume_per_neurite", morph, neurite_type=neurite_types))
+        expected = volume / morphmath.convex_hull(points[:, :3]).volume
+    else:
+        expected = getattr(morphmath, feature_name)(points[:, :2])
+
+    npt.assert_allclose(features.get(feature_name, morph, neurite_type=neurite_types), expected)
+    npt.assert_allclose(
+        features.get(feature_name, morph, neurite_type=tuple(neurite_types[::-1])), expected
+    )
+
+
 @pytest.mark.parametrize(
     "neurite_type, axis, expected_value",
     [
@@ -1186,3 +1205,142 @@ def test_length_fraction_from_soma__wrong_axis():
 
     with pytest.raises(NeuroMError):
         features.get("length_fraction_above_soma", morph, up='K')
+
+
+def test_transformed_morphology():
+    from neurom.geom import transform as gtr
+
+    view = gtr.rotate(gtr.translate(NEURON, [10, 20, 30]), [0, 1, 1], 0.5, lazy=True)
+    full = view.morphology
+
+    for name in ('total_length', 'section_path_distances', 'section_radial_distances'):
+        view = gtr.rotate(gtr.translate(NEURON, [10, 20, 30]), [0, 1, 1], 0.5, lazy=True)
+        assert_allclose(features.get(name, view), features.get(name, full), rtol=1e-5)
+        # frame invariant features do not materialize the transformed morphology
+        assert 'morphology' not in vars(view)
+
+    # origin given in the transformed frame
+    assert_allclose(
+        features.get('section_radial_distances', view, origin=[0, 0, 0]),
+        features.get('section_radial_distances', full, origin=[0, 0, 0]),
+    )
+    assert 'morphology' in vars(view)
+
+    view = gtr.translate(NEURON, [10, 20, 30], lazy=True)
+    assert_allclose(features.get('total_width', view), features.get('total_width', NEURON))
+    assert_allclose(
+        features.get('trunk_vectors', view), features.get('trunk_vectors', view.morphology)
+    )
+    assert 'morphology' in vars(view)
+
+
+@pytest.mark.parametrize(
+    'feature_name, kwargs',
+    [
+        ('soma_radius', {}),
+        ('total_length', {'neurite_type': NeuriteType.basal_dendrite}),
+        ('section_lengths', {}),
+        ('section_lengths', {'neurite_type': NeuriteType.axon}),
+        ('number_of_sections', {'neurite_type': NeuriteType.apical_dendrite}),
+        ('section_path_distances', {}),
+    ],
+)
+def test_compile(feature_name, kwargs):
+    compiled = features.compile(feature_name, **kwargs)
+    assert feature_name in repr(compiled)
+    assert_allclose(compiled(NEURON), features.get(feature_name, NEURON, **kwargs))
+    assert_allclose(compiled(POP), features.get(feature_name, POP, **kwargs))
+    if 'neurite_type' not in kwargs and feature_name != 'soma_radius':
+        neurite = NEURON.neurites[0]
+        assert_allclose(compiled(neurite), features.get(feature_name, neurite, **kwargs))
+
+    expected = [features.get(feature_name, m, **kwargs) for m in POP]
+    for result, ref in zip(compiled.map(POP), expected):
+        assert_allclose(result, ref)
+    for result, ref in zip(compiled.map(NRN_FILES), expected):
+        assert_allclose(result, ref)
+
+
+def test_compile_map_workers():
+    compiled = features.compile('section_lengths', neurite_type=NeuriteType.axon)
+    expected = [features.get('section_lengths', m, neurite_type=NeuriteType.axon) for m in POP]
+    assert compiled.map(POP, n_workers=2) == expected
+    assert compiled.map(list(POP), n_workers=2) == expected
+    assert compiled.map(POP, executor='thread') == expected
+
+
+@pytest.mark.parametrize('executor', ['serial', 'thread', 'process'])
+@pytest.mark.parametrize(
+    'feature_name, kwargs',
+    [
+        ('section_lengths', {'neurite_type': NeuriteType.axon}),
+        ('number_of_neurites', {}),
+        ('soma_radius', {}),
+        ('sholl_frequency', {'bins': [10, 50]}),
+    ],
+)
+def test_get_executor(executor, feature_name, kwargs):
+    expected = features.get(feature_name, POP, **kwargs)
+    assert_allclose(features.get(feature_name, POP, executor=executor, **kwargs), expected)
+    assert_allclose(features.get(feature_name, list(POP), executor=executor, **kwargs), expected)
+    with pytest.raises(NeuroMError, match='Can not apply "section_type" arg to a Population'):
+        features.get('section_lengths', POP, executor=executor, section_type=NeuriteType.axon)
+
+
+@pytest.mark.parametrize('executor', ['serial', 'thread', 'process'])
+@pytest.mark.parametrize('cache', [False, True])
+def test_get_executor_ignored_exceptions(executor, cache):
+    from morphio import MorphioError
+
+    files = [SWC_PATH / 'Neuron.swc', DATA_PATH / 'h5/v1/deep_neuron.h5']
+    pop = nm.load_morphologies(files, ignored_exceptions=(MorphioError,), cache=cache)
+    expected = features.get('section_lengths', pop)
+    assert len(expected) == 84
+    assert features.get('section_lengths', pop, executor=executor) == expected
+
+    pop = nm.load_morphologies(files[::-1], ignored_exceptions=(MorphioError,), cache=cache)
+    assert features.get('section_lengths', pop, executor=executor) == expected
+
+
+def test_compile_raises():
+    with pytest.raises(NeuroMError, match='Please check that it exists'):
+        features.compile('no_such_feature')
+    with pytest.raises(NeuroMError, match='Can not apply "section_type" arg to a Morphology'):
+        features.compile('section_lengths', section_type=NeuriteType.axon)(NEURON)
+
+
+@pytest.mark.parametrize('process_subtrees', [False, True])
+@pytest.mark.parametrize(
+    'feature_name', ['section_lengths', 'number_of_sections', 'max_radial_distance']
+)
+def test_get_neurites_feature_values_by_type(feature_name, process_subtrees):
+    from neurom.features import _get_neurites_feature_values_by_type
+
+    morph = load_morphology(
+        SWC_PATH / 'heterogeneous_morphology.swc', process_subtrees=process_subtrees
+    )
+    types = [
+        NeuriteType.axon,
+        NeuriteType.basal_dendrite,
+        NeuriteType.apical_dendrite,
+        NeuriteType.all,
+    ]
+    for obj in (morph, NEURON, [morph, NEURON], POP):
+        if feature_name == 'max_radial_distance':
+            # morphology features are not partitioned
+            assert _get_neurites_feature_values_by_type(feature_name, obj, types) is None
+            continue
+        values, func = _get_neurites_feature_values_by_type(feature_name, obj, types)
+        assert func is features._NEURITE_FEATURES[feature_name]
+        for neurite_type in types:
+            assert_allclose(
+                values[neurite_type], features.get(feature_name, obj, neurite_type=neurite_type)
+            )
+
+    assert _get_neurites_feature_values_by_type('section_lengths', NRN.neurites[0], types) is None
+    assert (
+        _get_neurites_feature_values_by_type(
+            'section_lengths', NRN, types, neurite_type=NeuriteType.axon
+        )
+        is None
+    )
@@ -446,6 +446,14 @@ def test_trunk_vectors():
     assert_array_equal(ret[0], [0.0, -1.0, 0.0])
 
 
+def test_trunk_vectors_process_subtrees():
+    morph = load_morphology(SWC_PATH / 'simple-different-section-types.swc', process_subtrees=True)
+    assert_array_equal(morphology.trunk_vectors(morph), [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0]])
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        assert len(morphology.trunk_angles(morph)) == 2
+
+
 def test_trunk_origin_elevations():
     n0 = load_morphology(
         StringIO(
@@ -795,6 +803,76 @@ def test_volume_density():
     )
 
 
+def test_convex_hull_cache():
+    morph = load_morphology(H5_PATH / 'Neuron.h5')
+    points = np.concatenate([s.points[:, :3] for s in morph.sections])
+
+    hull = morphology._convex_hull(morph, NeuriteType.all)
+    assert morphology._convex_hull(morph, NeuriteType.all) is hull
+    # only the vertices of the hull are kept, not the points it was built from
+    expected = morphmath.convex_hull(points)
+    assert isinstance(hull, morphmath.HullSummary)
+    assert_array_equal(hull.vertices, points[expected.vertices])
+    assert_almost_equal(hull.volume, expected.volume)
+    assert_almost_equal(hull.area, expected.area)
+
+    # the projected hulls are computed from the vertices of the cached 3D hull
+    for plane, axes in (("xy", [0, 1]), ("xz", [0, 2]), ("yz", [1, 2])):
+        projected_hull = morphology._convex_hull(morph, NeuriteType.all, plane)
+        expected = morphmath.convex_hull(points[:, axes])
+        assert len(projected_hull.vertices) == len(expected.vertices)
+        assert_almost_equal(projected_hull.volume, expected.volume)
+        assert_almost_equal(projected_hull.area, expected.area)
+
+    assert morphology._convex_hull(morph, NeuriteType.axon) is not hull
+
+    # the lists of neurite types share the same hull, whatever their order
+    types_hull = morphology._convex_hull(morph, [NeuriteType.axon, NeuriteType.basal_dendrite])
+    assert morphology._convex_hull(morph, (BASAL_DENDRITE, AXON)) is types_hull
+    morph.process_subtrees = True
+    assert morphology._convex_hull(morph, NeuriteType.all) is not hull
+
+    # mutable morphologies are not cached
+    mutable = Morphology(morph.to_morphio().as_mutable())
+    assert morphology._convex_hull(mutable, NeuriteType.all) is not morphology._convex_hull(
+        mutable, NeuriteType.all
+    )
+
+
+def test_aspect_ratio_degenerate():
+    # a single projected point has no principal direction, NaN is returned instead of raising
+    single_point = load_swc(
+        """
+        1  1   0.0 0.0 0.0   0.5 -1
+        2  3   1.0 0.0 0.0   0.1  1
+        """
+    )
+    assert np.isnan(morphology.aspect_ratio(single_point))
+
+    collinear = load_swc(
+        """
+        1  1   0.0 0.0 0.0   0.5 -1
+        2  3   1.0 0.0 0.0   0.1  1
+        3  3   2.0 0.0 0.0   0.1  2
+        """
+    )
+    assert morphology.aspect_ratio(collinear) == 0.0
+
+
+@pytest.mark.parametrize("feature_name", ["circularity", "shape_factor"])
+def test_convex_hull_features_degenerate(feature_name):
+    # the convex hull of collinear points can not be computed, NaN is returned instead of raising
+    collinear = load_swc(
+        """
+        1  1   0.0 0.0 0.0   0.5 -1
+        2  3   1.0 0.0 0.0   0.1  1
+        3  3   2.0 0.0 0.0   0.1  2
+        """
+    )
+    assert np.isnan(getattr(morphology, feature_name)(collinear))
+    assert np.isnan(getattr(morphology, feature_name)(collinear, neurite_type=NeuriteType.axon))
+
+
 def test_unique_projected_points():
     morph = load_swc(
         """
@@ -824,9 +902,10 @@ def test_unique_projected_points():
             morphology._unique_projected_points(morph, enalp, NeuriteType.all),
         )
 
-    assert_allclose(
-        morphology._unique_projected_points(morph, "xy", NeuriteType.all),
-        [
+    # the points used to be unique in 3D before their projection, they are now unique in the
+    # projection plane: they are the rows of the projected 3D unique points, without duplicates
+    projected_3d_unique_points = {
+        "xy": [
             [0.0, 0.0],
             [0.0, 0.0],
             [0.0, 1.0],
@@ -844,10 +923,7 @@ def test_unique_projected_points():
             [1.0, 1.0],
             [1.0, 1.0],
         ],
-    )
-    assert_allclose(
-        morphology._unique_projected_points(morph, "xz", NeuriteType.all),
-        [
+        "xz": [
             [0.0, 0.0],
             [0.0, 1.0],
             [0.0, 0.0],
@@ -865,10 +941,7 @@ def test_unique_projected_points():
             [1.0, 0.0],
             [1.0, 1.0],
         ],
-    )
-    assert_allclose(
-        morphology._unique_projected_points(morph, "yz", NeuriteType.all),
-        [
+        "yz": [
             [0.0, 0.0],
             [0.0, 1.0],
             [1.0, 0.0],
@@ -886,7 +959,11 @@ def test_unique_projected_points():
             [1.0, 0.0],
             [1.0, 1.0],
         ],
-    )
+    }
+    for plane, expected in projected_3d_unique_points.items():
+        points = morphology._unique_projected_points(morph, plane, NeuriteType.all)
+        assert len(points) == len(np.unique(points, axis=0)) == 8
+        assert_allclose(np.unique(points, axis=0), np.unique(expected, axis=0))
 
     with pytest.raises(NeuroMError):
         morphology._unique_projected_points(morph, "airplane", NeuriteType.all)
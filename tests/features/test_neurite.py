@@ -249,6 +249,51 @@ def test_segment_path_lengths():
     assert_allclose(pathlengths, [0.1, 1.332525, 2.5301487, 3.267878, 4.471462])
 
 
+def test_path_distances_match_upstream_sums():
+    from neurom.features import section as sf
+
+    for n in NRN.neurites:
+        sections = list(n.root_node.ipreorder())
+        expected = [sf.section_path_length(s) for s in sections]
+        assert_allclose(neurite.section_path_distances(n), expected, rtol=1e-6)
+
+        expected = np.concatenate(
+            [
+                sf.section_path_length(s) - s.length + np.cumsum(sf.segment_lengths(s))
+                for s in sections
+            ]
+        )
+        assert_allclose(neurite.segment_path_lengths(n), expected, rtol=1e-6)
+
+
+def test_radial_distances_match_sections():
+    from neurom.features import section as sf
+
+    origin = np.array([1.0, -2.0, 3.0])
+    for n in NRN.neurites:
+        sections = list(n.root_node.ipreorder())
+        assert_allclose(
+            neurite.section_radial_distances(n, origin=origin),
+            [sf.section_radial_distance(s, origin) for s in sections],
+            rtol=1e-6,
+        )
+        assert_allclose(
+            neurite.section_term_radial_distances(n, origin=origin),
+            [sf.section_radial_distance(s, origin) for s in sections if s.is_leaf()],
+            rtol=1e-6,
+        )
+        assert_allclose(
+            neurite.section_bif_radial_distances(n, origin=origin),
+            [sf.section_radial_distance(s, origin) for s in sections if len(s.children) == 2],
+            rtol=1e-6,
+        )
+        assert_allclose(
+            neurite.segment_radial_distances(n, origin=origin),
+            np.concatenate([sf.segment_midpoint_radial_distances(s, origin) for s in sections]),
+            rtol=1e-6,
+        )
+
+
 def test_section_taper_rates():
     assert_allclose(
         neurite.section_taper_rates(NRN.neurites[0])[:10],
@@ -266,3 +311,17 @@ def test_section_taper_rates():
         ],
         atol=1e-4,
     )
+
+
+def test_unique_points():
+    for neu in NRN.neurites:
+        points = neurite._unique_points(neu.sections)
+        all_points = np.concatenate([s.points[:, :3] for s in neu.sections])
+        assert len(points) == len(np.unique(all_points, axis=0))
+        assert_allclose(np.unique(points, axis=0), np.unique(all_points, axis=0))
+
+        projected = neurite._unique_points(neu.sections, slice(0, 2))
+        assert_allclose(np.unique(projected, axis=0), np.unique(all_points[:, :2], axis=0))
+
+    assert neurite._unique_points([]).shape == (0, 3)
+    assert neurite._unique_points([], slice(1, 3)).shape == (0, 2)
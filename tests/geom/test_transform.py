@@ -320,3 +320,59 @@ def test_rodrigues_to_dcm():
         assert np.allclose(Rx, _Rx(angle))
         assert np.allclose(Ry, _Ry(angle))
         assert np.allclose(Rz, _Rz(angle))
+
+
+def test_transformed_morphology_lazy():
+    m = load_morphology(SWC_NRN_PATH)
+    t = np.array([100.0, 100.0, 100.0])
+
+    view = gtr.translate(m, t, lazy=True)
+    assert isinstance(view, gtr.TransformedMorphology)
+    assert view.original is m
+    assert view.is_rigid
+    assert view.name == m.name
+    assert 'morphology' not in vars(view)
+
+    assert_almost_equal(view.points[:, COLS.XYZ], m.points[:, COLS.XYZ] + t)
+    assert_almost_equal(view.points[:, COLS.R], m.points[:, COLS.R])
+    assert 'morphology' not in vars(view)
+
+    _check_morphology_translate(m, view, t)
+    assert view.morphology.name == m.name
+    assert view.to_morphio() is view.morphology.to_morphio()
+    assert len(view.sections) == len(m.sections)
+    assert len(view.segments) == len(m.segments)
+
+
+def test_transformed_morphology_compose():
+    m = load_morphology(SWC_NRN_PATH)
+    t = np.array([100.0, 100.0, 100.0])
+
+    view = gtr.rotate(gtr.translate(m, t, lazy=True), [0, 0, 1], math.pi / 2.0, lazy=True)
+    assert view.original is m
+    assert len(view.transforms) == 2
+
+    rot = gtr._rodrigues_to_dcm([0, 0, 1], math.pi / 2.0)
+    expected = _apply_rot(m.points[:, COLS.XYZ] + t, rot)
+    assert_almost_equal(view.points[:, COLS.XYZ], expected)
+
+    view = view.transform(gtr.Translation(-t))
+    assert len(view.transforms) == 3
+    assert_almost_equal(view.points[:, COLS.XYZ], expected - t)
+    assert 'n_transforms: 3' in repr(view)
+
+
+def test_transformed_morphology_not_rigid():
+    class Scale(gtr.Transform3D):
+        def __call__(self, points):
+            return 2.0 * points
+
+    m = load_morphology(SWC_NRN_PATH)
+    view = gtr.TransformedMorphology(m, Scale())
+    assert not view.is_rigid
+    assert_almost_equal(view.points[:, COLS.XYZ], 2.0 * m.points[:, COLS.XYZ])
+
+
+def test_transformed_morphology_bad_type_raises():
+    with pytest.raises(NotImplementedError):
+        gtr.translate("hello", [1, 2, 3], lazy=True)
@@ -0,0 +1,101 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Test neurom.io.archive."""
+import pickle
+from pathlib import Path
+
+from numpy.testing import assert_array_equal
+import pytest
+
+import neurom as nm
+from neurom.exceptions import NeuroMError
+from neurom.io import archive
+from neurom.io.utils import get_morph_files
+
+DATA_PATH = Path(__file__).parent.parent / 'data'
+VALID_DATA_PATH = DATA_PATH / 'valid_set'
+
+
+@pytest.fixture
+def archive_path(tmpdir):
+    path = Path(tmpdir, 'valid_set.nmz')
+    files = sorted(get_morph_files(VALID_DATA_PATH))
+    assert archive.pack_morphologies(files, path, root=VALID_DATA_PATH) == len(files)
+    return path
+
+
+def test_archive(archive_path):
+    files = sorted(get_morph_files(VALID_DATA_PATH))
+    arch = archive.MorphologyArchive(archive_path)
+    assert len(arch) == len(files)
+    assert list(arch.names) == [f.name for f in files]
+    for i, f in enumerate(files):
+        assert arch.read(i) == f.read_bytes()
+        assert arch.size(i) == f.stat().st_size
+    assert 'n_morphologies: 4' in str(arch)
+
+    entry = arch.entries()[1]
+    assert entry.name == files[1].name
+    assert str(entry) == f'{archive_path}:{files[1].name}'
+
+    unpickled = pickle.loads(pickle.dumps(entry))
+    assert unpickled.read() == entry.read()
+    # only the path of the archive is pickled, and it is opened once per process
+    assert len(pickle.dumps(entry)) < len(str(archive_path)) + 200
+    assert pickle.loads(pickle.dumps(arch.entries()[0])).archive is unpickled.archive
+
+
+def test_load_morphologies(archive_path):
+    files = sorted(get_morph_files(VALID_DATA_PATH))
+    pop = nm.load_morphologies(archive_path)
+    assert pop.name == 'valid_set'
+    assert len(pop) == len(files)
+
+    expected = [nm.load_morphology(f) for f in files]
+    for a, b in zip(expected, pop):
+        assert a.name == b.name
+        assert_array_equal(a.points, b.points)
+
+    sub_pop = pop[1:3]
+    assert len(sub_pop) == 2
+    assert [m.name for m in sub_pop] == [m.name for m in expected[1:3]]
+    assert_array_equal(pop[3].points, expected[3].points)
+
+
+def test_empty_archive(tmpdir):
+    path = Path(tmpdir, 'empty.nmz')
+    assert archive.pack_morphologies([], path) == 0
+    assert len(nm.load_morphologies(path)) == 0
+
+
+def test_not_an_archive(tmpdir):
+    path = Path(tmpdir, 'bad.nmz')
+    path.write_bytes(b'not an archive')
+    with pytest.raises(NeuroMError, match='is not a morphology archive'):
+        archive.MorphologyArchive(path)
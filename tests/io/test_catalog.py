@@ -0,0 +1,151 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Test neurom.io.catalog."""
+import shutil
+from pathlib import Path
+
+import pytest
+
+import neurom
+from neurom.exceptions import NeuroMError
+from neurom.io import catalog as catalog_module
+from neurom.io.catalog import Catalog
+
+DATA_PATH = Path(__file__).parent.parent / 'data'
+VALID_DATA_PATH = DATA_PATH / 'valid_set'
+CONFIG = {'morphology': {'soma_radius': ['mean']}}
+
+
+@pytest.fixture
+def catalog(tmpdir):
+    with Catalog(Path(tmpdir, 'catalog.db')) as cat:
+        yield cat
+
+
+def test_index_query(catalog):
+    assert catalog.index(VALID_DATA_PATH) == 4
+    assert len(catalog) == 4
+    assert catalog.index(VALID_DATA_PATH) == 0
+
+    assert [p.name for p in catalog.query('n_neurites_apical_dendrite > 0')] == [
+        'Neuron.swc',
+        'Neuron_h5v1.h5',
+    ]
+    assert [p.name for p in catalog.query("format = ? AND n_sections > ?", ('h5', 84))] == [
+        'Neuron_slice.h5'
+    ]
+    assert len(catalog.query()) == 4
+
+    pop = catalog.population('soma_type = ?', ('SOMA_CYLINDERS',))
+    assert pop.name == 'catalog'
+    assert [m.name for m in pop] == ['Neuron.swc']
+
+    with pytest.raises(NeuroMError, match='Invalid catalog query'):
+        catalog.query('no_such_column > 0')
+
+
+def test_index_modified_file(catalog, tmpdir):
+    directory = Path(tmpdir, 'morphs')
+    directory.mkdir()
+    shutil.copy(VALID_DATA_PATH / 'Neuron.swc', directory / 'Neuron.swc')
+    (directory / 'broken.swc').write_text('not a morphology')
+    assert catalog.index(directory) == 1
+    assert catalog.index(directory) == 0
+
+    shutil.copy(DATA_PATH / 'swc/simple.swc', directory / 'Neuron.swc')
+    assert catalog.index(directory) == 1
+    assert catalog.query('n_points < 100') == [directory / 'Neuron.swc']
+
+
+def test_index_removed_files(catalog, tmpdir):
+    directory = Path(tmpdir, 'morphs')
+    shutil.copytree(VALID_DATA_PATH, directory / 'sub')
+    shutil.copy(VALID_DATA_PATH / 'Neuron.swc', directory / 'Neuron.swc')
+    assert catalog.index(directory, recursive=True) == 5
+
+    # the files deleted from the directory are removed, not the ones of its sub-directories
+    (directory / 'sub' / 'Neuron_slice.h5').unlink()
+    assert catalog.index(directory) == 0
+    assert len(catalog) == 5
+    assert catalog.index(directory, recursive=True) == 0
+    assert len(catalog) == 4
+    assert directory / 'sub' / 'Neuron_slice.h5' not in catalog.query()
+
+    # the files that can not be read anymore are removed
+    (directory / 'Neuron.swc').write_text('not a morphology')
+    assert catalog.index(directory) == 0
+    assert catalog.query('name = ?', ('Neuron.swc',)) == [directory / 'sub' / 'Neuron.swc']
+
+
+def test_index_only_hashes_modified_files(catalog, tmpdir, monkeypatch):
+    directory = Path(tmpdir, 'morphs')
+    shutil.copytree(VALID_DATA_PATH, directory)
+    assert catalog.index(directory) == 4
+
+    hashed = []
+    content_hash = catalog_module.content_hash
+    monkeypatch.setattr(
+        catalog_module, 'content_hash', lambda f: hashed.append(f.name) or content_hash(f)
+    )
+    assert catalog.index(directory) == 0
+    assert hashed == []
+
+    # a touched file is hashed again, but its metadata are not read again
+    (directory / 'Neuron.swc').touch()
+    monkeypatch.setattr(catalog_module, 'scan_metadata', lambda files, *args, **kwargs: [])
+    assert catalog.index(directory) == 0
+    assert hashed == ['Neuron.swc']
+    assert catalog.index(directory) == 0
+    assert hashed == ['Neuron.swc']
+
+
+def test_stats(catalog, tmpdir, monkeypatch):
+    filename = Path(tmpdir, 'Neuron.swc')
+    shutil.copy(VALID_DATA_PATH / 'Neuron.swc', filename)
+    stats = {'morphology': {'mean_soma_radius': 0.5}}
+
+    assert catalog.get_stats(filename, CONFIG) is None
+    assert catalog.set_stats(filename, CONFIG, stats)
+    assert catalog.get_stats(filename, CONFIG) == stats
+    assert catalog.get_stats(filename, CONFIG, process_subtrees=True) is None
+    assert catalog.get_stats(filename, {'morphology': {'soma_radius': ['max']}}) is None
+
+    # raw values are not cached
+    assert not catalog.set_stats(filename, CONFIG, {'morphology': {'raw_lengths': [1, 2]}})
+
+    # the cache is invalidated by a new NeuroM version
+    monkeypatch.setattr(neurom, '__version__', 'other')
+    assert catalog.get_stats(filename, CONFIG) is None
+    monkeypatch.undo()
+    assert catalog.get_stats(filename, CONFIG) == stats
+
+    # the cache is invalidated when the file is modified
+    shutil.copy(DATA_PATH / 'swc/simple.swc', filename)
+    assert catalog.get_stats(filename, CONFIG) is None
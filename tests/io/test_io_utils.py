@@ -29,11 +29,13 @@
 """Test neurom.io.utils."""
 import warnings
 import os
+import shutil
 from contextlib import contextmanager
-from io import StringIO
+from io import BytesIO, StringIO
 from pathlib import Path
 
 import numpy as np
+from numpy.testing import assert_array_equal
 import morphio
 from morphio import (
     MissingParentError,
@@ -97,6 +99,48 @@ def test_get_morph_files():
     assert ref == files
 
 
+def test_iter_morph_files(tmpdir):
+    tmpdir = Path(tmpdir)
+    for name in ('a.swc', 'b.H5', 'c.asc', 'd.txt', 'sub/e.swc', 'sub/deeper/f.h5', 'sub/g.asc'):
+        (tmpdir / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmpdir / name).touch()
+    (tmpdir / 'dir.swc').mkdir()
+
+    def names(**kwargs):
+        files = utils.iter_morph_files(tmpdir, **kwargs)
+        assert not isinstance(files, list)
+        return sorted(f.relative_to(tmpdir).as_posix() for f in files)
+
+    assert names() == ['a.swc', 'b.H5', 'c.asc']
+    assert names(recursive=True) == [
+        'a.swc',
+        'b.H5',
+        'c.asc',
+        'sub/deeper/f.h5',
+        'sub/e.swc',
+        'sub/g.asc',
+    ]
+    assert names(recursive=True, include='*.swc') == ['a.swc', 'sub/e.swc']
+    assert names(recursive=True, include=['*.swc', '*.asc'], exclude='sub/*') == [
+        'a.swc',
+        'c.asc',
+    ]
+    assert names(recursive=True, exclude=['*/deeper/*', 'a.*']) == [
+        'b.H5',
+        'c.asc',
+        'sub/e.swc',
+        'sub/g.asc',
+    ]
+    assert sorted(f.name for f in utils.get_morph_files(tmpdir, recursive=True)) == [
+        'a.swc',
+        'b.H5',
+        'c.asc',
+        'e.swc',
+        'f.h5',
+        'g.asc',
+    ]
+
+
 def test_load_morphologies():
     # List of strings
     pop = utils.load_morphologies(list(map(str, FILES)))
@@ -184,6 +228,36 @@ def test_load_morphology():
     utils.load_morphology(StringIO(morphology_str), reader='swc')
 
 
+@pytest.mark.parametrize('filename', ['swc/Neuron.swc', 'neurolucida/bio_neuron-000.asc'])
+def test_load_morphology_stream_in_memory(filename, tmpdir, monkeypatch):
+    monkeypatch.setattr(utils.tempfile, 'tempdir', str(tmpdir))
+    path = DATA_PATH / filename
+    reader = path.suffix[1:]
+    expected = utils.load_morphology(path)
+    contents = path.read_text()
+
+    for stream in (contents, StringIO(contents), contents.encode(), BytesIO(contents.encode())):
+        m = utils.load_morphology(stream, reader=reader.upper())
+        assert m.name == 'Morphology'
+        assert_array_equal(m.points, expected.points)
+
+    assert not os.listdir(tmpdir)
+
+
+def test_load_morphology_stream_h5(tmpdir, monkeypatch):
+    monkeypatch.setattr(utils.tempfile, 'tempdir', str(tmpdir))
+    path = DATA_PATH / 'h5/v1/Neuron.h5'
+    expected = utils.load_morphology(path)
+
+    m = utils.load_morphology(BytesIO(path.read_bytes()), reader='h5')
+    assert_array_equal(m.points, expected.points)
+
+    # the temporary file is removed, even when the parsing fails
+    with pytest.raises(RawDataError):
+        utils.load_morphology(BytesIO(b'not a h5 file'), reader='h5')
+    assert not os.listdir(tmpdir)
+
+
 def test_load_morphology__conversions():
 
     morphology_str = u""" 1 1  0  0 0 1. -1
@@ -414,6 +488,19 @@ def test_NeuronLoader_mixed_file_extensions():
         loader.get('NoSuchNeuron')
 
 
+def test_NeuronLoader_index(tmpdir):
+    tmpdir = Path(tmpdir)
+    shutil.copy(VALID_DATA_PATH / 'Neuron.swc', tmpdir / 'Neuron.swc')
+    loader = utils.MorphLoader(tmpdir)
+    assert loader.get('Neuron').name == 'Neuron.swc'
+    assert loader._index == {'Neuron': tmpdir / 'Neuron.swc'}
+
+    # the index is rebuilt when a file is not found
+    shutil.copy(VALID_DATA_PATH / 'Neuron_h5v1.h5', tmpdir / 'Other.h5')
+    assert loader.get('Other').name == 'Other.h5'
+    assert set(loader._index) == {'Neuron', 'Other'}
+
+
 def test_get_files_by_path():
     single_neurom = utils.get_files_by_path(NO_SOMA_FILE)
     assert len(single_neurom) == 1
@@ -428,3 +515,80 @@ def test_get_files_by_path():
 def test_h5v2_raises():
     with pytest.raises(RawDataError):
         utils.load_morphology(DATA_PATH / 'h5/v2/Neuron.h5')
+
+
+def test_load_morphologies_cache_size_prefetch():
+    pop = utils.load_morphologies(VALID_DATA_PATH, cache_size=2, prefetch=2)
+    assert pop._cache_size == 2
+    assert pop._prefetch == 2
+    assert len(list(pop)) == len(pop)
+
+
+def test_load_morphology_binary_cache(tmpdir):
+    tmpdir = Path(tmpdir)
+    filename = tmpdir / 'Neuron.asc'
+    shutil.copy(DATA_PATH / 'neurolucida/bio_neuron-000.asc', filename)
+    cache_dir = tmpdir / 'cache'
+    cache_path = utils._binary_cache_path(filename, cache_dir)
+
+    expected = utils.load_morphology(filename)
+    m = utils.load_morphology(filename, binary_cache_dir=cache_dir)
+    assert cache_path.exists()
+    assert list(cache_dir.iterdir()) == [cache_path]
+
+    cached = utils.load_morphology(filename, binary_cache_dir=cache_dir)
+    for morph in (m, cached):
+        assert morph.name == 'Neuron.asc'
+        assert_array_equal(morph.points, expected.points)
+        assert type(morph.soma) is type(expected.soma)
+        assert_array_equal(morph.soma.points, expected.soma.points)
+        assert [s.type for s in morph.sections] == [s.type for s in expected.sections]
+
+    # a stale cache is rebuilt
+    mtime = cache_path.stat().st_mtime_ns
+    os.utime(filename, ns=(mtime + 10**9, mtime + 10**9))
+    utils.load_morphology(filename, binary_cache_dir=cache_dir)
+    assert cache_path.stat().st_mtime_ns > mtime
+
+    pop = utils.load_morphologies([filename], binary_cache_dir=cache_dir)
+    assert_array_equal(pop[0].points, expected.points)
+
+
+def test_binary_cache_soma_type(tmpdir):
+    tmpdir = Path(tmpdir)
+    # the SWC somata made of cylinders or of a single point can not be stored in HDF5 files, they
+    # are stored next to them
+    for filename, soma_type in [
+        (SWC_PATH / 'Neuron.swc', morphio.SomaType.SOMA_CYLINDERS),
+        (SWC_PATH / 'simple.swc', morphio.SomaType.SOMA_SINGLE_POINT),
+    ]:
+        expected = utils.load_morphology(filename)
+        utils.load_morphology(filename, binary_cache_dir=tmpdir)
+        cache_path = utils._binary_cache_path(filename, tmpdir)
+        assert cache_path.exists()
+        assert utils._soma_path(cache_path).exists()
+
+        cached = utils.load_morphology(filename, binary_cache_dir=tmpdir)
+        assert cached.to_morphio().soma.type == soma_type
+        assert type(cached.soma) is type(expected.soma)
+        assert_array_equal(cached.soma.points, expected.soma.points)
+        assert_array_equal(cached.points, expected.points)
+
+    # the soma file of a previous version of the morphology is removed
+    cache_path = tmpdir / 'Neuron.h5'
+    assert utils.write_binary_cache(morphio.Morphology(SWC_PATH / 'Neuron.swc'), cache_path)
+    assert utils._soma_path(cache_path).exists()
+    assert utils.write_binary_cache(morphio.Morphology(DATA_PATH / 'h5/v1/Neuron.h5'), cache_path)
+    assert not utils._soma_path(cache_path).exists()
+
+
+def test_binary_cache_failure(tmpdir, caplog):
+    # MorphIO can not write the morphologies without neurites
+    filename = SWC_PATH / 'point_soma.swc'
+    expected = utils.load_morphology(filename)
+    utils._warn_binary_cache_failure.cache_clear()
+    for _ in range(2):
+        m = utils.load_morphology(filename, binary_cache_dir=tmpdir)
+        assert_array_equal(m.soma.points, expected.soma.points)
+    assert list(Path(tmpdir).iterdir()) == []
+    assert len([r for r in caplog.records if r.levelname == 'WARNING']) == 1
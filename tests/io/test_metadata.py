@@ -0,0 +1,128 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Test neurom.io.metadata."""
+from pathlib import Path
+
+from morphio import MorphioError, SomaType
+from numpy.testing import assert_array_almost_equal
+import pytest
+
+import neurom as nm
+from neurom import NeuriteType
+from neurom.exceptions import NeuroMError
+from neurom.geom import bounding_box
+from neurom.io import metadata
+from neurom.io.archive import pack_morphologies
+
+DATA_PATH = Path(__file__).parent.parent / 'data'
+SWC_FILE = DATA_PATH / 'swc/Neuron.swc'
+
+
+def test_read_metadata():
+    meta = metadata.read_metadata(SWC_FILE)
+    morph = nm.load_morphology(SWC_FILE)
+
+    assert meta.name == 'Neuron.swc'
+    assert meta.format == 'swc'
+    assert meta.soma_type == SomaType.SOMA_CYLINDERS
+    assert meta.n_points == len(morph.points)
+    assert meta.n_sections == {
+        NeuriteType.axon: 21,
+        NeuriteType.basal_dendrite: 42,
+        NeuriteType.apical_dendrite: 21,
+    }
+    assert meta.n_neurites == {
+        NeuriteType.axon: 1,
+        NeuriteType.basal_dendrite: 2,
+        NeuriteType.apical_dendrite: 1,
+    }
+    assert_array_almost_equal(meta.bounding_box, bounding_box(morph))
+
+    in_memory = metadata.read_metadata(morph)
+    assert in_memory.format is None
+    assert in_memory[:-1] == meta._replace(format=None)[:-1]
+
+
+def test_read_metadata_no_neurite():
+    meta = metadata.read_metadata(DATA_PATH / 'swc/Soma_origin.swc')
+    assert meta.n_points == 0
+    assert meta.n_sections == {}
+    assert meta.bounding_box is None
+
+
+def test_read_metadata_archive_entry(tmpdir):
+    archive_path = Path(tmpdir, 'archive.nmz')
+    pack_morphologies([SWC_FILE], archive_path)
+    entry = nm.load_morphologies(archive_path)._files[0]
+    assert metadata.read_metadata(entry).n_sections == metadata.read_metadata(SWC_FILE).n_sections
+
+
+@pytest.mark.parametrize('n_workers', [1, 2])
+def test_scan_metadata(n_workers):
+    result = metadata.scan_metadata(DATA_PATH / 'valid_set', n_workers=n_workers)
+    assert sorted(m.name for m in result) == [
+        'Neuron.swc',
+        'Neuron_2_branch_h5v1.h5',
+        'Neuron_h5v1.h5',
+        'Neuron_slice.h5',
+    ]
+
+    files = nm.io.utils.iter_morph_files(DATA_PATH / 'valid_set')
+    result = metadata.scan_metadata(files, n_workers=n_workers)
+    assert len(result) == 4
+
+
+@pytest.mark.parametrize('executor', ['serial', 'thread', 'process'])
+def test_scan_metadata_executor(executor):
+    files = [SWC_FILE, DATA_PATH / 'swc/simple.swc', nm.load_morphology(SWC_FILE)]
+    result = metadata.scan_metadata(files, executor=executor, schedule='size')
+    assert [m.name for m in result] == ['Neuron.swc', 'simple.swc', 'Neuron.swc']
+
+    with pytest.raises(NeuroMError, match='Unknown schedule'):
+        metadata.scan_metadata(files, executor=executor, schedule='foo')
+
+
+def test_type_counts_other():
+    # the section types unknown to NeuroM do not stop the scan
+    assert metadata._type_counts([2, 3, 3, 42, 43]) == {
+        NeuriteType.axon: 1,
+        NeuriteType.basal_dendrite: 2,
+        metadata.OTHER_TYPE: 2,
+    }
+
+
+def test_scan_metadata_errors():
+    files = [SWC_FILE, DATA_PATH / 'swc/non_existent.swc']
+    result = metadata.scan_metadata(files, ignored_exceptions=(MorphioError,))
+    assert result[0].name == 'Neuron.swc'
+    assert result[1] is None
+
+    with pytest.raises(NeuroMError, match='Could not read the metadata'):
+        metadata.scan_metadata(files)
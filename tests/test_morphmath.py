@@ -34,7 +34,10 @@ from numpy import testing as npt
 from neurom import morphmath as mm
 from neurom.core.dataformat import Point
 from numpy.random import uniform
+from scipy.spatial import ConvexHull
+from scipy.spatial.distance import cdist
 from numpy.testing import assert_array_almost_equal, assert_almost_equal
+import pytest
 
 np.random.seed(0)
 
@@ -337,6 +340,18 @@ def test_angle_between_vectors():
     assert angle1 == 0.0
 
 
+def test_angles_between_vectors():
+    vectors = np.array([(1, 0, 0), (0, 1, 0), (-1, 0, 0), (0, 1, 1), (1, 0, 1), (0, 0.999999, 1)])
+    expected = [[mm.angle_between_vectors(v1, v2) for v2 in vectors] for v1 in vectors]
+    assert_array_almost_equal(
+        mm.angles_between_vectors(vectors[:, np.newaxis], vectors[np.newaxis]), expected
+    )
+    assert_array_almost_equal(
+        mm.angles_between_vectors((0, 1, 0), vectors), [e[1] for e in expected]
+    )
+    assert np.all(np.diag(mm.angles_between_vectors(vectors[:, np.newaxis], vectors)) == 0)
+
+
 def soma_points(radius=5, number_points=20):
     phi = uniform(0, 2 * pi, number_points)
     costheta = uniform(-1, 1, number_points)
@@ -358,6 +373,27 @@ def test_polygon_diameter():
     dia1 = mm.polygon_diameter(surfpoint)
     assert fabs(dia1 - 10.0) < 0.1
 
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(100, 3))
+    assert_almost_equal(mm.polygon_diameter(points), np.max(cdist(points, points)))
+    points = points[:, :2]
+    assert_almost_equal(mm.polygon_diameter(points), np.max(cdist(points, points)))
+
+
+def test_convex_polygon_diameter():
+    assert mm.convex_polygon_diameter([]) == 0.0
+    assert mm.convex_polygon_diameter([[0.0, 0.0], [3.0, 4.0]]) == 5.0
+    assert_almost_equal(mm.convex_polygon_diameter([[0, 0], [2, 0], [2, 1], [0, 1]]), np.sqrt(5))
+
+    rng = np.random.default_rng(0)
+    for points in (
+        rng.normal(size=(200, 2)),
+        rng.integers(0, 5, size=(50, 2)).astype(float),
+        np.column_stack([np.cos(np.arange(100) * 0.1), np.sin(np.arange(100) * 0.1)]) * [3, 1],
+    ):
+        vertices = points[ConvexHull(points).vertices]
+        assert_almost_equal(mm.convex_polygon_diameter(vertices), np.max(cdist(vertices, vertices)))
+
 
 def test_average_points_dist():
     p0 = Point(0.0, 0.0, 0.0, 3.0)
@@ -500,6 +536,25 @@ def test_pca():
     assert np.allclose(eigv[:, 2], RES_EIGV[:, 2]) or np.allclose(eigv[:, 2], -1.0 * RES_EIGV[:, 2])
 
 
+def test_unique_points():
+    points = np.array([[1.0, 2.0, 3.0], [0.0, 0.0, 0.0], [1.0, 2.0, 3.0], [-0.0, 0.0, 0.0]])
+    npt.assert_array_equal(mm.unique_points(points), [[1.0, 2.0, 3.0], [0.0, 0.0, 0.0]])
+    assert mm.unique_points(np.empty((0, 2))).shape == (0, 2)
+
+    rng = np.random.default_rng(0)
+    points = rng.integers(0, 5, size=(1000, 3)).astype(float)
+    unique = mm.unique_points(points)
+    npt.assert_array_equal(np.unique(unique, axis=0), np.unique(points, axis=0))
+    assert len(unique) == len(np.unique(points, axis=0))
+
+    # the second point is built to have the same hash as the first one
+    prime, mask = 0x100000001B3, 2**64 - 1
+    bits = [int(np.float64(x).view(np.uint64)) for x in (1.0, 3.0, 2.0)]
+    colliding = ((bits[0] * prime) & mask) ^ bits[1] ^ ((bits[2] * prime) & mask)
+    points = np.array([[1.0, 3.0], [2.0, np.uint64(colliding).view(np.float64)]])
+    npt.assert_array_equal(mm.unique_points(points), points)
+
+
 def test_sphere_area():
     area = mm.sphere_area(0.5)
     assert_almost_equal(area, pi)
@@ -537,6 +592,13 @@ def test_spherical_coordinates():
         new_elevation, new_azimuth = mm.spherical_from_vector(vect)
         assert np.allclose([elevation, azimuth], [new_elevation, new_azimuth])
 
+    vects = [mm.vector_from_spherical(elevation, azimuth) for elevation, azimuth, _ in data]
+    assert_array_almost_equal(
+        mm.spherical_from_vectors(vects), [mm.spherical_from_vector(v) for v in vects]
+    )
+    with pytest.raises(ValueError, match='Norm of vector'):
+        mm.spherical_from_vectors([[1, 0, 0], [0, 0, 0]])
+
 
 def test_principal_direction_extent():
     # test with points on a circle with radius 0.5, and center at 0.0
@@ -723,6 +785,9 @@ def test_circularity():
     npt.assert_allclose(mm.circularity(shapes["square-2D"]), 0.785398, atol=1e-5)
     npt.assert_allclose(mm.circularity(shapes["rectangle-2D"]), 0.698132, atol=1e-5)
     npt.assert_allclose(mm.circularity(shapes["oval-2D"]), 0.658071, atol=1e-5)
+    npt.assert_allclose(
+        mm.circularity(mm.hull_summary(mm.convex_hull(shapes["oval-2D"]))), 0.658071, atol=1e-5
+    )
 
 
 def test_shape_factor():
@@ -734,3 +799,52 @@ def test_shape_factor():
     npt.assert_allclose(mm.shape_factor(shapes["square-2D"]), 0.5, atol=1e-5)
     npt.assert_allclose(mm.shape_factor(shapes["rectangle-2D"]), 0.4, atol=1e-5)
     npt.assert_allclose(mm.shape_factor(shapes["oval-2D"]), 0.257313, atol=1e-5)
+    npt.assert_allclose(
+        mm.shape_factor(mm.hull_summary(mm.convex_hull(shapes["oval-2D"]))), 0.257313, atol=1e-5
+    )
+
+
+def test_batched_functions():
+    rng = np.random.default_rng(0)
+    p0, p1, p2 = rng.uniform(-10, 10, size=(3, 20, 4))
+    p0[0] = p1[0]
+    fractions = rng.uniform(size=20)
+    segments = mm.polyline_segments(p0)
+    assert segments.shape == (19, 2, 4)
+
+    assert_array_almost_equal(
+        mm.linear_interpolations(p0, p1, fractions),
+        [mm.linear_interpolate(a, b, f) for a, b, f in zip(p0, p1, fractions)],
+    )
+    assert_array_almost_equal(
+        mm.path_fraction_points(p0, fractions), [mm.path_fraction_point(p0, f) for f in fractions]
+    )
+    assert_array_almost_equal(mm.path_fraction_points(p0, [0.0, 1.0]), p0[[0, -1], :3])
+    with pytest.raises(ValueError, match='Invalid fractions'):
+        mm.path_fraction_points(p0, [0.5, 1.5])
+
+    v0, v1, v2 = p0[:, :3], p1[:, :3], p2[:, :3]
+    assert_array_almost_equal(
+        mm.vector_projections(v0, v1), [mm.vector_projection(a, b) for a, b in zip(v0, v1)]
+    )
+    assert_array_almost_equal(
+        mm.dists_point_line(v0, v1, v2),
+        [mm.dist_point_line(a, b, c) for a, b, c in zip(v0, v1, v2)],
+    )
+    assert_array_almost_equal(mm.point_dists(p0, p1), [mm.point_dist(a, b) for a, b in zip(p0, p1)])
+    assert_array_almost_equal(mm.point_dists(p0[0], p1), [mm.point_dist(p0[0], b) for b in p1])
+    assert_array_almost_equal(
+        mm.angles_3points(p0, p1, p2), [mm.angle_3points(a, b, c) for a, b, c in zip(p0, p1, p2)]
+    )
+    assert mm.angles_3points(p0, p1, p2)[0] == 0.0
+
+    p0[:, 3] = np.abs(p0[:, 3])
+    segments = mm.polyline_segments(p0)
+    assert_array_almost_equal(mm.segment_areas(segments), [mm.segment_area(s) for s in segments])
+    assert_array_almost_equal(
+        mm.segment_volumes(segments), [mm.segment_volume(s) for s in segments]
+    )
+    assert_array_almost_equal(
+        mm.segment_taper_rates(segments), [mm.segment_taper_rate(s) for s in segments]
+    )
+    assert len(mm.segment_areas(mm.polyline_segments(p0[:1]))) == 0
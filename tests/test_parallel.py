@@ -0,0 +1,188 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from pathlib import Path
+
+from neurom import load_morphology
+from neurom.exceptions import NeuroMError
+from neurom.io.archive import MorphologyArchive, pack_morphologies
+from neurom.parallel import (
+    Backend,
+    RuntimeHistory,
+    file_size,
+    get_backend,
+    get_cost_function,
+    item_key,
+    limit_blas_threads,
+    section_count,
+)
+
+SWC_PATH = Path(__file__).parent / 'data' / 'swc'
+
+
+def _square(x):
+    return x * x
+
+
+@pytest.mark.parametrize(
+    'executor', [None, 'serial', 'thread', 'process', Backend('process', 2, chunksize=3)]
+)
+def test_map(executor):
+    backend = get_backend(executor)
+    assert backend.map(_square, range(10)) == [x * x for x in range(10)]
+    assert backend.map(_square, []) == []
+
+
+def test_user_executor():
+    with ThreadPoolExecutor(2) as executor:
+        backend = get_backend(executor)
+        assert backend.kind == 'executor'
+        assert not backend.uses_processes
+        assert backend.map(_square, range(5)) == [0, 1, 4, 9, 16]
+        # the executor is not shut down
+        assert executor.submit(_square, 3).result() == 9
+
+
+def test_get_backend():
+    assert get_backend().kind == 'serial'
+    assert get_backend(n_workers=2).kind == 'process'
+    assert get_backend(n_workers=2).n_workers == 2
+    assert get_backend('thread').n_workers == os.cpu_count()
+    assert get_backend('process').uses_processes
+    assert not get_backend('thread').uses_processes
+    backend = Backend('thread')
+    assert get_backend(backend) is backend
+    assert 'kind: thread' in repr(backend)
+
+    with pytest.raises(NeuroMError, match='Unknown executor "foo"'):
+        get_backend('foo')
+    with pytest.raises(NeuroMError, match='`n_workers` must be strictly positive'):
+        Backend('thread', n_workers=0)
+    with pytest.raises(NeuroMError, match='`chunksize` must be strictly positive'):
+        Backend('process', chunksize=0)
+    with pytest.warns(UserWarning, match='os.cpu_count()'):
+        Backend('process', n_workers=os.cpu_count() + 1)
+
+
+def test_limit_blas_threads():
+    with patch.dict(os.environ):
+        limit_blas_threads(2)
+        assert os.environ['OMP_NUM_THREADS'] == '2'
+        assert os.environ['OPENBLAS_NUM_THREADS'] == '2'
+
+
+@pytest.mark.parametrize('kind', ['serial', 'thread', 'process'])
+def test_map_schedule(kind):
+    backend = Backend(kind, n_workers=1)
+    items = [3, 1, 4, 1, 5]
+    assert backend.map(_square, items, schedule=lambda x: x) == [9, 1, 16, 1, 25]
+
+
+def test_map_unknown_schedule():
+    with pytest.raises(NeuroMError, match='Unknown schedule "foo"'):
+        Backend('serial').map(_square, [1, 2], schedule='foo')
+
+
+def test_map_schedule_order():
+    calls = []
+    with ThreadPoolExecutor(1) as executor:
+        get_backend(executor).map(calls.append, [3, 1, 4, 1, 5], schedule=lambda x: x)
+    assert calls == [5, 4, 3, 1, 1]
+
+
+@pytest.mark.parametrize('kind', ['thread', 'process'])
+def test_map_schedule_sections(kind):
+    files = [SWC_PATH / 'simple.swc', SWC_PATH / 'Neuron.swc']
+    backend = Backend(kind, n_workers=1)
+    with patch.object(Backend, '_map', autospec=True, side_effect=Backend._map) as mapped:
+        assert backend.map(os.path.basename, files, schedule='sections') == [
+            'simple.swc',
+            'Neuron.swc',
+        ]
+    assert mapped.call_args_list[0].args[1:] == (section_count, files)
+    assert mapped.call_args_list[1].args[2] == files[::-1]
+
+    with patch.object(Backend, '_map', autospec=True, side_effect=Backend._map) as mapped:
+        backend.map(os.path.basename, files, schedule='size')
+    assert mapped.call_count == 1
+
+
+def test_runtime_history(tmp_path):
+    path = tmp_path / 'runtimes.json'
+    history = RuntimeHistory(path)
+    assert history('a.swc') == float('inf')
+
+    assert Backend('thread', 2).map(_square, [1, 2, 3], schedule=history) == [1, 4, 9]
+    assert set(history.runtimes) == {'1', '2', '3'}
+    assert all(d >= 0 for d in history.runtimes.values())
+
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == history.runtimes
+    assert RuntimeHistory(path).runtimes == history.runtimes
+
+    RuntimeHistory().save()
+
+    # the files of the same name in different directories have their own runtimes
+    history = RuntimeHistory()
+    history.record(Path('a/cell.swc'), 1.0)
+    history.record(Path('b/cell.swc'), 2.0)
+    assert history(Path('a/cell.swc')) == 1.0
+    assert history(os.path.abspath('b/cell.swc')) == 2.0
+
+
+def test_costs(tmp_path):
+    files = [SWC_PATH / 'Neuron.swc', SWC_PATH / 'simple.swc']
+    assert [file_size(f) for f in files] == [f.stat().st_size for f in files]
+    assert [item_key(f) for f in files] == [os.path.abspath(f) for f in files]
+
+    pack_morphologies(files, tmp_path / 'archive.nmz')
+    entries = MorphologyArchive(tmp_path / 'archive.nmz').entries()
+    assert [file_size(e) for e in entries] == [f.stat().st_size for f in files]
+    assert [item_key(e) for e in entries] == [
+        f'{os.path.abspath(tmp_path)}/archive.nmz:Neuron.swc',
+        f'{os.path.abspath(tmp_path)}/archive.nmz:simple.swc',
+    ]
+
+    morph = load_morphology(files[0])
+    assert file_size(morph) == morph.to_morphio().points.nbytes
+    assert section_count(morph) == section_count(files[0]) == section_count(entries[0]) == 84
+    assert file_size(None) == section_count(None) == 0
+
+    assert get_cost_function('size') is file_size
+    assert get_cost_function('sections') is section_count
+    with pytest.raises(NeuroMError, match='Unknown schedule "foo"'):
+        get_cost_function('foo')
+    with pytest.raises(NeuroMError, match='Invalid schedule 1'):
+        get_cost_function(1)
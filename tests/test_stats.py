@@ -94,6 +94,11 @@ def test_optimal_distribution_uniform():
     assert optimal.type == 'uniform'
 
 
+def test_optimal_distribution_executor():
+    optimal = st.optimal_distribution(EXPON, executor='thread')
+    assert optimal.type == 'expon'
+
+
 def test_get_test():
     stat_test_enums = (st.StatTests.ks, st.StatTests.wilcoxon, st.StatTests.ttest)
     expected_stat_test_strings = ("ks_2samp", "wilcoxon", "ttest_ind")